@@ -0,0 +1,604 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+# Headless benchmarks for the macro engine: MacroEngine runs with the in-memory
+# recording injector and fake listeners in place of pynput, so no display or
+# human is needed. Only the startup benchmark builds the GUI, with Qt
+# offscreen, and pynput uses its dummy backend so it needs no X server.
+# Results are written as JSON so runs from different versions can be
+# compared with --compare.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+from pynput.keyboard import Key, KeyCode
+from pynput.mouse import Button
+
+import hellmacro
+
+BENCH_SEARCHES = ["e", "eag air", "orbital", "rrd", "orbgas", "mines", "zzz"]
+
+BENCH_STRATAGEMS = ["Eagle Airstrike", "Orbital Precision Strike", "Orbital 380mm HE Barrage"]
+
+# Played as one chain and as separate triggers
+BENCH_CHAIN = ["Resupply", "Eagle Rearm", "Eagle Airstrike"]
+
+# Pause between key taps in the hook benchmark
+HOOK_EVENT_INTERVAL = 0.0005
+
+# Idle time between the two recorded bursts, longer than RECORDING_MAX_GAP_MS
+RECORDING_PAUSE = 0.4
+
+class FakeListener:
+    instances = []
+
+    def __init__(self, **callbacks):
+        self.callbacks = callbacks
+        FakeListener.instances.append(self)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class FakeMessageBox:
+    Yes = 1
+    No = 0
+
+    @staticmethod
+    def warning(*args, **kwargs):
+        return None
+
+    @staticmethod
+    def question(*args, **kwargs):
+        return FakeMessageBox.Yes
+
+def patch_input():
+    hellmacro.load_pynput()
+    hellmacro.injector = hellmacro.RecordingInjector()
+    hellmacro.KeyboardListener = FakeListener
+    hellmacro.pynput_mouse = SimpleNamespace(Listener=FakeListener)
+
+def create_engine():
+    patch_input()
+    hellmacro.load_data_files()
+    FakeListener.instances = []
+    engine = hellmacro.MacroEngine()
+    engine.start()
+
+    # The engine's input handlers, called directly so every benchmark sees
+    # its event handled when the call returns; bench_hooks drives the real
+    # listener hooks and the input dispatcher
+    def on_press(key):
+        engine.handle_key_press(key, time.perf_counter_ns())
+
+    def on_release(key):
+        engine.handle_key_release(key, time.perf_counter_ns())
+
+    def on_click(x, y, button, pressed):
+        engine.handle_click(button, pressed, time.perf_counter_ns())
+
+    return engine, on_press, on_release, on_click
+
+def listener_hooks():
+    callbacks = {}
+    for listener in FakeListener.instances:
+        callbacks.update(listener.callbacks)
+    return callbacks
+
+def bench_startup():
+    from PySide6.QtWidgets import QApplication
+    import hellmacro_gui
+    patch_input()
+    hellmacro_gui.QMessageBox = FakeMessageBox
+    qt_app = QApplication.instance() or QApplication([])
+    start_ns = time.perf_counter_ns()
+    window = hellmacro_gui.MacroApp()
+    constructed_ns = time.perf_counter_ns()
+    window.finish_startup()
+    ready_ns = time.perf_counter_ns()
+    window.engine.shutdown()
+    window.close()
+    window.deleteLater()
+    qt_app.processEvents()
+    return {
+        "construct_ms": (constructed_ns - start_ns) / 1_000_000,
+        "finish_ms": (ready_ns - constructed_ns) / 1_000_000
+    }
+
+def key_events():
+    return [event for event in hellmacro.injector.events if not isinstance(event[1], Button)]
+
+def mouse_events():
+    return [event for event in hellmacro.injector.events if isinstance(event[1], Button)]
+
+def summarize(histogram):
+    summary = histogram.summary()
+    return {
+        "count": summary["count"],
+        "p50_us": summary["p50_ns"] / 1000,
+        "p95_us": summary["p95_ns"] / 1000,
+        "p99_us": summary["p99_ns"] / 1000,
+        "max_us": summary["max_ns"] / 1000
+    }
+
+def bench_search(repeats):
+    start_ns = time.perf_counter_ns()
+    index = hellmacro.StratagemIndex(hellmacro.STRATAGEM_DATA)
+    build_ns = time.perf_counter_ns() - start_ns
+    histogram = hellmacro.LatencyHistogram()
+    for _ in range(repeats):
+        for query in BENCH_SEARCHES:
+            start_ns = time.perf_counter_ns()
+            index.search(query)
+            histogram.record(time.perf_counter_ns() - start_ns)
+    return {"entries": len(index.entries), "build_us": build_ns / 1000, "search": summarize(histogram)}
+
+def bench_reload(engine, repeats):
+    # Cost of picking up a one-entry edit, as the catalog watcher does
+    catalog = hellmacro.STRATAGEM_DATA
+    name = BENCH_STRATAGEMS[0]
+    original = catalog.entries[name]
+    edited = hellmacro.StratagemEntry(name, original.category, original.directions + ("up",), original.color)
+    histogram = hellmacro.LatencyHistogram()
+    for i in range(repeats):
+        entries = dict(catalog.entries)
+        entries[name] = original if i % 2 else edited
+        start_ns = time.perf_counter_ns()
+        engine.apply_catalog(hellmacro.StratagemCatalog(entries, catalog.categories, catalog.problems))
+        histogram.record(time.perf_counter_ns() - start_ns)
+    engine.apply_catalog(catalog)
+    return {"apply_one_edit": summarize(histogram)}
+
+def bench_load(repeats):
+    # Cold start cost of stratagems.json: parsing and validating it versus
+    # a cache hit, and a touched file whose hash still matches the cache
+    parse = hellmacro.LatencyHistogram()
+    cached = hellmacro.LatencyHistogram()
+    rehashed = hellmacro.LatencyHistogram()
+    cache_path = "bench_stratagems.cache"
+    try:
+        for _ in range(repeats):
+            start_ns = time.perf_counter_ns()
+            with open("stratagems.json", "rb") as f:
+                hellmacro.normalize_catalog(json.loads(f.read()))
+            parse.record(time.perf_counter_ns() - start_ns)
+        hellmacro.load_catalog("stratagems.json", cache_path)
+        for _ in range(repeats):
+            start_ns = time.perf_counter_ns()
+            hellmacro.load_catalog("stratagems.json", cache_path)
+            cached.record(time.perf_counter_ns() - start_ns)
+        mtime_ns = os.stat("stratagems.json").st_mtime_ns
+        for i in range(repeats):
+            # Same contents, new mtime: hashed but not parsed
+            os.utime("stratagems.json", ns=(mtime_ns + i + 1, mtime_ns + i + 1))
+            start_ns = time.perf_counter_ns()
+            hellmacro.load_catalog("stratagems.json", cache_path)
+            rehashed.record(time.perf_counter_ns() - start_ns)
+    finally:
+        for path in (cache_path, cache_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+    return {"parse": summarize(parse), "cache_hit": summarize(cached), "hash_hit": summarize(rehashed)}
+
+def bench_profiles(count, repeats):
+    # Profile store with many profiles: loading the index, reading one
+    # profile on first use, and the GUI-thread and disk cost of one save
+    directory = "bench_profiles"
+    store = hellmacro.ProfileStore(directory)
+    for i in range(count):
+        store.put(f"Profile {i}", hellmacro.default_profile())
+    store.flush()
+    load = hellmacro.LatencyHistogram()
+    first_get = hellmacro.LatencyHistogram()
+    put = hellmacro.LatencyHistogram()
+    save = hellmacro.LatencyHistogram()
+    try:
+        for i in range(repeats):
+            store = hellmacro.ProfileStore(directory)
+            start_ns = time.perf_counter_ns()
+            store.load()
+            load.record(time.perf_counter_ns() - start_ns)
+            start_ns = time.perf_counter_ns()
+            data = store.get(f"Profile {i % count}")
+            first_get.record(time.perf_counter_ns() - start_ns)
+            start_ns = time.perf_counter_ns()
+            store.put(f"Profile {i % count}", dict(data, macro_delay=0.05 + i % 2 * 0.01))
+            put.record(time.perf_counter_ns() - start_ns)
+            start_ns = time.perf_counter_ns()
+            store.close()
+            save.record(time.perf_counter_ns() - start_ns)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "profiles": count,
+        "load_index": summarize(load),
+        "first_get": summarize(first_get),
+        "put": summarize(put),
+        "write_one": summarize(save)
+    }
+
+def bench_profile_switch(engine, on_press, switches):
+    # Hotkey profile switches, from the key event to the swapped bindings
+    for name, key in (("Bench A", "1"), ("Bench B", "2")):
+        profile = dict(hellmacro.default_profile(), switch_keybind=key)
+        profile["keybinds"] = ["g", "", "", "", ""]
+        profile["stratagems"] = [BENCH_STRATAGEMS[key == "2"]] + ["Select Stratagem"] * 4
+        engine.save_profile(name, profile)
+    engine.running_macro = True
+    keys = (KeyCode.from_char("1"), KeyCode.from_char("2"))
+    histogram = hellmacro.LatencyHistogram()
+    for i in range(switches):
+        start_ns = time.perf_counter_ns()
+        on_press(keys[i % 2])
+        histogram.record(time.perf_counter_ns() - start_ns)
+    engine.running_macro = False
+    for name in ("Bench A", "Bench B"):
+        engine.delete_profile(name)
+    return {"profiles": len(engine.prepared_profiles) + 2, "switch": summarize(histogram)}
+
+def bench_dispatch(engine, on_press, events):
+    engine.running_macro = True
+    key = KeyCode.from_char("z")
+    cpu_start = time.process_time()
+    start_ns = time.perf_counter_ns()
+    for _ in range(events):
+        on_press(key)
+    elapsed_ns = time.perf_counter_ns() - start_ns
+    return {
+        "events": events,
+        "events_per_s": events / (elapsed_ns / 1_000_000_000),
+        "ns_per_event": elapsed_ns / events,
+        "cpu_s": time.process_time() - cpu_start
+    }
+
+def bench_hooks(engine, events):
+    # Time spent inside the listener hooks, which only queue the event, and
+    # how long events wait for the input dispatcher at a fast typing pace
+    hooks = listener_hooks()
+    engine.running_macro = True
+    key = KeyCode.from_char("z")
+    cpu_start = time.process_time()
+    for _ in range(events):
+        hooks["on_press"](key)
+        hooks["on_release"](key)
+        time.sleep(HOOK_EVENT_INTERVAL)
+    engine.input_dispatcher.flush(timeout=5)
+    histograms = engine.metrics.histograms
+    return {
+        "events": events * 2,
+        "press_hook_time": summarize(histograms[("hook_time", "key_press")]),
+        "release_hook_time": summarize(histograms[("hook_time", "key_release")]),
+        "queue_delay": summarize(histograms[("hook_queue_delay", "handle_key_press")]),
+        "cpu_s": time.process_time() - cpu_start
+    }
+
+def bench_trigger(engine, on_press, on_release, triggers):
+    # The same stratagem bound to a plain key and to an Alt chord; Key.alt
+    # is used because it is a modifier on every pynput backend
+    engine.running_macro = True
+    engine.keybind_vars[0] = "g"
+    engine.stratagem_names[0] = BENCH_STRATAGEMS[0]
+    engine.keybind_vars[1] = "alt+g"
+    engine.stratagem_names[1] = BENCH_STRATAGEMS[0]
+    engine.rebuild_binding_index()
+    engine.macro_executor.policy = "latest"
+    key = KeyCode.from_char("g")
+    results = {}
+    cpu_start = time.process_time()
+    for name, modifier in (("trigger_cost", None), ("chord_trigger_cost", Key.alt)):
+        if modifier is not None:
+            on_press(modifier)
+        histogram = hellmacro.LatencyHistogram()
+        for _ in range(triggers):
+            start_ns = time.perf_counter_ns()
+            on_press(key)
+            histogram.record(time.perf_counter_ns() - start_ns)
+        if modifier is not None:
+            on_release(modifier)
+        results[name] = summarize(histogram)
+    results["cpu_s"] = time.process_time() - cpu_start
+    engine.macro_executor.cancel_all()
+    engine.macro_executor.wait_idle(timeout=5)
+    engine.macro_executor.policy = engine.macro_queue_policy
+    return results
+
+def bench_playback(engine, repeats):
+    event_error = hellmacro.LatencyHistogram()
+    total_error = hellmacro.LatencyHistogram()
+    cpu_start = time.process_time()
+    for name in BENCH_STRATAGEMS:
+        compiled = engine.compiled_stratagems[name]
+        expected_ns = int(engine.ctrl_lead_in * 1_000_000_000) + compiled.duration_ns
+        for _ in range(repeats):
+            hellmacro.injector.events = []
+            engine.run_macro_sequence(compiled, test_mode=True)
+            events = key_events()
+            ctrl_ns = events[0][0]
+            start_ns = ctrl_ns + int(engine.ctrl_lead_in * 1_000_000_000)
+            for (actual_ns, _, _), (offset_ns, _, _) in zip(events[1:], compiled.events):
+                event_error.record(actual_ns - (start_ns + offset_ns))
+            total_error.record(abs((events[-1][0] - ctrl_ns) - expected_ns))
+    return {
+        "event_error": summarize(event_error),
+        "total_duration_error": summarize(total_error),
+        "cpu_s": time.process_time() - cpu_start
+    }
+
+def bench_chain(engine, repeats):
+    # A chain of support and regular stratagems in one Ctrl hold against the
+    # same stratagems triggered one after another, Ctrl press to Ctrl release
+    compiled = hellmacro.StratagemChain("Bench Chain", BENCH_CHAIN).compile(engine.compiled_stratagems, engine.compiled_support)
+    parts = [engine.compiled_stratagems.get(name) or engine.compiled_support[name] for name in BENCH_CHAIN]
+    chain_time = hellmacro.LatencyHistogram()
+    separate_time = hellmacro.LatencyHistogram()
+    event_error = hellmacro.LatencyHistogram()
+    for _ in range(repeats):
+        hellmacro.injector.events = []
+        engine.run_macro_sequence(compiled, test_mode=True)
+        events = key_events()
+        chain_time.record(events[-1][0] - events[0][0])
+        start_ns = events[0][0] + int(engine.ctrl_lead_in * 1_000_000_000)
+        for (actual_ns, _, _), (offset_ns, _, _) in zip(events[1:], compiled.events):
+            event_error.record(actual_ns - (start_ns + offset_ns))
+        hellmacro.injector.events = []
+        for part in parts:
+            engine.run_macro_sequence(part, test_mode=True)
+        events = key_events()
+        separate_time.record(events[-1][0] - events[0][0])
+    return {
+        "stratagems": len(BENCH_CHAIN),
+        "chain": summarize(chain_time),
+        "separate": summarize(separate_time),
+        "saved_ms": (separate_time.summary()["p50_ns"] - chain_time.summary()["p50_ns"]) / 1_000_000,
+        "event_error": summarize(event_error)
+    }
+
+def bench_recording(engine, on_press, on_release, repeats):
+    # Records WASD presses with real timing and a long pause, then saves,
+    # reloads and replays the recording
+    engine.start_recording()
+    for burst in ("wasd", "dsaw"):
+        for char in burst:
+            key = KeyCode.from_char(char)
+            on_press(key)
+            time.sleep(0.03)
+            on_release(key)
+            time.sleep(0.02)
+        time.sleep(RECORDING_PAUSE)
+    recorder = engine.stop_recording()
+
+    start_ns = time.perf_counter_ns()
+    timeline, rounding_ns = hellmacro.compress_recording(recorder.events)
+    compress_ns = time.perf_counter_ns() - start_ns
+    start_ns = time.perf_counter_ns()
+    engine.save_recording("Bench Recording", recorder)
+    save_ns = time.perf_counter_ns() - start_ns
+
+    compiled = engine.compiled_stratagems["Bench Recording"]
+    for _ in range(repeats):
+        engine.run_macro_sequence(compiled, test_mode=True)
+    drift = engine.metrics.histograms.get(("playback_drift", "Bench Recording"), hellmacro.LatencyHistogram())
+    return {
+        "events": len(timeline),
+        "recorded_s": (recorder.events[-1][0] - recorder.events[0][0]) / 1_000_000_000,
+        "compressed_s": timeline[-1][0] / 1000,
+        "rounding_error_ms": rounding_ns / 1_000_000,
+        "compress_us": compress_ns / 1000,
+        "save_and_reload_ms": save_ns / 1_000_000,
+        "playback_drift": summarize(drift)
+    }
+
+def bench_railgun(engine, on_click, repeats, timeout):
+    engine.running_macro = True
+    engine.set_weapon_fallback("railgun", False)
+    engine.set_weapon_setting("railgun", "timeout", timeout)
+    engine.set_weapon_enabled("railgun", True)
+    release_delay_ns = engine.weapons["railgun"].steps[0][0]
+    histogram = hellmacro.LatencyHistogram()
+    cpu_start = time.process_time()
+    for _ in range(repeats):
+        hellmacro.injector.events = []
+        on_click(0, 0, Button.left, True)
+        target_ns = engine.held_buttons["left"] + release_delay_ns
+        deadline = time.perf_counter() + timeout + 1
+        while not mouse_events() and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        if mouse_events():
+            histogram.record(mouse_events()[0][0] - target_ns)
+        on_click(0, 0, Button.left, False)
+        time.sleep(0.05)
+    engine.set_weapon_enabled("railgun", False)
+    step_error = engine.metrics.histograms.get(("weapon_step_error", engine.weapons["railgun"].spec.name), hellmacro.LatencyHistogram())
+    return {"release_error": summarize(histogram), "step_error": summarize(step_error), "cpu_s": time.process_time() - cpu_start}
+
+def bench_arc_thrower(engine, on_click, duration, delay):
+    engine.running_macro = True
+    engine.set_weapon_setting("arc_thrower", "hold", delay)
+    engine.set_weapon_enabled("arc_thrower", True)
+
+    wakeups_start = arc_thrower_wakeups(engine)
+    cpu_start = time.process_time()
+    time.sleep(1)
+    idle_cpu_s = time.process_time() - cpu_start
+    idle_wakeups = arc_thrower_wakeups(engine) - wakeups_start
+
+    hellmacro.injector.events = []
+    cpu_start = time.process_time()
+    on_click(0, 0, Button.left, True)
+    click_ns = engine.held_buttons["left"]
+    time.sleep(duration)
+    on_click(0, 0, Button.left, False)
+    active_cpu_s = time.process_time() - cpu_start
+
+    releases = [t for t, key, pressed in mouse_events() if key == Button.left and not pressed]
+    first_cycle = hellmacro.LatencyHistogram()
+    cycle_error = hellmacro.LatencyHistogram()
+    delay_ns = int(delay * 1_000_000_000)
+    period_ns = int((delay + engine.weapons["arc_thrower"].settings["gap"]) * 1_000_000_000)
+    if releases:
+        first_cycle.record(abs(releases[0] - (click_ns + delay_ns)))
+    for previous, current in zip(releases, releases[1:]):
+        cycle_error.record(abs((current - previous) - period_ns))
+
+    engine.set_weapon_enabled("arc_thrower", False)
+    return {
+        "cycles": len(releases),
+        "first_cycle_error": summarize(first_cycle),
+        "cycle_period_error": summarize(cycle_error),
+        "idle_cpu_s_per_s": idle_cpu_s,
+        "idle_wakeups": idle_wakeups,
+        "active_cpu_s": active_cpu_s
+    }
+
+def stuck_keys():
+    # Keys whose last injected event is a press
+    last = {}
+    for _, key, pressed in hellmacro.injector.events:
+        last[key] = pressed
+    return sorted(str(key) for key, pressed in last.items() if pressed)
+
+def bench_stop(engine, on_click, repeats):
+    # Stops the macro system in the middle of a long sequence, and of an arc
+    # thrower pattern, and times stop_all_threads until the keys are up
+    engine.running_macro = True
+    compiled = engine.compiled_stratagems["Orbital 380mm HE Barrage"]
+    midway = engine.ctrl_lead_in + compiled.duration_ns / 2_000_000_000
+    sequence = hellmacro.LatencyHistogram()
+    weapon = hellmacro.LatencyHistogram()
+    stuck = []
+    for _ in range(repeats):
+        hellmacro.injector.events = []
+        engine.macro_executor.submit((compiled, None, "bench", False))
+        time.sleep(midway)
+        start_ns = time.perf_counter_ns()
+        engine.stop_all_threads()
+        sequence.record(time.perf_counter_ns() - start_ns)
+        stuck += stuck_keys()
+
+    engine.set_weapon_setting("arc_thrower", "hold", 0.2)
+    engine.set_weapon_enabled("arc_thrower", True)
+    for _ in range(repeats):
+        hellmacro.injector.events = []
+        on_click(0, 0, Button.left, True)
+        time.sleep(0.3)
+        start_ns = time.perf_counter_ns()
+        engine.stop_all_threads()
+        weapon.record(time.perf_counter_ns() - start_ns)
+        stuck += stuck_keys()
+        on_click(0, 0, Button.left, False)
+    engine.set_weapon_enabled("arc_thrower", False)
+    return {
+        "sequence": summarize(sequence),
+        "weapon": summarize(weapon),
+        "cleanup": summarize(engine.metrics.histograms.get(("stop_latency", "sequence"), hellmacro.LatencyHistogram())),
+        "stuck_keys": stuck
+    }
+
+def arc_thrower_wakeups(engine):
+    # Every fired arc thrower deadline records one lateness sample
+    histogram = engine.metrics.histograms.get(("scheduler_lateness", "arc_thrower"))
+    return histogram.count if histogram is not None else 0
+
+def scheduler_lateness(engine):
+    # How late the deadline scheduler fired, per kind of deadline, over all
+    # of the benchmarks above
+    return {
+        label: summarize(histogram)
+        for (metric, label), histogram in sorted(engine.metrics.histograms.items()) if metric == "scheduler_lateness"
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)["results"]
+
+    def walk(path, new, old):
+        if isinstance(new, dict) and isinstance(old, dict):
+            for key in new:
+                if key in old:
+                    walk(f"{path}.{key}" if path else key, new[key], old[key])
+        elif isinstance(new, (int, float)) and isinstance(old, (int, float)) and old:
+            print(f"{path:60s} {old:14.3f} -> {new:14.3f} ({(new - old) / old * 100:+.1f}%)")
+
+    walk("", results, baseline)
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the Helldivers 2 macro engine")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file to write results to")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    parser.add_argument("--events", type=int, default=100000, help="Unbound key events for the dispatch benchmark")
+    parser.add_argument("--triggers", type=int, default=2000, help="Bound key events for the trigger benchmark")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeats per stratagem / railgun shot")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    workdir = tempfile.mkdtemp(prefix="hellmacro-bench-")
+    for data_file in ("stratagems.json", "weapons.json"):
+        shutil.copy(os.path.join(REPO_DIR, data_file), workdir)
+    os.chdir(workdir)
+    try:
+        startup = bench_startup()
+        engine, on_press, on_release, on_click = create_engine()
+        results = {
+            "startup": startup,
+            "load": bench_load(200),
+            "search": bench_search(1000),
+            "reload": bench_reload(engine, 200),
+            "profiles": bench_profiles(500, 50),
+            "profile_switch": bench_profile_switch(engine, on_press, 1000),
+            "dispatch": bench_dispatch(engine, on_press, args.events),
+            "hooks": bench_hooks(engine, args.triggers),
+            "trigger": bench_trigger(engine, on_press, on_release, args.triggers),
+            "playback": bench_playback(engine, args.repeats),
+            "chain": bench_chain(engine, args.repeats),
+            "recording": bench_recording(engine, on_press, on_release, args.repeats),
+            "railgun": bench_railgun(engine, on_click, args.repeats, timeout=0.3),
+            "arc_thrower": bench_arc_thrower(engine, on_click, duration=2.0, delay=0.2),
+            "stop": bench_stop(engine, on_click, args.repeats)
+        }
+        results["scheduler_lateness"] = scheduler_lateness(engine)
+        engine.shutdown()
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(json.dumps(results, indent=4))
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,44 @@
+import time
+
+# Startup is measured from the first line of the module
+STARTUP_T0_NS = time.perf_counter_ns()
+
+import os
 import sys
 import json
+import marshal
+import hashlib
+import heapq
+import signal
+import argparse
+import importlib.util
 import threading
-import time
+import queue
 import logging
-from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QTabWidget, QWidget,
-    QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QLineEdit, QGridLayout, QTextEdit,
-    QStyledItemDelegate, QMessageBox, QCheckBox
-)
-from PySide6.QtCore import Qt, Signal, QObject, QTimer
-from PySide6.QtGui import QStandardItemModel, QStandardItem, QColor, QPalette
-from pynput.keyboard import Controller as KeyboardController, Key, Listener as KeyboardListener
-from pynput import mouse as pynput_mouse
-from pynput.mouse import Controller as MouseController, Button
-
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(message)s')
+from abc import ABC, abstractmethod
+from collections import deque
+
+# pynput is imported by load_pynput() once the window is up: importing it
+# connects to the input system, which is slow on some platforms
+Key = KeyCode = Button = None
+KeyboardController = MouseController = KeyboardListener = pynput_mouse = None
+
+# Setup logging: one logger per subsystem, configured by configure_logging()
+log = logging.getLogger("hellmacro")
+listener_log = logging.getLogger("hellmacro.listener")
+executor_log = logging.getLogger("hellmacro.executor")
+weapons_log = logging.getLogger("hellmacro.weapons")
+profiles_log = logging.getLogger("hellmacro.profiles")
+LOG_SUBSYSTEMS = {
+    "listener": listener_log,
+    "executor": executor_log,
+    "weapons": weapons_log,
+    "profiles": profiles_log
+}
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+LOG_FORMAT = "[%(asctime)s] %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Define support stratagems
 SUPPORT_STRATAGEMS = {
@@ -27,1327 +49,3120 @@ SUPPORT_STRATAGEMS = {
     "Eagle Rearm": ["up", "up", "left", "up", "right"]
 }
 
-# Initialize globals as empty
-STRATAGEM_DATA = {}
-PROFILES = {}
-LAST_PROFILE = "Default"
+# Direction tokens accepted in stratagem sequences, filled by load_pynput()
+DIRECTION_KEYS = {}
+
+# Time from process start until the window is usable
+STARTUP_BUDGET_MS = 500
+
+# The deadline scheduler sleeps until this close to a deadline, then spins
+SPIN_THRESHOLD_NS = 2_000_000
+DEFAULT_CTRL_LEAD_IN = 0.05
+
+# Stratagem chains play several sequences in one Ctrl hold, this many
+# seconds apart on top of the key delay that already ends each sequence
+DEFAULT_CHAIN_GAP = 0.0
+MAX_CHAIN_GAP = 2.0
+
+# Logs tab: records are buffered and flushed to the view in batches
+LOG_FLUSH_INTERVAL_MS = 100
+DEFAULT_LOG_MAX_LINES = 2000
+
+# Mouse buttons weapons.json patterns can use, as "mouse:<button>"
+MOUSE_BUTTONS = ("left", "middle", "right", "x1", "x2")
+
+# Latency histograms keep 2^HISTOGRAM_SUB_BITS linear buckets per power of two
+HISTOGRAM_SUB_BITS = 5
+METRICS_REFRESH_INTERVAL_MS = 1000
+
+# Hook run times waiting to be recorded by the input dispatcher; older ones
+# are dropped if it falls behind
+HOOK_TIME_BACKLOG = 4096
+
+# Policies for stratagem triggers that arrive while a sequence is running
+MACRO_QUEUE_POLICIES = ("drop", "queue", "latest", "preempt")
+DEFAULT_MACRO_QUEUE_POLICY = "queue"
+MACRO_QUEUE_SIZE = 8
+
+# stratagems.json is polled this often and reloaded once it has been
+# unchanged for the debounce time, so a save in progress is never read
+CATALOG_POLL_INTERVAL = 0.5
+CATALOG_RELOAD_DEBOUNCE = 0.3
+
+# Validated catalog cache; bump the version when StratagemEntry changes
+CATALOG_CACHE_FILE = "stratagems.cache"
+CATALOG_CACHE_VERSION = 2
+DEFAULT_STRATAGEM_COLOR = "#ECEFF1"
+
+# Macro recorder: pauses with no key held longer than RECORDING_MAX_GAP_MS
+# are shortened to it and offsets are rounded to RECORDING_QUANTUM_MS
+RECORDING_QUANTUM_MS = 5
+RECORDING_MAX_GAP_MS = 250
+RECORDING_CATEGORY = "Recorded"
+
+# Profiles are kept one file per profile in PROFILES_DIR; saves are written
+# in the background once no change has come in for PROFILE_WRITE_DELAY
+PROFILES_DIR = "profiles"
+PROFILE_WRITE_DELAY = 0.2
+
+# Hotkeys that switch profiles; the switch key belongs to the active
+# profile, next/previous are shared by all profiles and kept in the index
+PROFILE_HOTKEY_LABELS = {
+    "profile_switch": "Switch to Profile",
+    "next_profile": "Next Profile",
+    "previous_profile": "Previous Profile"
+}
+
+# Profile keys from before weapons.json, as (weapon, field, setting)
+LEGACY_WEAPON_KEYS = {
+    "railgun_keybind": ("railgun", "keybind", None),
+    "railgun_timeout": ("railgun", "settings", "timeout"),
+    "railgun_use_keyboard_fallback": ("railgun", "use_fallback", None),
+    "arc_thrower_keybind": ("arc_thrower", "keybind", None),
+    "arc_thrower_delay": ("arc_thrower", "settings", "hold"),
+    "arc_thrower_repress_gap": ("arc_thrower", "settings", "gap")
+}
+
+# Initialize globals as empty; STRATAGEM_DATA is a StratagemCatalog and
+# WEAPON_CATALOG a WeaponCatalog once loaded
+STRATAGEM_DATA = None
+WEAPON_CATALOG = None
 
-keyboard = KeyboardController()
-mouse = MouseController()
+injector = None
 mouse_listener = None
 keyboard_listener = None
 
-class SignalHandler(QObject):
-    show_warning = Signal(str)
-    log_message = Signal(str)
-    blink = Signal()
+# Keys that can never be used as keybinds
+RESERVED_KEYS = ("esc", "enter", "tab")
+
+# Chord keybinds such as "shift+f" or "alt+x2" hold modifiers as a bitmask.
+# Each modifier owns one bit for its left key and one for its right key, and
+# a chord mask sets both bits of every modifier it needs.
+MOD_SHIFT = 0x03
+MOD_CTRL = 0x0C
+MOD_ALT = 0x30
+# In the order they are written in a chord
+CHORD_MODIFIERS = (("ctrl", MOD_CTRL), ("shift", MOD_SHIFT), ("alt", MOD_ALT))
+CHORD_MODIFIER_BITS = dict(CHORD_MODIFIERS)
+MODIFIER_KEY_BITS = {
+    "shift": 0x01, "shift_l": 0x01, "shift_r": 0x02,
+    "ctrl": 0x04, "ctrl_l": 0x04, "ctrl_r": 0x08,
+    "alt": 0x10, "alt_l": 0x10, "alt_r": 0x20
+}
 
-class ColorDelegate(QStyledItemDelegate):
-    def initStyleOption(self, option, index):
-        super().initStyleOption(option, index)
-        color = index.data(Qt.UserRole)
-        if color:
-            option.palette.setColor(QPalette.Text, QColor(color))
+# Canonical key IDs, computed once per key. Key and Button members are
+# enums and hash cheaply; a KeyCode hashes its repr, so it is cached by
+# (vk, char), which is all its str() depends on.
+_KEY_ID_CACHE = {}
+
+def key_id(key):
+    cache_key = (key.vk, key.char) if isinstance(key, KeyCode) else key
+    kid = _KEY_ID_CACHE.get(cache_key)
+    if kid is None:
+        kid = str(key).replace("Key.", "").replace("Button.", "").replace("'", "").lower()
+        _KEY_ID_CACHE[cache_key] = kid
+    return kid
+
+def chord_modifiers(held):
+    # Chord mask for a bitmask of held modifier keys
+    mask = 0
+    for _, bits in CHORD_MODIFIERS:
+        if held & bits:
+            mask |= bits
+    return mask
+
+def parse_chord(binding):
+    # "ctrl+shift+f" -> (MOD_CTRL | MOD_SHIFT, "f"); a plain key has mask 0.
+    # Only leading modifier names count, so "shift++" binds Shift and "+".
+    mask = 0
+    kid = binding
+    while True:
+        name, sep, rest = kid.partition("+")
+        bits = CHORD_MODIFIER_BITS.get(name)
+        if not sep or bits is None or not rest:
+            return mask, kid
+        mask |= bits
+        kid = rest
+
+def chord_name(mask, kid):
+    return "+".join([name for name, bits in CHORD_MODIFIERS if mask & bits] + [kid])
+
+class BoundAction:
+    __slots__ = ("kind", "name", "sequence")
+
+    def __init__(self, kind, name=None, sequence=None):
+        self.kind = kind
+        self.name = name
+        self.sequence = sequence
+
+def load_pynput():
+    global Key, KeyCode, Button, KeyboardController, MouseController, KeyboardListener, pynput_mouse
+    if Key is not None:
+        return
+    from pynput import keyboard as pynput_keyboard, mouse
+    Key = pynput_keyboard.Key
+    KeyCode = pynput_keyboard.KeyCode
+    KeyboardController = pynput_keyboard.Controller
+    KeyboardListener = pynput_keyboard.Listener
+    pynput_mouse = mouse
+    Button = mouse.Button
+    MouseController = mouse.Controller
+    DIRECTION_KEYS.update({
+        "up": Key.up,
+        "down": Key.down,
+        "left": Key.left,
+        "right": Key.right
+    })
+
+class Injector(ABC):
+    # Output backend for synthetic input. press/release take a pynput Key,
+    # KeyCode, character or mouse Button; send_batch submits several
+    # (key, pressed) events that are due at the same instant with one flush.
+    name = "base"
+
+    @classmethod
+    def available(cls):
+        return True
+
+    @abstractmethod
+    def press(self, key):
+        pass
+
+    @abstractmethod
+    def release(self, key):
+        pass
+
+    def send_batch(self, events):
+        for key, pressed in events:
+            if pressed:
+                self.press(key)
+            else:
+                self.release(key)
+
+    def close(self):
+        pass
+
+class PynputInjector(Injector):
+    name = "pynput"
 
-class MacroApp(QMainWindow):
     def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Helldivers 2 Macro")
-        self.setMinimumSize(800, 600)
-
-        self.load_data_files()
-
-        self.active_keybind = None
-        self.running_macro = False
-        self.railgun_safety = False
-        self.left_click_active = False
-        self.left_click_time = 0
-        self.railgun_timeout = 2.95
-        self.railgun_debounce = 0.2
-        self.last_railgun_release = 0
-        self.arc_thrower_rapidfire = False
-        self.arc_thrower_delay = 1.05
-        self.arc_thrower_thread = None
-        self.macro_thread = None
-        self.railgun_timer = None
-        self.railgun_keybind = ""
-        self.arc_thrower_keybind = ""
-        self.last_toggle_time = {"railgun": 0, "arc_thrower": 0}
-        self.toggle_debounce = 0.2
-        self.railgun_use_keyboard_fallback = False
-        self.macro_delay = 0.05
+        self.keyboard = KeyboardController()
+        self.mouse = MouseController()
 
-        self.signal_handler = SignalHandler()
-        self.signal_handler.show_warning.connect(self.show_warning_message)
-        self.signal_handler.log_message.connect(self.append_log)
-        self.signal_handler.blink.connect(self.blink_indicator)
-
-        self.central_widget = QWidget()
-        self.setCentralWidget(self.central_widget)
-        self.main_layout = QVBoxLayout(self.central_widget)
-        self.main_layout.setContentsMargins(10, 10, 10, 10)
-        self.main_layout.setSpacing(10)
-
-        self.setStyleSheet("""
-            QMainWindow { background-color: #263238; color: #ECEFF1; }
-            QTabWidget::pane { border: 1px solid #455A64; background: #37474F; }
-            QTabBar::tab { 
-                background: #455A64; 
-                color: #ECEFF1; 
-                padding: 8px 16px; 
-                margin-right: 2px;
-                border-top-left-radius: 4px;
-                border-top-right-radius: 4px;
-            }
-            QTabBar::tab:selected { 
-                background: #37474F; 
-                border-bottom: 2px solid #4FC3F7;
-                color: #E1F5FE;
-            }
-            QLabel { color: #ECEFF1; font-size: 14px; }
-            QPushButton { 
-                background-color: #546E7A; 
-                color: #ECEFF1; 
-                padding: 3px 8px; 
-                border: none;
-                border-radius: 4px;
-                font-size: 11px;
-                min-height: 24px;
-                white-space: nowrap;
-            }
-            QPushButton:hover { background-color: #78909C; }
-            QPushButton:pressed { background-color: #455A64; }
-            QPushButton[clear="true"] { 
-                background-color: #EF5350; 
-                color: #FFFFFF; 
-                padding: 3px 8px; 
-                border-radius: 4px;
-                min-height: 24px;
-                white-space: nowrap;
-            }
-            QComboBox { 
-                background-color: #546E7A; 
-                color: #ECEFF1; 
-                border: none;
-                padding: 3px 8px;
-                border-radius: 4px;
-                font-size: 11px;
-                min-height: 24px;
-                white-space: nowrap;
-            }
-            QComboBox::drop-down { 
-                border: none;
-                width: 20px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #37474F;
-                color: #ECEFF1;
-                selection-background-color: #4FC3F7;
-            }
-            QLineEdit { 
-                background-color: #546E7A; 
-                color: #ECEFF1; 
-                border: none;
-                padding: 3px 8px;
-                border-radius: 4px;
-                font-size: 11px;
-                min-height: 24px;
-            }
-            QTextEdit {
-                background-color: #1E272C;
-                color: #ECEFF1;
-                border: 1px solid #455A64;
-                padding: 5px;
-                font-family: Consolas, "Courier New", monospace;
-                font-size: 12px;
-            }
-            QCheckBox { 
-                color: #ECEFF1; 
-                font-size: 12px;
-                spacing: 5px;
-            }
-            QCheckBox::indicator {
-                width: 18px;
-                height: 18px;
-                background-color: #546E7A;
-                border: 1px solid #455A64;
-                border-radius: 3px;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #4CAF50;
-                border: 1px solid #455A64;
-            }
-        """)
+    def press(self, key):
+        if isinstance(key, Button):
+            self.mouse.press(key)
+        else:
+            self.keyboard.press(key)
 
-        self.tab_widget = QTabWidget()
-        self.main_layout.addWidget(self.tab_widget)
+    def release(self, key):
+        if isinstance(key, Button):
+            self.mouse.release(key)
+        else:
+            self.keyboard.release(key)
+
+# X keysym names for pynput keys whose name does not map by capitalization
+XTEST_KEYSYMS = {
+    "ctrl": "Control_L", "ctrl_l": "Control_L", "ctrl_r": "Control_R",
+    "shift": "Shift_L", "shift_l": "Shift_L", "shift_r": "Shift_R",
+    "alt": "Alt_L", "alt_l": "Alt_L", "alt_r": "Alt_R", "alt_gr": "ISO_Level3_Shift",
+    "cmd": "Super_L", "cmd_l": "Super_L", "cmd_r": "Super_R",
+    "enter": "Return", "esc": "Escape", "space": "space", "backspace": "BackSpace",
+    "page_up": "Prior", "page_down": "Next", "caps_lock": "Caps_Lock"
+}
+XTEST_BUTTONS = {"left": 1, "middle": 2, "right": 3, "x1": 8, "x2": 9}
 
-        self.stratagems_tab = QWidget()
-        self.weapons_tab = QWidget()
-        self.support_tab = QWidget()
-        self.logs_tab = QWidget()
-        self.tab_widget.addTab(self.stratagems_tab, "Stratagems")
-        self.tab_widget.addTab(self.weapons_tab, "Weapons")
-        self.tab_widget.addTab(self.support_tab, "Support")
-        self.tab_widget.addTab(self.logs_tab, "Logs")
+class XTestInjector(Injector):
+    # Linux/X11: queues events with the XTEST extension and flushes a whole
+    # batch with a single round trip to the X server.
+    name = "xtest"
 
-        self.keybind_vars = [""] * 5
-        self.support_keybind_vars = [""] * len(SUPPORT_STRATAGEMS)
-        self.keybind_buttons = []
-        self.stratagem_combos = []
-        self.stratagem_outputs = []
-        self.delete_keybind_buttons = []
-        self.support_keybind_buttons = []
-        self.support_outputs = []
-        self.support_delete_keybind_buttons = []
-        self.support_test_buttons = []
-
-        self.create_stratagems_tab()
-        self.create_weapons_tab()
-        self.create_support_tab()
-        self.create_logs_tab()
-        self.create_profile_section()
-
-        toggle_hbox = QHBoxLayout()
-        toggle_hbox.addStretch()
-        self.toggle_button = QPushButton("▶ Start")
-        self.toggle_button.setToolTip("Start or stop the macro system")
-        self.toggle_button.setStyleSheet("background-color: #4CAF50; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;")
-        self.toggle_button.clicked.connect(self.toggle_macro)
-        toggle_hbox.addWidget(self.toggle_button)
-        self.macro_indicator = QLabel()
-        self.macro_indicator.setFixedSize(20, 20)
-        self.macro_indicator.setStyleSheet("background-color: red; border-radius: 10px;")
-        toggle_hbox.addWidget(self.macro_indicator)
-        toggle_hbox.addStretch()
-        self.main_layout.addLayout(toggle_hbox)
-
-        QMessageBox.warning(self, "Important Notice", "This tool is for personal use only. Please check Helldivers 2 Terms of Service regarding macros.")
-
-        self.load_profile(LAST_PROFILE)
-        self.start_listeners()
+    @classmethod
+    def available(cls):
+        return sys.platform.startswith("linux") and importlib.util.find_spec("Xlib") is not None
 
-    def load_data_files(self):
-        global STRATAGEM_DATA, PROFILES, LAST_PROFILE
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.XK = XK
+        self.xtest = xtest
+        self.display = display.Display()
+        self.keycodes = {}
+
+    def keycode(self, key):
+        code = self.keycodes.get(key)
+        if code is None:
+            if isinstance(key, Key):
+                keysym = self.XK.string_to_keysym(XTEST_KEYSYMS.get(key.name, key.name.capitalize()))
+            elif isinstance(key, KeyCode):
+                keysym = self.XK.string_to_keysym(key.char) if key.char else key.vk
+            else:
+                keysym = self.XK.string_to_keysym(key)
+            code = self.display.keysym_to_keycode(keysym)
+            if not code:
+                raise ValueError(f"No X keycode for {key}")
+            self.keycodes[key] = code
+        return code
+
+    def queue(self, key, pressed):
+        if isinstance(key, Button):
+            event = self.X.ButtonPress if pressed else self.X.ButtonRelease
+            self.xtest.fake_input(self.display, event, XTEST_BUTTONS[key.name])
+        else:
+            event = self.X.KeyPress if pressed else self.X.KeyRelease
+            self.xtest.fake_input(self.display, event, self.keycode(key))
+
+    def press(self, key):
+        self.queue(key, True)
+        self.display.sync()
+
+    def release(self, key):
+        self.queue(key, False)
+        self.display.sync()
+
+    def send_batch(self, events):
+        for key, pressed in events:
+            self.queue(key, pressed)
+        self.display.sync()
+
+    def close(self):
+        self.display.close()
+
+# evdev code names for pynput keys that do not map to KEY_<NAME>
+UINPUT_KEYS = {
+    "ctrl": "KEY_LEFTCTRL", "ctrl_l": "KEY_LEFTCTRL", "ctrl_r": "KEY_RIGHTCTRL",
+    "shift": "KEY_LEFTSHIFT", "shift_l": "KEY_LEFTSHIFT", "shift_r": "KEY_RIGHTSHIFT",
+    "alt": "KEY_LEFTALT", "alt_l": "KEY_LEFTALT", "alt_r": "KEY_RIGHTALT", "alt_gr": "KEY_RIGHTALT",
+    "cmd": "KEY_LEFTMETA", "cmd_l": "KEY_LEFTMETA", "cmd_r": "KEY_RIGHTMETA",
+    "page_up": "KEY_PAGEUP", "page_down": "KEY_PAGEDOWN", "caps_lock": "KEY_CAPSLOCK"
+}
+UINPUT_BUTTONS = {"left": "BTN_LEFT", "middle": "BTN_MIDDLE", "right": "BTN_RIGHT", "x1": "BTN_SIDE", "x2": "BTN_EXTRA"}
 
-        # Load stratagems.json
-        try:
-            with open("stratagems.json", "r") as f:
-                STRATAGEM_DATA = json.load(f)
-        except FileNotFoundError:
-            QMessageBox.warning(self, "Warning", "stratagems.json not found, creating basic file.")
-            basic_stratagems = {
-                "Machine Gun": {
-                    "sequence": ["down", "left", "down", "up", "right"],
-                    "color": "#FF0000"
-                },
-                "Anti-Materiel Rifle": {
-                    "sequence": ["down", "left", "right", "up", "down"],
-                    "color": "#00FF00"
-                },
-                "Eagle Airstrike": {
-                    "sequence": ["up", "right", "down", "right"],
-                    "color": "#FF4500"
-                },
-                "Orbital Precision Strike": {
-                    "sequence": ["right", "right", "up"],
-                    "color": "#FFA500"
-                },
-            }
-            with open("stratagems.json", "w") as f:
-                json.dump(basic_stratagems, f, indent=4)
-            STRATAGEM_DATA = basic_stratagems
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding stratagems.json: {e}")
-            STRATAGEM_DATA = {}
-
-        # Load profiles.json
-        try:
-            with open("profiles.json", "r") as f:
-                PROFILES = json.load(f)
-        except FileNotFoundError:
-            PROFILES = {
-                "Default": {
-                    "keybinds": [""] * 5,
-                    "stratagems": ["Select Stratagem"] * 5,
-                    "support_keybinds": [""] * len(SUPPORT_STRATAGEMS),
-                    "railgun_timeout": 2.95,
-                    "arc_thrower_delay": 1.05,
-                    "railgun_keybind": "",
-                    "arc_thrower_keybind": "",
-                    "railgun_use_keyboard_fallback": False,
-                    "macro_delay": 0.05
-                }
-            }
-            try:
-                with open("profiles.json", "w") as f_out:
-                    json.dump(PROFILES, f_out, indent=4)
-            except Exception as e:
-                logging.error(f"Error creating profiles.json: {e}")
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding profiles.json: {e}")
-            PROFILES = {}
+class UInputInjector(Injector):
+    # Linux kernel uinput device (works under Wayland, needs write access to
+    # /dev/uinput). A batch is written and committed with a single SYN_REPORT.
+    name = "uinput"
 
-        # Load last_profile.json
-        try:
-            with open("last_profile.json", "r") as f:
-                LAST_PROFILE = json.load(f).get("last_profile", "Default")
-        except FileNotFoundError:
-            LAST_PROFILE = "Default"
-
-    def create_stratagems_tab(self):
-        layout = QGridLayout(self.stratagems_tab)
-        layout.setSpacing(10)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        label = QLabel("Assign Stratagems")
-        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
-        layout.addWidget(label, 0, 0, 1, 3)
-
-        reload_button = QPushButton("Reload Stratagems")
-        reload_button.setToolTip("Reload stratagems from stratagems.json without restarting")
-        reload_button.clicked.connect(self.reload_stratagems)
-        layout.addWidget(reload_button, 0, 2, 1, 1, alignment=Qt.AlignRight)
-
-        strat_labels = ["Stratagem 1", "Stratagem 2", "Stratagem 3", "Stratagem 4", "EXTRA 5"]
-        all_stratagems = list(STRATAGEM_DATA.keys())
-
-        for i, strat_label in enumerate(strat_labels):
-            frame = QWidget()
-            frame_layout = QVBoxLayout(frame)
-            frame_layout.setContentsMargins(0, 4, 0, 4)
-            frame_layout.setSpacing(4)
-
-            label = QLabel(strat_label)
-            label.setStyleSheet("font-size: 16px; font-weight: bold;")
-            frame_layout.addWidget(label)
-
-            button_combo_frame = QWidget()
-            button_combo_layout = QHBoxLayout(button_combo_frame)
-            button_combo_layout.setContentsMargins(0, 0, 0, 0)
-            button_combo_layout.setSpacing(8)
-
-            keybind_button = QPushButton("Set Keybind")
-            keybind_button.setFixedWidth(120)
-            keybind_button.setToolTip("Assign a key or mouse button for this stratagem")
-            keybind_button.clicked.connect(lambda checked, idx=i: self.set_keybind(idx))
-            button_combo_layout.addWidget(keybind_button)
-            self.keybind_buttons.append(keybind_button)
-
-            del_button = QPushButton("Clear")
-            del_button.setFixedWidth(60)
-            del_button.setProperty("clear", True)
-            del_button.clicked.connect(lambda checked, idx=i: self.delete_keybind(idx))
-            button_combo_layout.addWidget(del_button)
-            self.delete_keybind_buttons.append(del_button)
-
-            combo = QComboBox()
-            combo.setFixedWidth(250)
-            model = QStandardItemModel()
-            item = QStandardItem("Select Stratagem")
-            item.setForeground(QColor("#ECEFF1"))
-            item.setData("#ECEFF1", Qt.UserRole)
-            model.appendRow(item)
-            for strat in all_stratagems:
-                item = QStandardItem(strat)
-                color = STRATAGEM_DATA[strat].get("color", "#ECEFF1") if isinstance(STRATAGEM_DATA[strat], dict) else "#ECEFF1"
-                item.setForeground(QColor(color))
-                item.setData(color, Qt.UserRole)
-                model.appendRow(item)
-            combo.setModel(model)
-            combo.setItemDelegate(ColorDelegate())
-            combo.view().setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-            combo.currentTextChanged.connect(lambda value, idx=i: self.update_stratagem_output(idx))
-            button_combo_layout.addWidget(combo)
-            self.stratagem_combos.append(combo)
-
-            test_button = QPushButton("Test")
-            test_button.setFixedWidth(60)
-            test_button.setToolTip("Test this stratagem sequence")
-            test_button.clicked.connect(lambda checked, idx=i: self.test_stratagem(idx))
-            button_combo_layout.addWidget(test_button)
-
-            button_combo_layout.addStretch()
-            frame_layout.addWidget(button_combo_frame)
-
-            output_frame = QWidget()
-            output_layout = QHBoxLayout(output_frame)
-            output_layout.setContentsMargins(0, 0, 0, 0)
-            output_layout.setSpacing(8)
-
-            output_label = QLabel("")
-            output_layout.addWidget(output_label)
-            self.stratagem_outputs.append(output_label)
-            output_layout.addStretch()
-
-            frame_layout.addWidget(output_frame)
-            layout.addWidget(frame, i + 1, 0, 1, 3)
-
-        layout.setRowStretch(i + 2, 1)
-
-    def reload_stratagems(self):
-        global STRATAGEM_DATA
-        try:
-            with open("stratagems.json", "r") as f:
-                STRATAGEM_DATA = json.load(f)
-            self.signal_handler.log_message.emit("Stratagems reloaded from file")
-        except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to reload stratagems: {e}")
-            self.signal_handler.log_message.emit(f"Failed to reload stratagems: {e}")
-            return
+    @classmethod
+    def available(cls):
+        return sys.platform.startswith("linux") and importlib.util.find_spec("evdev") is not None
 
-        all_stratagems = list(STRATAGEM_DATA.keys())
-        for combo in self.stratagem_combos:
-            current_text = combo.currentText()
-            model = QStandardItemModel()
-            item = QStandardItem("Select Stratagem")
-            item.setForeground(QColor("#ECEFF1"))
-            item.setData("#ECEFF1", Qt.UserRole)
-            model.appendRow(item)
-            for strat in all_stratagems:
-                item = QStandardItem(strat)
-                color = STRATAGEM_DATA[strat].get("color", "#ECEFF1") if isinstance(STRATAGEM_DATA[strat], dict) else "#ECEFF1"
-                item.setForeground(QColor(color))
-                item.setData(color, Qt.UserRole)
-                model.appendRow(item)
-            combo.setModel(model)
-            combo.setCurrentText(current_text)  # Preserve selection if possible
-
-    def create_weapons_tab(self):
-        layout = QVBoxLayout(self.weapons_tab)
-        layout.setSpacing(10)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        label = QLabel("Weapons Configuration")
-        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
-        layout.addWidget(label)
-
-        # Railgun/Epoch Section
-        railgun_frame = QWidget()
-        railgun_layout = QVBoxLayout(railgun_frame)
-        railgun_layout.setSpacing(4)
-        railgun_layout.setContentsMargins(0, 0, 0, 0)
-
-        railgun_button_frame = QWidget()
-        railgun_button_layout = QHBoxLayout(railgun_button_frame)
-        railgun_button_layout.setSpacing(8)
-        railgun_button_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.railgun_button = QPushButton("Railgun/Epoch Safety: OFF")
-        self.railgun_button.setStyleSheet(
-            "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-        )
-        self.railgun_button.clicked.connect(self.toggle_railgun_safety)
-        railgun_button_layout.addWidget(self.railgun_button)
-
-        self.railgun_keybind_button = QPushButton("Set Keybind")
-        self.railgun_keybind_button.setFixedWidth(120)
-        self.railgun_keybind_button.setToolTip("Assign a key to toggle railgun/epoch safety")
-        self.railgun_keybind_button.clicked.connect(self.set_railgun_keybind)
-        railgun_button_layout.addWidget(self.railgun_keybind_button)
-
-        self.railgun_keybind_delete_button = QPushButton("Clear")
-        self.railgun_keybind_delete_button.setFixedWidth(60)
-        self.railgun_keybind_delete_button.setProperty("clear", True)
-        self.railgun_keybind_delete_button.clicked.connect(self.delete_railgun_keybind)
-        railgun_button_layout.addWidget(self.railgun_keybind_delete_button)
-
-        railgun_button_layout.addStretch()
-        railgun_layout.addWidget(railgun_button_frame)
-
-        railgun_info = QLabel("Railgun/Epoch safety releases left click or switches weapon if held too long.")
-        railgun_info.setStyleSheet("font-size: 12px; color: #B0BEC5;")
-        railgun_layout.addWidget(railgun_info)
-
-        self.railgun_fallback_checkbox = QCheckBox("Use keyboard fallback (press '1' to interrupt)")
-        self.railgun_fallback_checkbox.setChecked(self.railgun_use_keyboard_fallback)
-        self.railgun_fallback_checkbox.stateChanged.connect(self.update_railgun_fallback)
-        railgun_layout.addWidget(self.railgun_fallback_checkbox)
-
-        layout.addWidget(railgun_frame)
-
-        # Arc Thrower Section
-        arc_thrower_frame = QWidget()
-        arc_thrower_layout = QVBoxLayout(arc_thrower_frame)
-        arc_thrower_layout.setSpacing(4)
-        arc_thrower_layout.setContentsMargins(0, 0, 0, 0)
-
-        arc_thrower_button_frame = QWidget()
-        arc_thrower_button_layout = QHBoxLayout(arc_thrower_button_frame)
-        arc_thrower_button_layout.setSpacing(8)
-        arc_thrower_button_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.arc_thrower_button = QPushButton("Arc Thrower Rapidfire: OFF")
-        self.arc_thrower_button.setStyleSheet(
-            "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-        )
-        self.arc_thrower_button.clicked.connect(self.toggle_arc_thrower_rapidfire)
-        arc_thrower_button_layout.addWidget(self.arc_thrower_button)
-
-        self.arc_thrower_keybind_button = QPushButton("Set Keybind")
-        self.arc_thrower_keybind_button.setFixedWidth(120)
-        self.arc_thrower_keybind_button.setToolTip("Assign a key to toggle arc thrower rapidfire")
-        self.arc_thrower_keybind_button.clicked.connect(self.set_arc_thrower_keybind)
-        arc_thrower_button_layout.addWidget(self.arc_thrower_keybind_button)
-
-        self.arc_thrower_keybind_delete_button = QPushButton("Clear")
-        self.arc_thrower_keybind_delete_button.setFixedWidth(60)
-        self.arc_thrower_keybind_delete_button.setProperty("clear", True)
-        self.arc_thrower_keybind_delete_button.clicked.connect(self.delete_arc_thrower_keybind)
-        arc_thrower_button_layout.addWidget(self.arc_thrower_keybind_delete_button)
-
-        arc_thrower_button_layout.addStretch()
-        arc_thrower_layout.addWidget(arc_thrower_button_frame)
-
-        self.arc_thrower_info = QLabel(f"Arc Thrower rapidfire releases and represses left click every {self.arc_thrower_delay}s when held.")
-        self.arc_thrower_info.setStyleSheet("font-size: 12px; color: #B0BEC5;")
-        arc_thrower_layout.addWidget(self.arc_thrower_info)
-        layout.addWidget(arc_thrower_frame)
-
-        arc_thrower_delay_frame = QHBoxLayout()
-        arc_thrower_delay_label = QLabel("Arc Thrower Delay (seconds):")
-        arc_thrower_delay_frame.addWidget(arc_thrower_delay_label)
-
-        self.arc_thrower_delay_entry = QLineEdit(str(self.arc_thrower_delay))
-        self.arc_thrower_delay_entry.setFixedWidth(60)
-        self.arc_thrower_delay_entry.setToolTip("Enter value > 0.15 and <= 10 for rapidfire delay")
-        arc_thrower_delay_frame.addWidget(self.arc_thrower_delay_entry)
-
-        arc_thrower_update_button = QPushButton("Update")
-        arc_thrower_update_button.setFixedWidth(80)
-        arc_thrower_update_button.clicked.connect(self.update_arc_thrower_delay)
-        arc_thrower_delay_frame.addWidget(arc_thrower_update_button)
-        arc_thrower_delay_frame.addStretch()
-
-        layout.addLayout(arc_thrower_delay_frame)
-
-        timeout_frame = QHBoxLayout()
-        timeout_label = QLabel("Railgun/Epoch Safety Timeout (seconds):")
-        timeout_frame.addWidget(timeout_label)
-
-        self.timeout_entry = QLineEdit(str(self.railgun_timeout))
-        self.timeout_entry.setFixedWidth(60)
-        self.timeout_entry.setToolTip("Enter positive value <= 10 for safety timeout")
-        timeout_frame.addWidget(self.timeout_entry)
-
-        update_button = QPushButton("Update")
-        update_button.setFixedWidth(80)
-        update_button.clicked.connect(self.update_railgun_timeout)
-        timeout_frame.addWidget(update_button)
-        timeout_frame.addStretch()
-
-        layout.addLayout(timeout_frame)
-        layout.addStretch()
-
-    def create_support_tab(self):
-        layout = QGridLayout(self.support_tab)
-        layout.setSpacing(10)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        label = QLabel("Support Stratagems")
-        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
-        layout.addWidget(label, 0, 0, 1, 5)  # Adjusted for test button
-
-        support_stratagems = list(SUPPORT_STRATAGEMS.keys())
-
-        for i, strat_name in enumerate(support_stratagems):
-            frame = QWidget()
-            frame_layout = QHBoxLayout(frame)
-            frame_layout.setContentsMargins(0, 6, 0, 6)
-            frame_layout.setSpacing(8)
-
-            label = QLabel(strat_name)
-            label.setFixedWidth(120)
-            frame_layout.addWidget(label)
-
-            keybind_button = QPushButton("Set Keybind")
-            keybind_button.setFixedWidth(120)
-            keybind_button.setToolTip("Assign a key or mouse button for this support stratagem")
-            keybind_button.clicked.connect(lambda checked, idx=i: self.set_support_keybind(idx))
-            frame_layout.addWidget(keybind_button)
-            self.support_keybind_buttons.append(keybind_button)
-
-            del_button = QPushButton("Clear")
-            del_button.setFixedWidth(60)
-            del_button.setProperty("clear", True)
-            del_button.clicked.connect(lambda checked, idx=i: self.delete_support_keybind(idx))
-            frame_layout.addWidget(del_button)
-            self.support_delete_keybind_buttons.append(del_button)
-
-            test_button = QPushButton("Test")
-            test_button.setFixedWidth(60)
-            test_button.setToolTip("Test this support stratagem sequence")
-            test_button.clicked.connect(lambda checked, idx=i: self.test_support_stratagem(idx))
-            frame_layout.addWidget(test_button)
-            self.support_test_buttons.append(test_button)
-
-            sequence = SUPPORT_STRATAGEMS.get(strat_name, [])
-            output_label = QLabel(" → ".join(sequence))
-            frame_layout.addWidget(output_label)
-            self.support_outputs.append(output_label)
-
-            layout.addWidget(frame, i + 1, 0, 1, 5)
-
-        layout.setRowStretch(i + 2, 1)
-
-    def create_logs_tab(self):
-        layout = QVBoxLayout(self.logs_tab)
-        layout.setSpacing(10)
-        layout.setContentsMargins(10, 10, 10, 10)
-
-        label = QLabel("Logs")
-        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
-        layout.addWidget(label)
-
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1E272C;
-                color: #ECEFF1;
-                border: 1px solid #455A64;
-                padding: 5px;
-                font-family: Consolas, "Courier New", monospace;
-                font-size: 12px;
-            }
-        """)
-        layout.addWidget(self.log_text)
-
-        clear_button = QPushButton("Clear Logs")
-        clear_button.setFixedWidth(100)
-        clear_button.setProperty("clear", True)
-        clear_button.clicked.connect(self.clear_logs)
-        layout.addWidget(clear_button)
-
-        layout.addStretch()
-
-    def create_profile_section(self):
-        profile_frame = QWidget()
-        profile_layout = QHBoxLayout(profile_frame)
-        profile_layout.setContentsMargins(0, 5, 0, 5)
-        profile_layout.setSpacing(8)
-
-        label = QLabel("Profile Management")
-        label.setStyleSheet("font-size: 16px; font-weight: bold;")
-        profile_layout.addWidget(label)
-
-        self.profile_combo = QComboBox()
-        self.profile_combo.setFixedWidth(150)
-        self.profile_combo.addItems(list(PROFILES.keys()))
-        self.profile_combo.currentTextChanged.connect(self.load_profile)
-        profile_layout.addWidget(self.profile_combo)
-
-        self.profile_name_entry = QLineEdit()
-        self.profile_name_entry.setFixedWidth(150)
-        self.profile_name_entry.setPlaceholderText("Enter profile name")
-        profile_layout.addWidget(self.profile_name_entry)
-
-        create_button = QPushButton("Create Profile")
-        create_button.setFixedWidth(100)
-        create_button.setToolTip("Create a new profile with current configuration")
-        create_button.clicked.connect(self.create_new_profile)
-        profile_layout.addWidget(create_button)
-
-        save_button = QPushButton("Save Profile")
-        save_button.setFixedWidth(100)
-        save_button.setToolTip("Save the current configuration to the selected profile")
-        save_button.clicked.connect(self.save_profile)
-        profile_layout.addWidget(save_button)
-
-        rename_button = QPushButton("Rename Profile")
-        rename_button.setFixedWidth(100)
-        rename_button.setToolTip("Rename the selected profile")
-        rename_button.clicked.connect(self.rename_profile)
-        profile_layout.addWidget(rename_button)
-
-        del_button = QPushButton("Delete")
-        del_button.setFixedWidth(80)
-        del_button.setProperty("clear", True)
-        del_button.setToolTip("Delete the selected profile")
-        del_button.clicked.connect(self.confirm_delete_profile)
-        profile_layout.addWidget(del_button)
-
-        profile_layout.addStretch()
-        self.main_layout.addWidget(profile_frame)
-
-    def append_log(self, message):
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
-        self.log_text.verticalScrollBar().setValue(self.log_text.verticalScrollBar().maximum())
-
-    def clear_logs(self):
-        self.log_text.clear()
-
-    def blink_indicator(self):
-        def blink_cycle(count):
-            if count % 2 == 0:
-                self.macro_indicator.setStyleSheet("background-color: yellow; border-radius: 10px;")
+    def __init__(self):
+        from evdev import UInput, ecodes
+        self.ecodes = ecodes
+        self.device = UInput(name="hellmacro")
+        self.codes = {}
+
+    def code(self, key):
+        code = self.codes.get(key)
+        if code is None:
+            if isinstance(key, Button):
+                name = UINPUT_BUTTONS[key.name]
+            elif isinstance(key, Key):
+                name = UINPUT_KEYS.get(key.name, f"KEY_{key.name.upper()}")
             else:
-                self.macro_indicator.setStyleSheet(f"background-color: {'green' if self.running_macro else 'red'}; border-radius: 10px;")
-            if count > 0:
-                QTimer.singleShot(100, lambda: blink_cycle(count - 1))
-        blink_cycle(3)
+                char = key.char if isinstance(key, KeyCode) else key
+                name = f"KEY_{char.upper()}"
+            code = getattr(self.ecodes, name)
+            self.codes[key] = code
+        return code
+
+    def press(self, key):
+        self.device.write(self.ecodes.EV_KEY, self.code(key), 1)
+        self.device.syn()
+
+    def release(self, key):
+        self.device.write(self.ecodes.EV_KEY, self.code(key), 0)
+        self.device.syn()
+
+    def send_batch(self, events):
+        for key, pressed in events:
+            self.device.write(self.ecodes.EV_KEY, self.code(key), 1 if pressed else 0)
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+class RecordingInjector(Injector):
+    # In-memory backend for tests and benchmarks: records
+    # (perf_counter_ns, key, pressed) for every event
+    name = "recording"
+
+    def __init__(self):
+        self.events = []
+        self.batches = 0
+
+    def press(self, key):
+        self.events.append((time.perf_counter_ns(), key, True))
 
-    def perform_mouse_release(self):
+    def release(self, key):
+        self.events.append((time.perf_counter_ns(), key, False))
+
+    def send_batch(self, events):
+        now = time.perf_counter_ns()
+        self.events.extend((now, key, pressed) for key, pressed in events)
+        self.batches += 1
+
+INJECTOR_BACKENDS = {
+    "pynput": PynputInjector,
+    "xtest": XTestInjector,
+    "uinput": UInputInjector,
+    "recording": RecordingInjector
+}
+
+def set_injector(name):
+    global injector
+    load_pynput()
+    cls = INJECTOR_BACKENDS.get(name)
+    if cls is None or not cls.available():
+        log.warning("Input backend '%s' is not available, using pynput", name)
+        cls = PynputInjector
+    try:
+        new_injector = cls()
+    except Exception as e:
+        log.error("Failed to open input backend '%s': %s, using pynput", cls.name, e)
+        new_injector = PynputInjector()
+    if injector is not None:
+        injector.close()
+    injector = new_injector
+    return injector
+
+class CompiledSequence:
+    # Ready-to-send timeline for one stratagem: (offset_ns, key, pressed)
+    # entries relative to the end of the Ctrl lead-in, with keys resolved.
+    # batches groups the events that share an offset so each group can be
+    # submitted to the injector with one flush. recorded is set for entries
+    # played from a recording rather than at the key delay.
+    __slots__ = ("name", "directions", "events", "batches", "duration_ns", "recorded")
+
+    def __init__(self, name, directions, events, duration_ns, recorded=False):
+        self.name = name
+        self.directions = directions
+        self.events = events
+        self.duration_ns = duration_ns
+        self.recorded = recorded
+        batches = []
+        for offset_ns, key, pressed in events:
+            if batches and batches[-1][0] == offset_ns:
+                batches[-1][1].append((key, pressed))
+            else:
+                batches.append((offset_ns, [(key, pressed)]))
+        self.batches = tuple(
+            (offset_ns, tuple(batch), any(pressed for _, pressed in batch))
+            for offset_ns, batch in batches
+        )
+
+def compile_sequence(name, directions, delay):
+    step_ns = int(round(delay * 1_000_000_000))
+    events = []
+    for i, token in enumerate(directions):
+        key = DIRECTION_KEYS.get(token)
+        if key is None:
+            raise ValueError(f"{name}: invalid direction '{token}' at step {i+1}")
+        events.append((2 * i * step_ns, key, True))
+        events.append(((2 * i + 1) * step_ns, key, False))
+    return CompiledSequence(name, tuple(directions), tuple(events), 2 * len(directions) * step_ns)
+
+def compile_timeline(name, directions, timeline):
+    # A recorded entry plays at its own timing; keys it leaves pressed are
+    # released at its end
+    events = []
+    held = {}
+    for offset_ms, token, pressed in timeline:
         try:
-            if not (self.left_click_active and self.railgun_safety and self.running_macro):
-                return
-            current_time = time.time()
-            if current_time - self.last_railgun_release < self.railgun_debounce:
-                return
-            self.last_railgun_release = current_time
-            if self.railgun_use_keyboard_fallback:
-                keyboard.press('1')
-                time.sleep(0.01)
-                keyboard.release('1')
-                self.signal_handler.log_message.emit(f"Railgun/Epoch safety: Switched weapon at {current_time - self.left_click_time:.2f}s")
+            key = input_key(token)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}")
+        offset_ns = int(round(offset_ms * 1_000_000))
+        events.append((offset_ns, key, pressed))
+        if pressed:
+            held[token] = key
+        else:
+            held.pop(token, None)
+    duration_ns = events[-1][0]
+    events.extend((duration_ns, key, False) for key in held.values())
+    return CompiledSequence(name, directions, tuple(events), duration_ns, recorded=True)
+
+def compile_chain(name, sequences, gap):
+    # Compiled sequences back to back in one timeline, gap seconds from the
+    # end of each to the start of the next, so they share one Ctrl hold
+    gap_ns = int(round(gap * 1_000_000_000))
+    events = []
+    directions = []
+    offset_ns = 0
+    for i, sequence in enumerate(sequences):
+        if i:
+            offset_ns += gap_ns
+        events.extend((offset_ns + event_ns, key, pressed) for event_ns, key, pressed in sequence.events)
+        directions.extend(sequence.directions)
+        offset_ns += sequence.duration_ns
+    return CompiledSequence(name, tuple(directions), tuple(events), offset_ns,
+                            recorded=any(sequence.recorded for sequence in sequences))
+
+def separator_category(name):
+    # "-=Orbital=-" -> "Orbital", "-" and "--" -> "", anything else -> None
+    if name.startswith("-=") and name.endswith("=-"):
+        return name[2:-2].strip()
+    if not name.strip("-"):
+        return ""
+    return None
+
+def compile_catalog(entries, delay):
+    # Returns (compiled, errors) for a dict of StratagemEntry
+    compiled = {}
+    errors = []
+    for name, entry in entries.items():
+        try:
+            if entry.timeline is not None:
+                compiled[name] = compile_timeline(name, entry.directions, entry.timeline)
             else:
-                time.sleep(0.005)
-                mouse.release(Button.left)
-                self.signal_handler.log_message.emit(f"Railgun/Epoch safety: Released left click at {current_time - self.left_click_time:.2f}s")
-            self.left_click_active = False
-        except Exception as e:
-            self.signal_handler.log_message.emit(f"Error in railgun/epoch safety: {e}")
-            logging.error(f"Error in railgun/epoch safety: {e}")
+                compiled[name] = compile_sequence(name, entry.directions, delay)
+        except ValueError as e:
+            errors.append(str(e))
+    return compiled, errors
+
+# One-letter codes so a picker search like "rrd" finds sequences
+DIRECTION_CODES = {"up": "u", "down": "d", "left": "l", "right": "r"}
+
+def search_tokens(text):
+    return "".join(c if c.isalnum() else " " for c in text.lower()).split()
+
+def is_subsequence(term, text):
+    chars = iter(text)
+    return all(c in chars for c in term)
+
+def is_color(value):
+    if not isinstance(value, str) or not value:
+        return False
+    if value.startswith("#"):
+        return len(value) in (4, 7, 9) and all(c in "0123456789abcdefABCDEF" for c in value[1:])
+    return value.isalpha()
+
+class StratagemEntry:
+    # A recorded entry also has a timeline of (offset ms, key, pressed) that
+    # playback follows instead of the key delay; its directions are the
+    # direction keys it presses, for display and search
+    __slots__ = ("name", "category", "directions", "color", "code", "timeline")
+
+    def __init__(self, name, category, directions, color, code=None, timeline=None):
+        self.name = name
+        self.category = category
+        self.directions = directions
+        self.color = color
+        self.code = code if code is not None else "".join(DIRECTION_CODES[d] for d in directions)
+        self.timeline = timeline
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, StratagemEntry) and self.name == other.name and self.category == other.category
+            and self.directions == other.directions and self.color == other.color and self.timeline == other.timeline
+        )
 
-    def arc_thrower_rapidfire_func(self):
-        self.signal_handler.log_message.emit("Arc Thrower thread started")
-        while self.running_macro and self.arc_thrower_rapidfire:
+    __hash__ = None
+
+class StratagemCatalog:
+    # Validated stratagems.json: entries by name in file order, category
+    # colors, and the problems found in entries that were dropped
+    __slots__ = ("entries", "categories", "problems")
+
+    def __init__(self, entries=None, categories=None, problems=()):
+        self.entries = entries or {}
+        self.categories = categories or {}
+        self.problems = tuple(problems)
+
+def normalize_catalog(raw):
+    # Validates a parsed stratagems.json once. Separators become categories,
+    # entries that cannot be played are reported and left out, so nothing
+    # after this has to check types again.
+    if not isinstance(raw, dict):
+        return StratagemCatalog(problems=["stratagems.json must contain an object mapping names to stratagems"])
+    entries = {}
+    categories = {}
+    problems = []
+    category = None
+    for name, value in raw.items():
+        color = value.get("color", DEFAULT_STRATAGEM_COLOR) if isinstance(value, dict) else DEFAULT_STRATAGEM_COLOR
+        if not is_color(color):
+            problems.append(f"{name}: invalid color {color!r}")
+            color = DEFAULT_STRATAGEM_COLOR
+        separator = separator_category(name)
+        if separator:
+            category = separator
+            categories[category] = color
+            continue
+        if separator is not None:
+            continue
+        if isinstance(value, dict) and "timeline" in value:
+            timeline, problem = normalize_timeline(value["timeline"])
+            if problem:
+                problems.append(f"{name}: {problem}")
+                continue
+            directions = tuple(key for _, key, pressed in timeline if pressed and key in DIRECTION_CODES)
+            entries[name] = StratagemEntry(name, category, directions, color, timeline=timeline)
+            continue
+        directions = value.get("sequence") if isinstance(value, dict) else value
+        if not isinstance(directions, list) or not directions:
+            problems.append(f"{name}: sequence must be a non-empty list of directions")
+            continue
+        invalid = [(i, d) for i, d in enumerate(directions) if d not in DIRECTION_CODES]
+        if invalid:
+            problems.append(f"{name}: invalid direction {invalid[0][1]!r} at step {invalid[0][0] + 1}")
+            continue
+        entries[name] = StratagemEntry(name, category, tuple(directions), color)
+    return StratagemCatalog(entries, categories, problems)
+
+def normalize_timeline(raw):
+    # Returns (timeline, None) or (None, problem) for a recorded timeline:
+    # [offset ms, key, pressed] events in time order
+    if not isinstance(raw, list) or not raw:
+        return None, "timeline must be a non-empty list of [offset ms, key, pressed]"
+    timeline = []
+    previous = 0
+    for i, event in enumerate(raw, 1):
+        if not (isinstance(event, list) and len(event) == 3 and isinstance(event[0], (int, float))
+                and isinstance(event[2], bool)):
+            return None, f"timeline event {i} must be [offset ms, key, pressed]"
+        offset, key, pressed = event
+        if not is_input_token(key):
+            return None, f"invalid key {key!r} in timeline event {i}"
+        if offset < previous:
+            return None, f"timeline event {i} is earlier than the one before it"
+        previous = offset
+        timeline.append((offset, key, pressed))
+    return tuple(timeline), None
+
+SUPPORT_CATALOG = normalize_catalog(SUPPORT_STRATAGEMS)
+
+def read_catalog_cache(cache_path):
+    try:
+        # One read and loads(); marshal.load() on the file reads it piecewise
+        with open(cache_path, "rb") as f:
+            cached = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 7 or cached[0] != CATALOG_CACHE_VERSION:
+        return None
+    return cached
+
+def write_catalog_cache(cache_path, stat, digest, catalog):
+    cached = (
+        CATALOG_CACHE_VERSION, stat.st_mtime_ns, stat.st_size, digest,
+        tuple((e.name, e.category, e.directions, e.color, e.code, e.timeline) for e in catalog.entries.values()),
+        tuple(catalog.categories.items()),
+        catalog.problems
+    )
+    try:
+        # Write aside and swap in so a crash never leaves half a cache
+        with open(cache_path + ".tmp", "wb") as f:
+            f.write(marshal.dumps(cached))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as e:
+        profiles_log.warning("Could not write %s: %s", cache_path, e)
+
+def catalog_from_cache(cached):
+    entries = {record[0]: StratagemEntry(*record) for record in cached[4]}
+    return StratagemCatalog(entries, dict(cached[5]), cached[6])
+
+def load_catalog(path, cache_path=CATALOG_CACHE_FILE):
+    # Uses the cache when the file's mtime and size match; otherwise hashes
+    # the file, which still skips parsing and validation when only the
+    # mtime moved. Raises like open()/json.loads() for a missing or bad file.
+    stat = os.stat(path)
+    cached = read_catalog_cache(cache_path)
+    if cached is not None and cached[1:3] == (stat.st_mtime_ns, stat.st_size):
+        return catalog_from_cache(cached)
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if cached is not None and cached[3] == digest:
+        catalog = catalog_from_cache(cached)
+    else:
+        catalog = normalize_catalog(json.loads(data))
+    write_catalog_cache(cache_path, stat, digest, catalog)
+    return catalog
+
+def dump_catalog(raw):
+    # The layout of the shipped stratagems.json: one entry per line
+    lines = [f"    {json.dumps(name)}: {json.dumps(value)}" for name, value in raw.items()]
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+def patch_catalog_lines(text, raw, newline):
+    # Writes the entries of raw that are new or changed into the text of a
+    # catalog laid out one entry per line, keeping every other line, its
+    # indentation and the line endings as they are. Returns None for text
+    # laid out any other way.
+    lines = text.split(newline)
+    rows = {}
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith('"'):
             try:
-                if not self.left_click_active:
-                    time.sleep(0.2)
-                    continue
-                # Maintien pour le délai complet (hold time) avant tout relâchement
-                time.sleep(self.arc_thrower_delay)
-                if not (self.arc_thrower_rapidfire and self.left_click_active):
-                    continue
-                self.signal_handler.log_message.emit("Arc Thrower: Releasing and repressing left click")
-                mouse.release(Button.left)
-                time.sleep(0.03)
-                mouse.press(Button.left)
+                rows[json.JSONDecoder().raw_decode(stripped)[0]] = i
+            except ValueError:
+                return None
+    try:
+        old = json.loads(text)
+    except ValueError:
+        return None
+    names = list(raw)
+    for position, name in enumerate(names):
+        if name in old and old[name] == raw[name]:
+            continue
+        entry = f"{json.dumps(name)}: {json.dumps(raw[name])}"
+        if name in rows:
+            line = lines[rows[name]]
+            indent = line[:len(line) - len(line.lstrip())]
+            lines[rows[name]] = indent + entry + ("," if line.rstrip().endswith(",") else "")
+            continue
+        if position == 0 or names[position - 1] not in rows:
+            return None
+        row = rows[names[position - 1]]
+        previous = lines[row]
+        if not previous.rstrip().endswith(","):
+            lines[row] = previous.rstrip() + ","
+        lines.insert(row + 1, previous[:len(previous) - len(previous.lstrip())] + entry + ("," if position < len(names) - 1 else ""))
+        rows = {key: i + 1 if i > row else i for key, i in rows.items()}
+        rows[name] = row + 1
+    patched = newline.join(lines)
+    try:
+        if list(json.loads(patched).items()) != list(raw.items()):
+            return None
+    except ValueError:
+        return None
+    return patched
+
+def save_catalog_entry(path, name, value, category):
+    # Adds or replaces one stratagems.json entry. A new entry goes at the end
+    # of its category, which is added at the end of the file if missing.
+    # Only the lines of that entry (and a new category) change; a file not
+    # laid out one entry per line is rewritten in that layout.
+    with open(path, "r", newline="") as f:
+        text = f.read()
+    raw = json.loads(text)
+    if name not in raw:
+        separator = f"-={category}=-"
+        items = list(raw.items())
+        if separator in raw:
+            start = [item[0] for item in items].index(separator) + 1
+            position = next((i for i in range(start, len(items)) if separator_category(items[i][0]) is not None), len(items))
+        else:
+            items.append((separator, {"sequence": [], "color": DEFAULT_STRATAGEM_COLOR}))
+            position = len(items)
+        items.insert(position, (name, value))
+        raw = dict(items)
+    else:
+        raw[name] = value
+    newline = "\r\n" if "\r\n" in text else "\n"
+    patched = patch_catalog_lines(text, raw, newline)
+    if patched is None:
+        patched = dump_catalog(raw).replace("\n", newline)
+    atomic_write_text(path, patched, newline="")
+
+class MacroRecorder:
+    # Key events captured by the listeners while recording, as
+    # (perf_counter_ns, key ID, pressed). Ctrl is left out because playback
+    # holds it for every sequence, and so are keys without a name or
+    # character, which could not be played back.
+    __slots__ = ("events",)
+
+    def __init__(self):
+        self.events = []
+
+    def record(self, t_ns, key_str, pressed):
+        if not key_str.startswith("ctrl") and is_input_token(key_str):
+            self.events.append((t_ns, key_str, pressed))
+
+def compress_recording(events, quantum_ms=RECORDING_QUANTUM_MS, max_gap_ms=RECORDING_MAX_GAP_MS):
+    # Turns recorder events into a stratagems.json timeline starting at the
+    # first press. Auto-repeat presses and releases of keys pressed before
+    # the recording are dropped, pauses with no key held are shortened to
+    # max_gap_ms, offsets are rounded to quantum_ms without reordering
+    # events or making a press shorter than one quantum, and keys still held
+    # at the end are released. Returns (timeline, worst rounding in ns).
+    quantum_ns = quantum_ms * 1_000_000
+    max_gap_ns = max_gap_ms * 1_000_000
+    timeline = []
+    pressed_at = {}
+    origin_ns = last_ns = None
+    removed_ns = 0
+    worst_ns = 0
+    for t_ns, key, pressed in events:
+        if pressed == (key in pressed_at):
+            continue
+        if origin_ns is None:
+            origin_ns = t_ns
+        elif not pressed_at and t_ns - last_ns > max_gap_ns:
+            removed_ns += t_ns - last_ns - max_gap_ns
+        last_ns = t_ns
+        offset_ns = t_ns - origin_ns - removed_ns
+        offset_ms = quantum_ms * round(offset_ns / quantum_ns)
+        if timeline:
+            offset_ms = max(offset_ms, timeline[-1][0])
+        if pressed:
+            pressed_at[key] = offset_ms
+        else:
+            offset_ms = max(offset_ms, pressed_at.pop(key) + quantum_ms)
+        worst_ns = max(worst_ns, abs(offset_ms * 1_000_000 - offset_ns))
+        timeline.append([offset_ms, key, pressed])
+    end_ms = timeline[-1][0] if timeline else 0
+    for key, offset_ms in sorted(pressed_at.items(), key=lambda item: item[1]):
+        timeline.append([max(end_ms, offset_ms + quantum_ms), key, False])
+    return timeline, worst_ns
+
+class StratagemIndex:
+    # Search index for the stratagem picker over a StratagemCatalog. Every
+    # prefix of the name, category and direction code tokens maps to the
+    # entries it matches, so most searches are one dict lookup per term.
+    def __init__(self, catalog):
+        self.entries = list(catalog.entries.values())
+        self.categories = list(catalog.categories.items())
+        self.prefixes = {}
+        self.compact_names = []
+        for position, entry in enumerate(self.entries):
+            self.compact_names.append("".join(search_tokens(entry.name)))
+            tokens = search_tokens(entry.name) + search_tokens(entry.category or "") + [entry.code]
+            for token in set(tokens):
+                for end in range(1, len(token) + 1):
+                    self.prefixes.setdefault(token[:end], set()).add(position)
+
+    def search(self, query):
+        # Entries matching every term of the query in catalog order, or None
+        # for an empty query. A term that is no token prefix falls back to
+        # the letters of the name in order ("orbgas" -> Orbital Gas Strike).
+        terms = search_tokens(query)
+        if not terms:
+            return None
+        matched = None
+        for term in terms:
+            hits = self.prefixes.get(term)
+            if hits is None:
+                hits = {i for i, compact in enumerate(self.compact_names) if is_subsequence(term, compact)}
+            matched = hits if matched is None else matched & hits
+            if not matched:
+                return []
+        return [self.entries[i] for i in sorted(matched)]
+
+class WeaponSetting:
+    # A timing value in seconds that profiles can change within its range
+    __slots__ = ("name", "label", "default", "minimum", "maximum")
+
+    def __init__(self, name, label, default, minimum, maximum):
+        self.name = name
+        self.label = label
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+
+class WeaponStep:
+    # Presses or releases key after the previous step (the trigger press for
+    # the first one): `after` is seconds or the name of a setting, plus offset
+    __slots__ = ("after", "offset", "key", "pressed")
+
+    def __init__(self, after, offset, key, pressed):
+        self.after = after
+        self.offset = offset
+        self.key = key
+        self.pressed = pressed
+
+class WeaponSpec:
+    # One weapons.json entry: a timed input pattern that runs while its
+    # trigger button is held, optionally repeating, with an alternative
+    # fallback pattern profiles can switch to
+    __slots__ = ("id", "name", "description", "group", "trigger", "button", "repeat", "settings", "steps",
+                 "fallback_label", "fallback_steps")
+
+    def __init__(self, weapon_id, name, description, group, trigger, repeat, settings, steps,
+                 fallback_label=None, fallback_steps=()):
+        self.id = weapon_id
+        self.name = name
+        self.description = description
+        self.group = group
+        self.trigger = trigger
+        # Key ID of the trigger button, as the mouse listener reports it
+        self.button = trigger[6:]
+        self.repeat = repeat
+        self.settings = settings
+        self.steps = steps
+        self.fallback_label = fallback_label
+        self.fallback_steps = fallback_steps
+
+class WeaponCatalog:
+    # Validated weapons.json: weapons by ID in file order and the problems
+    # found in weapons that were dropped
+    __slots__ = ("weapons", "problems")
+
+    def __init__(self, weapons=None, problems=()):
+        self.weapons = weapons or {}
+        self.problems = tuple(problems)
+
+def is_input_token(token, mouse_only=False):
+    # "mouse:<button>" for a mouse button, otherwise a character or a
+    # pynput Key name; names are checked against pynput when first used
+    if not isinstance(token, str):
+        return False
+    if token.startswith("mouse:"):
+        return token[6:] in MOUSE_BUTTONS
+    return not mouse_only and (len(token) == 1 or token.isidentifier())
+
+def normalize_steps(weapon_id, raw, settings, problems):
+    # Returns a tuple of WeaponStep, or None after reporting the problem
+    if not isinstance(raw, list) or not raw:
+        problems.append(f"{weapon_id}: steps must be a non-empty list")
+        return None
+    steps = []
+    for i, step in enumerate(raw, 1):
+        if not isinstance(step, dict):
+            problems.append(f"{weapon_id}: step {i} must be an object")
+            return None
+        after = step.get("after", 0)
+        offset = step.get("offset", 0)
+        if not ((isinstance(after, str) and after in settings) or (isinstance(after, (int, float)) and after >= 0)):
+            problems.append(f"{weapon_id}: step {i} waits for unknown setting or negative time {after!r}")
+            return None
+        if not isinstance(offset, (int, float)):
+            problems.append(f"{weapon_id}: step {i} offset must be a number")
+            return None
+        actions = [action for action in ("press", "release") if action in step]
+        if len(actions) != 1:
+            problems.append(f"{weapon_id}: step {i} must have exactly one of press or release")
+            return None
+        key = step[actions[0]]
+        if not is_input_token(key):
+            problems.append(f"{weapon_id}: step {i} has invalid key {key!r}")
+            return None
+        steps.append(WeaponStep(after, offset, key, actions[0] == "press"))
+    return tuple(steps)
+
+def normalize_weapon(weapon_id, value, problems):
+    if not isinstance(value, dict):
+        problems.append(f"{weapon_id}: weapon must be an object")
+        return None
+    name = value.get("name", weapon_id)
+    trigger = value.get("trigger", "mouse:left")
+    if not is_input_token(trigger, mouse_only=True):
+        problems.append(f"{weapon_id}: trigger must be a mouse button like 'mouse:left', not {trigger!r}")
+        return None
+    settings = {}
+    raw_settings = value.get("settings", {})
+    if not isinstance(raw_settings, dict):
+        problems.append(f"{weapon_id}: settings must be an object")
+        return None
+    for setting_name, setting in raw_settings.items():
+        numbers = [setting.get(field) for field in ("default", "min", "max")] if isinstance(setting, dict) else []
+        if len(numbers) != 3 or not all(isinstance(n, (int, float)) for n in numbers) or not numbers[1] <= numbers[0] <= numbers[2]:
+            problems.append(f"{weapon_id}: setting {setting_name} needs numbers min <= default <= max")
+            return None
+        settings[setting_name] = WeaponSetting(setting_name, setting.get("label", setting_name), *numbers)
+    steps = normalize_steps(weapon_id, value.get("steps"), settings, problems)
+    if steps is None:
+        return None
+    fallback = value.get("fallback")
+    fallback_label, fallback_steps = None, ()
+    if fallback is not None:
+        fallback_steps = normalize_steps(f"{weapon_id} fallback", fallback.get("steps") if isinstance(fallback, dict) else None, settings, problems)
+        if fallback_steps is None:
+            return None
+        fallback_label = fallback.get("label", "Use fallback")
+    description = value.get("description", "")
+    try:
+        description.format(**{s.name: s.default for s in settings.values()})
+    except (AttributeError, KeyError, IndexError, ValueError):
+        problems.append(f"{weapon_id}: description may only use {{setting}} placeholders")
+        return None
+    return WeaponSpec(weapon_id, name, description, value.get("group"), trigger, bool(value.get("repeat", False)),
+                      settings, steps, fallback_label, fallback_steps)
+
+def normalize_weapons(raw):
+    # Validates a parsed weapons.json once, like normalize_catalog: weapons
+    # that cannot run are reported and left out
+    if not isinstance(raw, dict):
+        return WeaponCatalog(problems=["weapons.json must contain an object mapping IDs to weapons"])
+    weapons = {}
+    problems = []
+    for weapon_id, value in raw.items():
+        spec = normalize_weapon(weapon_id, value, problems)
+        if spec is not None:
+            weapons[weapon_id] = spec
+    return WeaponCatalog(weapons, problems)
+
+def load_weapons(path):
+    # Raises like open()/json.load() for a missing or unreadable file
+    with open(path, "r") as f:
+        return normalize_weapons(json.load(f))
+
+# pynput objects for the key tokens used in weapons.json
+_INPUT_KEY_CACHE = {}
+
+def input_key(token):
+    key = _INPUT_KEY_CACHE.get(token)
+    if key is None:
+        if token.startswith("mouse:"):
+            key = getattr(Button, token[6:], None)
+        elif len(token) == 1:
+            key = token
+        else:
+            key = getattr(Key, token, None)
+        if key is None:
+            raise ValueError(f"unknown key {token!r}")
+        _INPUT_KEY_CACHE[token] = key
+    return key
+
+class WeaponState:
+    # A weapon in the engine: its profile settings and its running pattern.
+    # Whether it is enabled is kept in MacroEngine.weapons_enabled.
+    # `steps` holds (delay ns, key, pressed) for the current settings.
+    # While the trigger is held `active` is set and
+    # `deadline` is the next step; `echo` is the direction of our own
+    # trigger input still to come back through the mouse listener, and
+    # `held` the keys the pattern pressed and has not released.
+    __slots__ = ("spec", "keybind", "settings", "use_fallback", "steps",
+                 "active", "index", "deadline", "echo", "held", "origin_ns")
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.keybind = ""
+        self.settings = {name: setting.default for name, setting in spec.settings.items()}
+        self.use_fallback = False
+        self.steps = ()
+        self.active = False
+        self.index = 0
+        self.deadline = None
+        self.echo = None
+        self.held = set()
+        self.origin_ns = 0
+        self.compile()
+
+    def configure(self, config):
+        # config is the profile's entry for this weapon; missing or invalid
+        # settings keep their defaults
+        self.keybind = config.get("keybind", "")
+        self.use_fallback = bool(config.get("use_fallback", False)) and bool(self.spec.fallback_steps)
+        settings = config.get("settings", {})
+        for name, setting in self.spec.settings.items():
+            value = settings.get(name)
+            valid = isinstance(value, (int, float)) and setting.minimum <= value <= setting.maximum
+            self.settings[name] = value if valid else setting.default
+        self.compile()
+
+    def compile(self):
+        steps = []
+        for step in self.spec.fallback_steps if self.use_fallback else self.spec.steps:
+            delay = self.settings[step.after] if isinstance(step.after, str) else step.after
+            steps.append((max(0, int((delay + step.offset) * 1_000_000_000)), step.key, step.pressed))
+        self.steps = tuple(steps)
+
+    def config(self):
+        return {"keybind": self.keybind, "settings": dict(self.settings), "use_fallback": self.use_fallback}
+
+    def description(self):
+        return self.spec.description.format(**self.settings)
+
+def wait_until_ns(deadline_ns):
+    # Hybrid wait against an absolute perf_counter_ns deadline: coarse sleep
+    # while far away, then yield-spin the tail so OS sleep overshoot does not
+    # accumulate across events. Returns the time at which the wait ended.
+    while True:
+        now = time.perf_counter_ns()
+        remaining = deadline_ns - now
+        if remaining <= 0:
+            return now
+        if remaining > SPIN_THRESHOLD_NS:
+            time.sleep((remaining - SPIN_THRESHOLD_NS) / 1_000_000_000)
+        else:
+            time.sleep(0)
+
+class Deadline:
+    # Handle for a scheduled callback. cancel() only marks it; the scheduler
+    # drops it when it reaches the top of the heap.
+    __slots__ = ("deadline_ns", "callback", "label", "cancelled", "fired")
+
+    def __init__(self, deadline_ns, callback, label):
+        self.deadline_ns = deadline_ns
+        self.callback = callback
+        self.label = label
+        self.cancelled = False
+        self.fired = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class DeadlineScheduler:
+    # One thread for every timed action: weapon pattern steps, debounce
+    # expiry and macro steps. Deadlines are absolute perf_counter_ns
+    # values in a heap; the thread sleeps until the earliest and spins its
+    # last SPIN_THRESHOLD_NS. Callbacks run on this thread and must not block.
+    # How late each one fired is recorded per label as "scheduler_lateness".
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.heap = []
+        self.sequence = 0
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.thread = None
+
+    def call_at(self, deadline_ns, callback, label="timer"):
+        return self.submit(Deadline(deadline_ns, callback, label))
+
+    def submit(self, deadline):
+        # For callers that must hold the handle before it can fire
+        with self.cond:
+            if self.stopped:
+                deadline.cancelled = True
+                return deadline
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="DeadlineScheduler", daemon=True)
+                self.thread.start()
+            # The sequence number keeps equal deadlines in submission order
+            self.sequence += 1
+            heapq.heappush(self.heap, (deadline.deadline_ns, self.sequence, deadline))
+            if self.heap[0][2] is deadline:
+                self.cond.notify()
+        return deadline
+
+    def call_later(self, delay, callback, label="timer"):
+        return self.call_at(time.perf_counter_ns() + int(delay * 1_000_000_000), callback, label)
+
+    def stop(self, timeout=1):
+        with self.cond:
+            self.stopped = True
+            for _, _, deadline in self.heap:
+                deadline.cancelled = True
+            self.heap = []
+            self.cond.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.stopped:
+                        return
+                    while self.heap and self.heap[0][2].cancelled:
+                        heapq.heappop(self.heap)
+                    if not self.heap:
+                        self.cond.wait()
+                        continue
+                    remaining = self.heap[0][0] - time.perf_counter_ns()
+                    if remaining <= SPIN_THRESHOLD_NS:
+                        break
+                    self.cond.wait((remaining - SPIN_THRESHOLD_NS) / 1_000_000_000)
+                # Taken off the heap before the spin, so nothing but the
+                # callback runs once the deadline is reached. A deadline
+                # added during the spin runs right after this one.
+                deadline = heapq.heappop(self.heap)[2]
+            now = wait_until_ns(deadline.deadline_ns)
+            if deadline.cancelled:
+                continue
+            deadline.fired = True
+            try:
+                deadline.callback()
             except Exception as e:
-                self.signal_handler.log_message.emit(f"Error in arc thrower rapidfire: {e}")
-                logging.error(f"Error in arc thrower rapidfire: {e}")
+                log.error("Error in scheduled %s: %s", deadline.label, e)
+            # Recorded after the callback so it runs as early as possible
+            if self.metrics is not None:
+                self.metrics.record("scheduler_lateness", deadline.label, now - deadline.deadline_ns)
+
+def summarize_jitter(jitter_ns):
+    if not jitter_ns:
+        return "no events"
+    mean_us = sum(jitter_ns) / len(jitter_ns) / 1000
+    max_us = max(jitter_ns) / 1000
+    return f"jitter mean {mean_us:.0f}µs, max {max_us:.0f}µs over {len(jitter_ns)} events"
+
+def configure_logging(log_file=None):
+    log.setLevel(logging.INFO)
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    console.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+    log.addHandler(console)
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+        log.addHandler(file_handler)
+    set_log_levels({})
+
+def set_log_levels(levels):
+    for name, logger in LOG_SUBSYSTEMS.items():
+        level = levels.get(name, DEFAULT_LOG_LEVEL)
+        logger.setLevel(level if level in LOG_LEVELS else DEFAULT_LOG_LEVEL)
+
+def get_log_levels():
+    return {name: logging.getLevelName(logger.level) for name, logger in LOG_SUBSYSTEMS.items()}
+
+class LogRing:
+    # Bounded buffer of log records. Any thread may push; the GUI drains it
+    # on a timer, and the oldest records are dropped when the GUI falls behind.
+    def __init__(self, maxlen=DEFAULT_LOG_MAX_LINES):
+        self.records = deque(maxlen=maxlen)
+
+    def push(self, record):
+        self.records.append(record)
+
+    def drain(self):
+        records = self.records
+        drained = []
+        while records:
+            try:
+                drained.append(records.popleft())
+            except IndexError:
                 break
-        self.signal_handler.log_message.emit("Arc Thrower thread stopped")
+        return drained
 
-    def toggle_arc_thrower_rapidfire(self):
-        current_time = time.time()
-        if current_time - self.last_toggle_time["arc_thrower"] < self.toggle_debounce:
-            self.signal_handler.log_message.emit("Arc Thrower toggle ignored (debounce)")
-            return
-        self.last_toggle_time["arc_thrower"] = current_time
-
-        new_state = not self.arc_thrower_rapidfire
-        if new_state and self.railgun_safety:
-            # Mutually exclusive: turn off railgun if turning on arc thrower
-            self.railgun_safety = False
-            self.railgun_button.setText("Railgun/Epoch Safety: OFF")
-            self.railgun_button.setStyleSheet(
-                "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-            )
-            self.signal_handler.log_message.emit("Railgun/Epoch safety disabled (mutual exclusion with Arc Thrower)")
-            if self.railgun_timer is not None:
-                self.railgun_timer.cancel()
-                self.railgun_timer = None
-                self.signal_handler.log_message.emit("Railgun/Epoch timer cancelled")
-
-        self.arc_thrower_rapidfire = new_state
-        color = "#4CAF50" if self.arc_thrower_rapidfire else "#EF5350"
-        text = "Arc Thrower Rapidfire: ON" if self.arc_thrower_rapidfire else "Arc Thrower Rapidfire: OFF"
-        self.arc_thrower_button.setText(text)
-        self.arc_thrower_button.setStyleSheet(
-            f"background-color: {color}; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-        )
-        self.arc_thrower_info.setText(f"Arc Thrower rapidfire releases and represses left click every {self.arc_thrower_delay}s when held.")
-        self.signal_handler.log_message.emit(f"Arc Thrower rapidfire {'enabled' if self.arc_thrower_rapidfire else 'disabled'}")
-
-        if self.arc_thrower_rapidfire and self.running_macro:
-            if self.arc_thrower_thread is None or not self.arc_thrower_thread.is_alive():
-                self.arc_thrower_thread = threading.Thread(target=self.arc_thrower_rapidfire_func, daemon=True)
-                self.arc_thrower_thread.start()
-        elif not self.arc_thrower_rapidfire:
-            if self.arc_thrower_thread is not None:
-                self.arc_thrower_thread.join(timeout=1)
-            mouse.release(Button.left)
-
-    def toggle_railgun_safety(self):
-        current_time = time.time()
-        if current_time - self.last_toggle_time["railgun"] < self.toggle_debounce:
-            self.signal_handler.log_message.emit("Railgun/Epoch toggle ignored (debounce)")
-            return
-        self.last_toggle_time["railgun"] = current_time
-
-        new_state = not self.railgun_safety
-        if new_state and self.arc_thrower_rapidfire:
-            # Mutually exclusive: turn off arc thrower if turning on railgun
-            self.arc_thrower_rapidfire = False
-            self.arc_thrower_button.setText("Arc Thrower Rapidfire: OFF")
-            self.arc_thrower_button.setStyleSheet(
-                "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-            )
-            self.signal_handler.log_message.emit("Arc Thrower rapidfire disabled (mutual exclusion with Railgun/Epoch)")
-            if self.arc_thrower_thread is not None:
-                self.arc_thrower_thread.join(timeout=1)
-            mouse.release(Button.left)
-
-        self.railgun_safety = new_state
-        color = "#4CAF50" if self.railgun_safety else "#EF5350"
-        text = "Railgun/Epoch Safety: ON" if self.railgun_safety else "Railgun/Epoch Safety: OFF"
-        self.railgun_button.setText(text)
-        self.railgun_button.setStyleSheet(
-            f"background-color: {color}; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-        )
-        self.signal_handler.log_message.emit(f"Railgun/Epoch safety {'enabled' if self.railgun_safety else 'disabled'}")
+    def resize(self, maxlen):
+        self.records = deque(self.records, maxlen=maxlen)
+
+class LatencyHistogram:
+    # HDR-style log-linear histogram of nanosecond values: exact below
+    # 2^HISTOGRAM_SUB_BITS, then ~3% wide buckets, so recording is O(1) and
+    # memory stays small no matter how many samples are taken.
+    __slots__ = ("counts", "count", "max_ns")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.max_ns = 0
+
+    @staticmethod
+    def bucket_of(value):
+        if value < (1 << HISTOGRAM_SUB_BITS):
+            return value
+        shift = value.bit_length() - HISTOGRAM_SUB_BITS - 1
+        return ((shift + 1) << HISTOGRAM_SUB_BITS) + (value >> shift) - (1 << HISTOGRAM_SUB_BITS)
+
+    @staticmethod
+    def bucket_value(bucket):
+        # Midpoint of the bucket's range
+        if bucket < (1 << HISTOGRAM_SUB_BITS):
+            return bucket
+        shift = (bucket >> HISTOGRAM_SUB_BITS) - 1
+        mantissa = (bucket & ((1 << HISTOGRAM_SUB_BITS) - 1)) + (1 << HISTOGRAM_SUB_BITS)
+        return (mantissa << shift) + ((1 << shift) >> 1)
+
+    def record(self, value):
+        value = max(0, int(value))
+        bucket = self.bucket_of(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        if value > self.max_ns:
+            self.max_ns = value
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0
+        threshold = pct / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(self.bucket_value(bucket), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_ns": self.percentile(50),
+            "p95_ns": self.percentile(95),
+            "p99_ns": self.percentile(99),
+            "max_ns": self.max_ns
+        }
 
-        if not self.railgun_safety and self.railgun_timer is not None:
-            self.railgun_timer.cancel()
-            self.railgun_timer = None
-            self.signal_handler.log_message.emit("Railgun/Epoch timer cancelled")
+class MetricsRegistry:
+    # Histograms keyed by (metric, label), e.g. ("sequence_duration", "Resupply")
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, metric, label, value_ns):
+        with self.lock:
+            histogram = self.histograms.get((metric, label))
+            if histogram is None:
+                histogram = self.histograms[(metric, label)] = LatencyHistogram()
+            histogram.record(value_ns)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                dict(metric=metric, label=label, **histogram.summary())
+                for (metric, label), histogram in sorted(self.histograms.items())
+            ]
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"exported_at": time.strftime(LOG_DATE_FORMAT), "metrics": self.snapshot()}, f, indent=4)
+
+class LogRingHandler(logging.Handler):
+    # Stores the unformatted record; the message is only built when the
+    # Logs tab consumes it.
+    def __init__(self, ring):
+        super().__init__()
+        self.ring = ring
 
-    def update_railgun_fallback(self, state):
-        self.railgun_use_keyboard_fallback = state == Qt.Checked
-        self.signal_handler.log_message.emit(f"Railgun/Epoch keyboard fallback {'enabled' if self.railgun_use_keyboard_fallback else 'disabled'}")
+    def emit(self, record):
+        self.ring.push(record)
 
-    def update_arc_thrower_delay(self):
-        try:
-            new_delay = float(self.arc_thrower_delay_entry.text())
-            if new_delay <= 0.15 or new_delay > 10:
-                self.signal_handler.show_warning.emit("Delay must be between 0.15 and 10 seconds.")
-                self.signal_handler.log_message.emit("Failed to update Arc Thrower delay: Invalid range")
+class CancelToken:
+    # Cooperative cancellation for one job. The worker waits on the token
+    # instead of sleeping, so cancel() wakes it at once; notify() wakes it
+    # after the job's own state changed.
+    __slots__ = ("cond", "cancelled", "cancelled_ns")
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.cancelled = False
+        self.cancelled_ns = None
+
+    def cancel(self):
+        with self.cond:
+            if not self.cancelled:
+                self.cancelled = True
+                self.cancelled_ns = time.perf_counter_ns()
+            self.cond.notify_all()
+
+    def is_set(self):
+        return self.cancelled
+
+    def notify(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    def wait_for(self, predicate, timeout=None):
+        # Waits until predicate() holds or the token is cancelled; returns
+        # whether it was cancelled
+        with self.cond:
+            self.cond.wait_for(lambda: self.cancelled or predicate(), timeout)
+            return self.cancelled
+
+class MacroExecutor:
+    # Long-lived worker that plays queued sequences one at a time. The policy
+    # decides what happens to a trigger that arrives while a sequence runs:
+    # "drop" ignores it, "queue" appends it (FIFO, bounded), "latest" keeps only
+    # the newest pending trigger and "preempt" cancels the running sequence.
+    # Each job gets a fresh CancelToken, so a cancel never leaks into the next.
+    def __init__(self, runner, policy=DEFAULT_MACRO_QUEUE_POLICY, maxsize=MACRO_QUEUE_SIZE):
+        self.runner = runner
+        self.policy = policy
+        self.maxsize = maxsize
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.cancel_token = CancelToken()
+        self.busy = False
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        with self.cond:
+            if self.thread is not None and self.thread.is_alive():
                 return
-            self.arc_thrower_delay = new_delay
-            self.arc_thrower_info.setText(f"Arc Thrower rapidfire releases and represses left click every {self.arc_thrower_delay}s when held.")
-            self.signal_handler.log_message.emit(f"Updated Arc Thrower delay to {self.arc_thrower_delay}s")
-        except ValueError:
-            self.signal_handler.show_warning.emit("Please enter a valid number for delay.")
-            self.signal_handler.log_message.emit("Failed to update Arc Thrower delay: Invalid number entered")
-
-    def update_railgun_timeout(self):
-        try:
-            new_timeout = float(self.timeout_entry.text())
-            if new_timeout <= 0 or new_timeout > 10:
-                self.signal_handler.show_warning.emit("Timeout must be positive and <= 10 seconds.")
-                self.signal_handler.log_message.emit("Failed to update Railgun/Epoch timeout: Invalid range")
+            self.stopped = False
+            self.thread = threading.Thread(target=self._run, name="MacroExecutor", daemon=True)
+            self.thread.start()
+
+    def submit(self, job):
+        with self.cond:
+            if self.policy == "drop":
+                if self.busy or self.pending:
+                    return False
+            elif self.policy == "latest":
+                self.pending.clear()
+            elif self.policy == "preempt":
+                self.pending.clear()
+                if self.busy:
+                    self.cancel_token.cancel()
+            elif len(self.pending) >= self.maxsize:
+                return False
+            self.pending.append(job)
+            self.cond.notify_all()
+            return True
+
+    def cancel_all(self):
+        with self.cond:
+            self.pending.clear()
+            if self.busy:
+                self.cancel_token.cancel()
+
+    def wait_idle(self, timeout=None):
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.busy and not self.pending, timeout)
+
+    def shutdown(self, timeout=1):
+        with self.cond:
+            self.stopped = True
+            self.pending.clear()
+            self.cancel_token.cancel()
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.stopped:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+                job = self.pending.popleft()
+                self.busy = True
+                cancel = self.cancel_token = CancelToken()
+            try:
+                self.runner(job, cancel)
+            except Exception as e:
+                executor_log.error("Error in macro executor: %s", e)
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+
+class InputDispatcher:
+    # The pynput callbacks run inside the OS input hook, so they only put
+    # (handler, args, timestamp) on a SimpleQueue, which never blocks, and
+    # note their own run time. This thread runs the handlers in event order
+    # and records how long each hook took as "hook_time" and how long its
+    # event waited here as "hook_queue_delay".
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.queue = queue.SimpleQueue()
+        # (hook label, run time ns), appended by the hooks without a lock
+        self.hook_times = deque(maxlen=HOOK_TIME_BACKLOG)
+        self.thread = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="InputDispatcher", daemon=True)
+            self.thread.start()
+
+    def flush(self, timeout=None):
+        # Waits until every event queued before the call has been handled
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=1):
+        self.queue.put(None)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
                 return
-            self.railgun_timeout = new_timeout
-            self.signal_handler.log_message.emit(f"Updated Railgun/Epoch timeout to {self.railgun_timeout}s")
-        except ValueError:
-            self.signal_handler.show_warning.emit("Please enter a valid number for timeout.")
-            self.signal_handler.log_message.emit("Failed to update Railgun/Epoch timeout: Invalid number entered")
-
-    def set_railgun_keybind(self):
-        self.active_keybind = "railgun"
-        self.railgun_keybind_button.setText("Press a key or side mouse button...")
-        self.signal_handler.log_message.emit("Setting Railgun/Epoch keybind...")
-
-    def set_arc_thrower_keybind(self):
-        self.active_keybind = "arc_thrower"
-        self.arc_thrower_keybind_button.setText("Press a key or side mouse button...")
-        self.signal_handler.log_message.emit("Setting Arc Thrower keybind...")
-
-    def delete_railgun_keybind(self):
-        self.railgun_keybind = ""
-        self.railgun_keybind_button.setText("Set Keybind")
-        self.signal_handler.log_message.emit("Cleared Railgun/Epoch keybind")
-
-    def delete_arc_thrower_keybind(self):
-        self.arc_thrower_keybind = ""
-        self.arc_thrower_keybind_button.setText("Set Keybind")
-        self.signal_handler.log_message.emit("Cleared Arc Thrower keybind")
-
-    def set_keybind(self, index):
-        self.active_keybind = index
-        self.keybind_buttons[index].setText("Press a key or side mouse button...")
-        self.signal_handler.log_message.emit(f"Setting keybind for Stratagem {index+1}...")
-
-    def set_support_keybind(self, index):
-        self.active_keybind = index + len(self.keybind_buttons)
-        self.support_keybind_buttons[index].setText("Press a key or side mouse button...")
-        self.signal_handler.log_message.emit(f"Setting keybind for Support Stratagem {list(SUPPORT_STRATAGEMS.keys())[index]}...")
-
-    def delete_keybind(self, index):
-        self.keybind_vars[index] = ""
-        self.keybind_buttons[index].setText("Set Keybind")
-        self.signal_handler.log_message.emit(f"Cleared keybind for Stratagem {index+1}")
-
-    def delete_support_keybind(self, index):
-        self.support_keybind_vars[index] = ""
-        self.support_keybind_buttons[index].setText("Set Keybind")
-        self.signal_handler.log_message.emit(f"Cleared keybind for Support Stratagem {list(SUPPORT_STRATAGEMS.keys())[index]}")
-
-    def check_keybind_conflict(self, key_str, exclude_index=None):
-        for i, key_var in enumerate(self.keybind_vars):
-            if i != exclude_index and key_var == key_str and i < len(self.keybind_buttons):
-                return f"Keybind '{key_str}' is already assigned to Stratagem {i+1}"
-        for i, key_var in enumerate(self.support_keybind_vars):
-            if (exclude_index is None or i + len(self.keybind_buttons) != exclude_index) and key_var == key_str:
-                return f"Keybind '{key_str}' is already assigned to {list(SUPPORT_STRATAGEMS.keys())[i]}"
-        if exclude_index != "railgun" and self.railgun_keybind == key_str:
-            return f"Keybind '{key_str}' is already assigned to Railgun/Epoch Safety"
-        if exclude_index != "arc_thrower" and self.arc_thrower_keybind == key_str:
-            return f"Keybind '{key_str}' is already assigned to Arc Thrower Rapidfire"
+            if isinstance(item, threading.Event):
+                self._record_hook_times()
+                item.set()
+                continue
+            handler, args, t_ns = item
+            if self.metrics is not None:
+                self.metrics.record("hook_queue_delay", handler.__name__, time.perf_counter_ns() - t_ns)
+            try:
+                handler(*args, t_ns)
+            except Exception as e:
+                listener_log.error("Error in %s: %s", handler.__name__, e)
+            self._record_hook_times()
+
+    def _record_hook_times(self):
+        while self.hook_times:
+            label, elapsed_ns = self.hook_times.popleft()
+            if self.metrics is not None:
+                self.metrics.record("hook_time", label, elapsed_ns)
+
+class BindingIndex:
+    # Maps a (modifier mask, key ID) chord to the prepared actions it triggers
+    # and to the slots that own it. Rebuilt whenever a keybind, combo or
+    # profile changes, so the input handlers only do a single dict lookup
+    # per event, chord or not.
+    __slots__ = ("actions", "owners")
+
+    def __init__(self, actions=None, owners=None):
+        self.actions = actions or {}
+        self.owners = owners or {}
+
+    def lookup(self, mask, kid):
+        return self.actions.get((mask, kid), ())
+
+    def conflict(self, binding, exclude=None):
+        for slot, label in self.owners.get(parse_chord(binding), ()):
+            if slot != exclude:
+                return label
         return None
 
-    def show_warning_message(self, message):
-        QMessageBox.warning(self, "Warning", message)
+def index_bindings(bindings):
+    # Builds a BindingIndex from (keybind, slot, label, action) tuples; empty
+    # keybinds are skipped and a None action only claims the chord
+    actions = {}
+    owners = {}
+    for binding, slot, label, action in bindings:
+        if not binding:
+            continue
+        chord = parse_chord(binding)
+        owners.setdefault(chord, []).append((slot, label))
+        if action is not None:
+            actions.setdefault(chord, []).append(action)
+    return BindingIndex(
+        {chord: tuple(acts) for chord, acts in actions.items()},
+        {chord: tuple(slots) for chord, slots in owners.items()},
+    )
+
+def build_binding_index(keybinds, stratagem_names, support_keybinds, weapon_keybinds, chains,
+                        compiled_stratagems, compiled_support):
+    # weapon_keybinds holds (weapon ID, name, key ID) for every weapon and
+    # chains the profile's StratagemChains, compiled here
+    def bindings():
+        for weapon_id, name, key_var in weapon_keybinds:
+            yield key_var, f"weapon:{weapon_id}", name, BoundAction("weapon", weapon_id)
+        for i, chain in enumerate(chains):
+            compiled = chain.compile(compiled_stratagems, compiled_support)
+            action = BoundAction("chain", chain.name, compiled) if compiled else None
+            yield chain.keybind, f"chain:{i}", f"chain '{chain.name}'", action
+        for i, key_var in enumerate(keybinds):
+            action = None
+            if i < len(stratagem_names):
+                strat_name = stratagem_names[i]
+                if strat_name in compiled_stratagems:
+                    action = BoundAction("stratagem", strat_name, compiled_stratagems[strat_name])
+            yield key_var, i, f"Stratagem {i+1}", action
+        for i, strat_name in enumerate(SUPPORT_STRATAGEMS):
+            if i < len(support_keybinds):
+                compiled = compiled_support.get(strat_name)
+                action = BoundAction("support", strat_name, compiled) if compiled else None
+                yield support_keybinds[i], i + len(keybinds), strat_name, action
+
+    return index_bindings(bindings())
+
+class StratagemChain:
+    # A profile's named list of stratagems or support stratagems, played in
+    # order in one Ctrl hold with gap seconds between them
+    __slots__ = ("name", "stratagems", "gap", "keybind")
+
+    def __init__(self, name, stratagems, gap=DEFAULT_CHAIN_GAP, keybind=""):
+        self.name = name
+        self.stratagems = stratagems
+        self.gap = gap
+        self.keybind = keybind
+
+    def compile(self, compiled_stratagems, compiled_support):
+        # None while any of its stratagems has no compiled sequence
+        sequences = [compiled_stratagems.get(name) or compiled_support.get(name) for name in self.stratagems]
+        if not sequences or not all(sequences):
+            return None
+        return compile_chain(self.name, sequences, self.gap)
+
+    def config(self):
+        return {"name": self.name, "stratagems": list(self.stratagems), "gap": self.gap, "keybind": self.keybind}
+
+def check_chain(name, stratagems, gap, taken=()):
+    # Returns a problem with a chain definition, or None; taken holds the
+    # names of the profile's other chains
+    if not isinstance(name, str) or not name.strip():
+        return "a chain needs a name"
+    if name in taken:
+        return f"there is already a chain named '{name}'"
+    if not isinstance(stratagems, list) or len(stratagems) < 2 or not all(isinstance(s, str) and s for s in stratagems):
+        return f"chain '{name}' needs at least two stratagems"
+    if isinstance(gap, bool) or not isinstance(gap, (int, float)) or not 0 <= gap <= MAX_CHAIN_GAP:
+        return f"the gap of chain '{name}' must be between 0 and {MAX_CHAIN_GAP} seconds"
+    return None
+
+def profile_chains(profile_data):
+    # The profile's StratagemChains; invalid definitions are logged and
+    # skipped. Stratagems missing from the catalog are kept, the chain just
+    # cannot fire until they are back.
+    chains = []
+    for value in profile_data.get("chains", []):
+        if not isinstance(value, dict):
+            profiles_log.warning("Skipped invalid chain: %r", value)
+            continue
+        name = value.get("name")
+        stratagems = value.get("stratagems")
+        gap = value.get("gap", DEFAULT_CHAIN_GAP)
+        problem = check_chain(name, stratagems, gap, [chain.name for chain in chains])
+        if problem:
+            profiles_log.warning("Skipped invalid chain: %s", problem)
+            continue
+        keybind = value.get("keybind", "")
+        chains.append(StratagemChain(name, list(stratagems), gap, keybind if isinstance(keybind, str) else ""))
+    return chains
+
+class RuntimeSnapshot:
+    # Everything the input handlers, the macro thread and the scheduler
+    # decide on, as one immutable object. Writers build a new snapshot with
+    # replace() and swap MacroEngine.runtime in a single assignment; readers
+    # take it once per event and see a consistent view without locks. The
+    # compiled tables and chains in it are never changed in place either:
+    # `chains` is a tuple, and a changed chain is a new StratagemChain.
+    __slots__ = ("running_macro", "binding_index", "hotkey_index", "ctrl_lead_in", "active_keybind", "recorder",
+                 "compiled_stratagems", "compiled_support", "chains", "weapons_enabled")
+
+    def __init__(self, running_macro=False, binding_index=None, hotkey_index=None,
+                 ctrl_lead_in=DEFAULT_CTRL_LEAD_IN, active_keybind=None, recorder=None,
+                 compiled_stratagems=None, compiled_support=None, chains=(), weapons_enabled=frozenset()):
+        init = object.__setattr__
+        init(self, "running_macro", running_macro)
+        init(self, "binding_index", binding_index or BindingIndex())
+        init(self, "hotkey_index", hotkey_index or BindingIndex())
+        init(self, "ctrl_lead_in", ctrl_lead_in)
+        init(self, "active_keybind", active_keybind)
+        init(self, "recorder", recorder)
+        init(self, "compiled_stratagems", compiled_stratagems or {})
+        init(self, "compiled_support", compiled_support or {})
+        init(self, "chains", tuple(chains))
+        init(self, "weapons_enabled", frozenset(weapons_enabled))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuntimeSnapshot is immutable, publish a new one instead")
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return RuntimeSnapshot(**fields)
+
+def runtime_field(name):
+    # MacroEngine attribute read from the current RuntimeSnapshot; assigning
+    # it publishes a new snapshot
+    return property(lambda self: getattr(self.runtime, name),
+                    lambda self, value: self.publish(**{name: value}))
+
+class ProfileBindings:
+    # A saved profile prepared for an instant switch: its data and chains,
+    # the compiled sequences for its key delay and the binding index built
+    # from them
+    __slots__ = ("name", "data", "chains", "compiled_stratagems", "compiled_support", "index")
+
+    def __init__(self, name, data, chains, compiled_stratagems, compiled_support, index):
+        self.name = name
+        self.data = data
+        self.chains = chains
+        self.compiled_stratagems = compiled_stratagems
+        self.compiled_support = compiled_support
+        self.index = index
+
+class CatalogChange:
+    # What a stratagems.json reload added, changed and removed
+    __slots__ = ("added", "changed", "removed", "errors")
+
+    def __init__(self, added, changed, removed, errors):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.errors = errors
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+class CatalogWatcher:
+    # Polls a file's modification time and size from a daemon thread and
+    # calls back once the file has stopped changing. Polling also follows
+    # editors that save by replacing the file.
+    def __init__(self, path, callback, interval=CATALOG_POLL_INTERVAL, debounce=CATALOG_RELOAD_DEBOUNCE):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def _run(self):
+        last = self.signature()
+        changed_at = None
+        while not self.stop_event.wait(self.interval):
+            current = self.signature()
+            if current != last:
+                last = current
+                changed_at = time.monotonic()
+            elif changed_at is not None and current is not None and time.monotonic() - changed_at >= self.debounce:
+                changed_at = None
+                try:
+                    self.callback()
+                except Exception as e:
+                    log.error("Error reloading %s: %s", self.path, e)
+
+def atomic_write_text(path, text, newline=None):
+    # Write aside, fsync and swap in, so a crash leaves the old or the new
+    # file but never half of one. newline="" writes line endings as given.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline=newline) as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def atomic_write_json(path, data):
+    atomic_write_text(path, json.dumps(data, indent=4))
+
+def profile_file_name(name):
+    # Readable and unique for any name: its safe characters plus a hash
+    slug = "".join(c if c.isalnum() or c in "-_" else "_" for c in name).strip("_")[:40]
+    return f"{slug or 'profile'}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}.json"
+
+def default_profile():
+    return {
+        "keybinds": [""] * 5,
+        "stratagems": ["Select Stratagem"] * 5,
+        "support_keybinds": [""] * len(SUPPORT_STRATAGEMS),
+        "weapons": {},
+        "chains": [],
+        "macro_delay": 0.05,
+        "ctrl_lead_in": DEFAULT_CTRL_LEAD_IN,
+        "log_max_lines": DEFAULT_LOG_MAX_LINES,
+        "macro_queue_policy": DEFAULT_MACRO_QUEUE_POLICY,
+        "switch_keybind": ""
+    }
+
+def profile_weapons(profile_data):
+    # Per-weapon keybind, settings and fallback choice by weapon ID, taken
+    # from the keys profiles had before weapons.json when there are none
+    weapons = profile_data.get("weapons")
+    if weapons is not None:
+        return weapons
+    weapons = {}
+    for key, (weapon_id, field, setting) in LEGACY_WEAPON_KEYS.items():
+        if key in profile_data:
+            config = weapons.setdefault(weapon_id, {})
+            if setting is None:
+                config[field] = profile_data[key]
+            else:
+                config.setdefault(field, {})[setting] = profile_data[key]
+    return weapons
+
+class ProfileStore:
+    # Profiles as one JSON record each plus an index with their order and the
+    # last used profile. Only the index is read on load; records are read on
+    # first use. Changes apply in memory at once and a background thread
+    # writes the touched files, so the GUI thread never waits on the disk
+    # and a burst of changes is written once.
+    def __init__(self, directory=PROFILES_DIR, write_delay=PROFILE_WRITE_DELAY):
+        self.directory = directory
+        self.write_delay = write_delay
+        self.names = []
+        self.last_profile = "Default"
+        self.hotkeys = {"next_profile": "", "previous_profile": ""}
+        self.records = {}
+        self.dirty = set()
+        self.deleted = set()
+        self.index_dirty = False
+        self.pending = False
+        self.closed = False
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.thread = None
+        # Called from the writer thread when a write fails
+        self.on_error = lambda message: None
+
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def record_path(self, name):
+        return os.path.join(self.directory, profile_file_name(name))
+
+    def load(self):
+        # Reads the index, or rebuilds it from the records if it is corrupt;
+        # returns False if there is no store yet
+        with self.cond:
+            self.names = []
+            self.last_profile = "Default"
+            self.hotkeys = {"next_profile": "", "previous_profile": ""}
+            self.records.clear()
+        try:
+            with open(self.index_path(), "r") as f:
+                index = json.load(f)
+            names = [name for name in index["profiles"] if isinstance(name, str)]
+            last_profile = index.get("last_profile", "Default")
+            self.hotkeys.update((slot, key) for slot, key in index.get("hotkeys", {}).items() if slot in self.hotkeys)
+        except FileNotFoundError:
+            if not os.path.isdir(self.directory):
+                return False
+            names, last_profile = self.recover(), "Default"
+        except (ValueError, KeyError, TypeError) as e:
+            profiles_log.error("Error reading %s, rebuilding it: %s", self.index_path(), e)
+            names, last_profile = self.recover(), "Default"
+        with self.cond:
+            self.names = names
+            self.last_profile = last_profile
+        return True
+
+    def recover(self):
+        names = []
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith(".json") or file_name == "index.json":
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name), "r") as f:
+                    record = json.load(f)
+                self.records[record["name"]] = record["profile"]
+                names.append(record["name"])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                profiles_log.error("Skipping unreadable profile %s: %s", file_name, e)
+        self.index_dirty = True
+        return names
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def get(self, name):
+        # The profile's data, or None if it does not exist or cannot be read
+        with self.cond:
+            if name not in self.names:
+                return None
+            data = self.records.get(name)
+        if data is None:
+            try:
+                with open(self.record_path(name), "r") as f:
+                    data = json.load(f)["profile"]
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                profiles_log.error("Error reading profile %s: %s", name, e)
+                return None
+            with self.cond:
+                data = self.records.setdefault(name, data)
+        return data
+
+    def put(self, name, data):
+        with self.cond:
+            if name not in self.names:
+                self.names.append(name)
+                self.index_dirty = True
+            self.records[name] = data
+            self.dirty.add(name)
+            self.deleted.discard(name)
+            self.schedule()
+
+    def rename(self, old_name, new_name):
+        data = self.get(old_name)
+        if data is None:
+            raise ValueError(f"profile '{old_name}' could not be read")
+        with self.cond:
+            self.names[self.names.index(old_name)] = new_name
+            self.records.pop(old_name, None)
+            self.records[new_name] = data
+            self.dirty.discard(old_name)
+            self.dirty.add(new_name)
+            self.deleted.add(old_name)
+            self.deleted.discard(new_name)
+            if self.last_profile == old_name:
+                self.last_profile = new_name
+            self.index_dirty = True
+            self.schedule()
+
+    def delete(self, name):
+        with self.cond:
+            self.names.remove(name)
+            self.records.pop(name, None)
+            self.dirty.discard(name)
+            self.deleted.add(name)
+            self.index_dirty = True
+            self.schedule()
+
+    def set_last_profile(self, name):
+        with self.cond:
+            if name != self.last_profile:
+                self.last_profile = name
+                self.index_dirty = True
+                self.schedule()
+
+    def set_hotkey(self, slot, key):
+        with self.cond:
+            if self.hotkeys.get(slot) != key:
+                self.hotkeys[slot] = key
+                self.index_dirty = True
+                self.schedule()
+
+    def schedule(self):
+        # Called with the lock held
+        self.pending = True
+        if self.thread is None and not self.closed:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.cond.notify_all()
+
+    def flush(self):
+        # Writes everything changed so far; records go first and files of
+        # deleted or renamed profiles last, so the index never names a
+        # missing record
+        with self.write_lock:
+            with self.cond:
+                self.pending = False
+                records = {name: self.records[name] for name in self.dirty}
+                deleted = set(self.deleted)
+                index = {"profiles": list(self.names), "last_profile": self.last_profile, "hotkeys": dict(self.hotkeys)} if self.index_dirty else None
+                self.dirty.clear()
+                self.deleted.clear()
+                self.index_dirty = False
+            if not records and not deleted and index is None:
+                return True
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                for name, data in records.items():
+                    atomic_write_json(self.record_path(name), {"name": name, "profile": data})
+                if index is not None:
+                    atomic_write_json(self.index_path(), index)
+                for name in deleted:
+                    try:
+                        os.remove(self.record_path(name))
+                    except FileNotFoundError:
+                        pass
+            except Exception as e:
+                # Keep the changes so the next save or flush retries them
+                with self.cond:
+                    self.dirty.update(name for name in records if name in self.records)
+                    self.deleted.update(name for name in deleted if name not in self.names)
+                    self.index_dirty = self.index_dirty or index is not None
+                profiles_log.error("Error saving profiles: %s", e)
+                self.on_error(f"Failed to save profiles: {e}")
+                return False
+            profiles_log.debug("Saved %d profiles, removed %d", len(records), len(deleted))
+            return True
+
+    def close(self):
+        # Stops the writer thread and writes what is left
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+        return self.flush()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                # Wait until changes stop coming in for write_delay
+                self.pending = False
+                while not self.closed:
+                    self.cond.wait(self.write_delay)
+                    if not self.pending:
+                        break
+                    self.pending = False
+                if self.closed:
+                    return
+            self.flush()
+
+PROFILE_STORE = ProfileStore()
+
+def load_legacy_profiles():
+    # profiles.json and last_profile.json from before the profile store
+    with open("profiles.json", "r") as f:
+        profiles = json.load(f)
+    try:
+        with open("last_profile.json", "r") as f:
+            last_profile = json.load(f).get("last_profile", "Default")
+    except (OSError, ValueError, AttributeError):
+        last_profile = "Default"
+    return profiles, last_profile
+
+def load_data_files():
+    # Loads the stratagem catalog into STRATAGEM_DATA, the weapons into
+    # WEAPON_CATALOG and the profile index into PROFILE_STORE; returns
+    # warnings for the user
+    global STRATAGEM_DATA, WEAPON_CATALOG
+    warnings = []
+
+    # Load stratagems.json
+    try:
+        STRATAGEM_DATA = load_catalog("stratagems.json")
+    except FileNotFoundError:
+        warnings.append("stratagems.json not found, creating basic file.")
+        basic_stratagems = {
+            "Machine Gun": {
+                "sequence": ["down", "left", "down", "up", "right"],
+                "color": "#FF0000"
+            },
+            "Anti-Materiel Rifle": {
+                "sequence": ["down", "left", "right", "up", "down"],
+                "color": "#00FF00"
+            },
+            "Eagle Airstrike": {
+                "sequence": ["up", "right", "down", "right"],
+                "color": "#FF4500"
+            },
+            "Orbital Precision Strike": {
+                "sequence": ["right", "right", "up"],
+                "color": "#FFA500"
+            },
+        }
+        with open("stratagems.json", "w") as f:
+            json.dump(basic_stratagems, f, indent=4)
+        STRATAGEM_DATA = normalize_catalog(basic_stratagems)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        profiles_log.error("Error decoding stratagems.json: %s", e)
+        STRATAGEM_DATA = StratagemCatalog()
+    if STRATAGEM_DATA.problems:
+        warnings.append("Invalid stratagems in stratagems.json were skipped:\n" + "\n".join(STRATAGEM_DATA.problems))
+
+    # Load weapons.json
+    try:
+        WEAPON_CATALOG = load_weapons("weapons.json")
+    except FileNotFoundError:
+        warnings.append("weapons.json not found, creating basic file.")
+        basic_weapons = {
+            "railgun": {
+                "name": "Railgun/Epoch Safety",
+                "description": "Releases left click or switches weapon if held longer than {timeout}s.",
+                "group": "left_click",
+                "trigger": "mouse:left",
+                "settings": {"timeout": {"label": "Safety Timeout", "default": 2.95, "min": 0.1, "max": 10}},
+                "steps": [{"after": "timeout", "offset": -0.05, "release": "mouse:left"}],
+                "fallback": {
+                    "label": "Use keyboard fallback (press '1' to interrupt)",
+                    "steps": [{"after": "timeout", "offset": -0.05, "press": "1"}, {"after": 0.01, "release": "1"}]
+                }
+            },
+            "arc_thrower": {
+                "name": "Arc Thrower Rapidfire",
+                "description": "Releases left click every {hold}s while held and represses it {gap}s later.",
+                "group": "left_click",
+                "trigger": "mouse:left",
+                "repeat": True,
+                "settings": {
+                    "hold": {"label": "Hold Time", "default": 1.05, "min": 0.15, "max": 10},
+                    "gap": {"label": "Repress Gap", "default": 0.03, "min": 0.01, "max": 0.5}
+                },
+                "steps": [{"after": "hold", "release": "mouse:left"}, {"after": "gap", "press": "mouse:left"}]
+            }
+        }
+        with open("weapons.json", "w") as f:
+            json.dump(basic_weapons, f, indent=4)
+        WEAPON_CATALOG = normalize_weapons(basic_weapons)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        profiles_log.error("Error decoding weapons.json: %s", e)
+        WEAPON_CATALOG = WeaponCatalog()
+    if WEAPON_CATALOG.problems:
+        warnings.append("Invalid weapons in weapons.json were skipped:\n" + "\n".join(WEAPON_CATALOG.problems))
+
+    # Load the profile store, moving profiles.json into it on first start
+    if not PROFILE_STORE.load():
+        try:
+            profiles, last_profile = load_legacy_profiles()
+            for name, data in profiles.items():
+                PROFILE_STORE.put(name, data)
+            PROFILE_STORE.set_last_profile(last_profile)
+            profiles_log.info("Moved %d profiles from profiles.json to %s/", len(profiles), PROFILES_DIR)
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError) as e:
+            profiles_log.error("Error decoding profiles.json: %s", e)
+            warnings.append(f"profiles.json could not be read and was not imported: {e}")
+    if not PROFILE_STORE.names:
+        PROFILE_STORE.put("Default", default_profile())
+    PROFILE_STORE.flush()
+
+    for warning in warnings:
+        profiles_log.warning("%s", warning)
+    return warnings
+
+class MacroEngine:
+    # Listeners, stratagem playback and weapon helpers without any widgets;
+    # the GUI and the headless mode both drive one of these
+    running_macro = runtime_field("running_macro")
+    binding_index = runtime_field("binding_index")
+    hotkey_index = runtime_field("hotkey_index")
+    ctrl_lead_in = runtime_field("ctrl_lead_in")
+    # Keybind slot waiting for a key, and the MacroRecorder while a
+    # recording runs; either one takes the input handlers off the keybinds
+    active_keybind = runtime_field("active_keybind")
+    recorder = runtime_field("recorder")
+    # Compiled catalog and chains the binding index was built from, and the
+    # IDs of the enabled weapons
+    compiled_stratagems = runtime_field("compiled_stratagems")
+    compiled_support = runtime_field("compiled_support")
+    chains = runtime_field("chains")
+    weapons_enabled = runtime_field("weapons_enabled")
 
-    def create_new_profile(self):
-        profile_name = self.profile_name_entry.text().strip()
-        if not profile_name:
-            self.signal_handler.show_warning.emit("Please enter a profile name.")
-            self.signal_handler.log_message.emit("Failed to create profile: No profile name entered")
-            return
+    def __init__(self):
+        # State read on the hot paths lives in an immutable RuntimeSnapshot;
+        # runtime_lock only orders the writers
+        self.runtime = RuntimeSnapshot()
+        self.runtime_lock = threading.Lock()
+        self.started = False
+        # Mouse buttons held down, by key ID, with the perf_counter_ns of
+        # their press. Owned by the input dispatcher thread, like the
+        # modifier state below.
+        self.held_buttons = {}
+        # Weapons from weapons.json by ID, and by the key ID of their trigger
+        # button; weapon_lock guards their running patterns
+        self.weapons = {}
+        self.weapon_triggers = {}
+        self.weapon_lock = threading.Lock()
+        self.set_weapon_catalog(WEAPON_CATALOG or WeaponCatalog())
+        self.toggle_debounce = 0.2
+        # Actions ignored until their debounce deadline fires
+        self.debouncing = set()
+        self.macro_delay = 0.05
+        self.last_sequence_jitter_ns = ()
+        self.keybind_vars = [""] * 5
+        self.stratagem_names = ["Select Stratagem"] * 5
+        self.support_keybind_vars = [""] * len(SUPPORT_STRATAGEMS)
+        self.macro_queue_policy = DEFAULT_MACRO_QUEUE_POLICY
+        self.sequence_errors = []
+        # Saved profiles prepared for hotkey switching, compiled sequences by
+        # key delay, and the profile hotkeys, looked up before binding_index
+        self.profile_name = None
+        self.profile_switch_keybind = ""
+        self.prepared_profiles = {}
+        self.compiled_by_delay = {}
+        # Bitmask of the modifier keys held down, its chord mask, the chord
+        # modifiers a running sequence holds itself, which chords ignore, and
+        # those whose injected press has not come back through the hooks yet.
+        # Only the input dispatcher thread touches these; a sequence queues
+        # its changes there with queue_injected_modifiers().
+        self.held_modifiers = 0
+        self.modifiers = 0
+        self.injected_modifiers = 0
+        self.expected_injected = 0
+        # Orders the writers of the catalog and profile state: reloads from
+        # the catalog watcher, the compiled tables by delay, the sequence
+        # errors, the prepared profiles and the active profile's fields
+        # (keybinds, stratagem choices, key delay, queue policy, switch
+        # hotkey), which hotkey switches change from the input dispatcher.
+        # Reentrant, since a reload prepares the profiles again.
+        self.profile_lock = threading.RLock()
+        self.catalog_watcher = CatalogWatcher("stratagems.json", lambda: self.reload_stratagems(notify=False))
+        self.metrics = MetricsRegistry()
+        self.scheduler = DeadlineScheduler(self.metrics)
+        self.input_dispatcher = InputDispatcher(self.metrics)
+        self.macro_executor = MacroExecutor(
+            lambda job, cancel: self.run_macro_sequence(job[0], test_mode=job[3], cancel=cancel, trigger_ns=job[1], binding=job[2]),
+            self.macro_queue_policy
+        )
 
-        if profile_name in PROFILES:
-            self.signal_handler.show_warning.emit("Profile name already exists.")
-            self.signal_handler.log_message.emit("Failed to create profile: Profile name already exists")
+        # Front-end hooks, called from listener and worker threads
+        self.on_warning = lambda message: None
+        self.on_blink = lambda: None
+        self.on_state_changed = lambda: None
+        self.on_catalog_changed = lambda change: None
+        self.on_profile_switched = lambda name: None
+        self.on_recording_stopped = lambda recorder: None
+
+    def start(self):
+        # Input backend, sequence compilation, executor and listeners
+        if self.started:
             return
-
-        profile_data = {
-            "keybinds": self.keybind_vars[:],
-            "stratagems": [combo.currentText() for combo in self.stratagem_combos],
-            "support_keybinds": self.support_keybind_vars[:],
-            "railgun_timeout": self.railgun_timeout,
-            "arc_thrower_delay": self.arc_thrower_delay,
-            "railgun_keybind": self.railgun_keybind,
-            "arc_thrower_keybind": self.arc_thrower_keybind,
-            "railgun_use_keyboard_fallback": self.railgun_use_keyboard_fallback,
-            "macro_delay": self.macro_delay
-        }
-
-        PROFILES[profile_name] = profile_data
+        load_pynput()
+        if injector is None:
+            set_injector("pynput")
+        self.started = True
+        compiled_stratagems, compiled_support = self.compile_sequences()
+        self.prepare_profiles()
+        self.rebuild_binding_index(compiled_stratagems=compiled_stratagems, compiled_support=compiled_support)
+        self.macro_executor.start()
+        self.start_listeners()
+        self.catalog_watcher.start()
+
+    def publish(self, **changes):
+        # Swaps in a new RuntimeSnapshot with the given fields changed
+        with self.runtime_lock:
+            self.runtime = self.runtime.replace(**changes)
+
+    def shutdown(self):
+        self.publish(running_macro=False, weapons_enabled=frozenset())
+        self.catalog_watcher.stop()
+        self.stop_all_threads()
+        self.macro_executor.shutdown()
+        self.scheduler.stop()
+        self.stop_listeners()
+
+    def compile_sequences(self):
+        # Returns the compiled stratagem and support tables for the current
+        # key delay; the caller publishes them with the index built on them
+        with self.profile_lock:
+            compiled_stratagems, errors = compile_catalog(STRATAGEM_DATA.entries, self.macro_delay)
+            compiled_support, support_errors = compile_catalog(SUPPORT_CATALOG.entries, self.macro_delay)
+            self.sequence_errors = errors + support_errors
+            self.compiled_by_delay[self.macro_delay] = (compiled_stratagems, compiled_support)
+        for error in self.sequence_errors:
+            executor_log.warning("Invalid stratagem sequence: %s", error)
+        return compiled_stratagems, compiled_support
+
+    def reload_stratagems(self, notify=True):
+        # Called from the Reload button and the catalog watcher thread.
+        # Returns the CatalogChange, or None if the file could not be read;
+        # notify=False only logs read errors, for saves caught half-way.
         try:
-            with open("profiles.json", "w") as f:
-                json.dump(PROFILES, f, indent=4)
-            self.profile_combo.addItem(profile_name)
-            self.profile_combo.setCurrentText(profile_name)
-            self.profile_name_entry.clear()
-            self.save_last_profile(profile_name)
-            self.signal_handler.log_message.emit(f"Created new profile: {profile_name}")
+            catalog = load_catalog("stratagems.json")
         except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to create profile: {e}")
-            self.signal_handler.log_message.emit(f"Failed to create profile: {e}")
-
-    def save_profile(self):
-        profile_name = self.profile_combo.currentText()
-        if not profile_name:
-            self.signal_handler.show_warning.emit("Please select a profile to save.")
-            self.signal_handler.log_message.emit("Failed to save profile: No profile selected")
-            return
+            if notify:
+                self.on_warning(f"Failed to reload stratagems: {e}")
+            executor_log.warning("Failed to reload stratagems: %s", e)
+            return None
+        with self.profile_lock:
+            change = self.apply_catalog(catalog)
+        if change or notify:
+            self.on_catalog_changed(change)
+        return change
+
+    def apply_catalog(self, catalog):
+        # Only added and changed entries are compiled. The new catalog and
+        # compiled sequences replace the old ones in single assignments, so
+        # the listener threads never wait and never see a half-updated dict.
+        global STRATAGEM_DATA
+        old_catalog = STRATAGEM_DATA or StratagemCatalog()
+        old_entries = old_catalog.entries
+        entries = catalog.entries
+        added = [name for name in entries if name not in old_entries]
+        changed = [name for name in entries if name in old_entries and entries[name] != old_entries[name]]
+        removed = [name for name in old_entries if name not in entries]
+        affected = set(added) | set(changed) | set(removed)
+        # Problems are reported when they first appear, not on every save
+        errors = [problem for problem in catalog.problems if problem not in old_catalog.problems]
+        for error in errors:
+            executor_log.warning("Invalid stratagem skipped: %s", error)
+        changes = {}
+        if self.started and affected:
+            compiled = {name: seq for name, seq in self.compiled_stratagems.items() if name not in affected}
+            fresh, compile_errors = compile_catalog({name: entries[name] for name in added + changed}, self.macro_delay)
+            compiled.update(fresh)
+            for error in compile_errors:
+                executor_log.warning("Invalid stratagem sequence: %s", error)
+            self.sequence_errors = [error for error in self.sequence_errors if error.split(":", 1)[0] not in affected] + compile_errors
+            errors += compile_errors
+            STRATAGEM_DATA = catalog
+            changes["compiled_stratagems"] = compiled
+            self.compiled_by_delay = {self.macro_delay: (compiled, self.compiled_support)}
+            self.prepare_profiles()
+        else:
+            STRATAGEM_DATA = catalog
+        # The index holds compiled sequences, so it is swapped in together
+        # with them when a bound stratagem or chain changed
+        if affected & (set(self.stratagem_names) | {name for chain in self.chains for name in chain.stratagems}):
+            self.rebuild_binding_index(**changes)
+        elif changes:
+            self.publish(**changes)
+        executor_log.info("Stratagems reloaded: %d added, %d changed, %d removed", len(added), len(changed), len(removed))
+        return CatalogChange(added, changed, removed, errors)
+
+    def rebuild_binding_index(self, **changes):
+        # Other runtime changes are published with the new index, which is
+        # built from the chains and compiled tables among them
+        with self.runtime_lock:
+            runtime = self.runtime.replace(**changes)
+            index = build_binding_index(
+                self.keybind_vars, self.stratagem_names, self.support_keybind_vars,
+                [(weapon_id, state.spec.name, state.keybind) for weapon_id, state in self.weapons.items()],
+                runtime.chains, runtime.compiled_stratagems, runtime.compiled_support
+            )
+            self.runtime = runtime.replace(binding_index=index)
+
+    def rebuild_hotkey_index(self):
+        def bindings():
+            for name, prepared in self.prepared_profiles.items():
+                if name == self.profile_name:
+                    yield self.profile_switch_keybind, "profile_switch", f"switching to profile '{name}'", BoundAction("profile", name)
+                else:
+                    yield prepared.data.get("switch_keybind", ""), f"profile:{name}", f"switching to profile '{name}'", BoundAction("profile", name)
+            for slot in ("next_profile", "previous_profile"):
+                yield PROFILE_STORE.hotkeys.get(slot, ""), slot, PROFILE_HOTKEY_LABELS[slot], BoundAction(slot)
+
+        self.hotkey_index = index_bindings(bindings())
+
+    def compiled_for(self, delay):
+        # Catalog compiled at a key delay, shared by all profiles using it
+        if not self.started:
+            return {}, {}
+        compiled = self.compiled_by_delay.get(delay)
+        if compiled is None:
+            stratagems, _ = compile_catalog(STRATAGEM_DATA.entries, delay)
+            support, _ = compile_catalog(SUPPORT_CATALOG.entries, delay)
+            compiled = self.compiled_by_delay[delay] = (stratagems, support)
+        return compiled
+
+    def prepare_profile(self, name, profile_data):
+        compiled_stratagems, compiled_support = self.compiled_for(profile_data.get("macro_delay", 0.05))
+        weapons = profile_weapons(profile_data)
+        chains = profile_chains(profile_data)
+        index = build_binding_index(
+            profile_data.get("keybinds", [""] * 5),
+            profile_data.get("stratagems", ["Select Stratagem"] * 5),
+            profile_data.get("support_keybinds", [""] * len(SUPPORT_STRATAGEMS)),
+            [(weapon_id, state.spec.name, weapons.get(weapon_id, {}).get("keybind", "")) for weapon_id, state in self.weapons.items()],
+            chains, compiled_stratagems, compiled_support
+        )
+        return ProfileBindings(name, profile_data, chains, compiled_stratagems, compiled_support, index)
+
+    def prepare_profiles(self):
+        with self.profile_lock:
+            prepared = {}
+            for name in PROFILE_STORE.names:
+                profile_data = PROFILE_STORE.get(name)
+                if profile_data is not None:
+                    prepared[name] = self.prepare_profile(name, profile_data)
+            self.prepared_profiles = prepared
+            self.rebuild_hotkey_index()
 
-        reply = QMessageBox.question(self, "Confirmation", f"Are you sure you want to overwrite '{profile_name}'?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-        if reply == QMessageBox.No:
-            return
+    def check_keybind_conflict(self, key_str, exclude_index=None):
+        label = self.binding_index.conflict(key_str, exclude_index) or self.hotkey_index.conflict(key_str, exclude_index)
+        if label:
+            return f"Keybind '{key_str}' is already assigned to {label}"
+        if exclude_index in PROFILE_HOTKEY_LABELS:
+            # Profile hotkeys win over every profile's own keybinds
+            for name, prepared in self.prepared_profiles.items():
+                label = prepared.index.conflict(key_str) if name != self.profile_name else None
+                if label:
+                    return f"Keybind '{key_str}' is already assigned to {label} in profile '{name}'"
+        return None
 
-        profile_data = {
-            "keybinds": self.keybind_vars[:],
-            "stratagems": [combo.currentText() for combo in self.stratagem_combos],
-            "support_keybinds": self.support_keybind_vars[:],
-            "railgun_timeout": self.railgun_timeout,
-            "arc_thrower_delay": self.arc_thrower_delay,
-            "railgun_keybind": self.railgun_keybind,
-            "arc_thrower_keybind": self.arc_thrower_keybind,
-            "railgun_use_keyboard_fallback": self.railgun_use_keyboard_fallback,
-            "macro_delay": self.macro_delay
-        }
+    def apply_profile(self, profile_data, name=None):
+        with self.profile_lock:
+            prepared = self.prepare_profile(name, profile_data)
+            if name is not None:
+                self.prepared_profiles[name] = prepared
+            self.activate_profile(prepared)
+            self.rebuild_hotkey_index()
+        self.on_state_changed()
+
+    def activate_profile(self, prepared):
+        # Called with profile_lock held. The index, the compiled tables and
+        # the chains are published in one snapshot, so every keybind switches
+        # at once; the rest only matters to the next action
+        profile_data = prepared.data
+        self.publish(
+            binding_index=prepared.index, ctrl_lead_in=profile_data.get("ctrl_lead_in", DEFAULT_CTRL_LEAD_IN),
+            compiled_stratagems=prepared.compiled_stratagems, compiled_support=prepared.compiled_support,
+            chains=prepared.chains
+        )
+        self.profile_name = prepared.name
+        self.keybind_vars = list(profile_data.get("keybinds", [""] * 5))
+        self.stratagem_names = list(profile_data.get("stratagems", ["Select Stratagem"] * 5))
+        self.support_keybind_vars = list(profile_data.get("support_keybinds", [""] * len(SUPPORT_STRATAGEMS)))
+        weapons = profile_weapons(profile_data)
+        with self.weapon_lock:
+            for weapon_id, state in self.weapons.items():
+                state.configure(weapons.get(weapon_id, {}))
+        self.macro_delay = profile_data.get("macro_delay", 0.05)
+        self.profile_switch_keybind = profile_data.get("switch_keybind", "")
+        set_log_levels(profile_data.get("log_levels", {}))
+        policy = profile_data.get("macro_queue_policy", DEFAULT_MACRO_QUEUE_POLICY)
+        self.macro_queue_policy = policy if policy in MACRO_QUEUE_POLICIES else DEFAULT_MACRO_QUEUE_POLICY
+        self.macro_executor.policy = self.macro_queue_policy
+
+    def switch_profile(self, name):
+        # Hotkey switch from a listener thread; the front end catches up
+        # through on_profile_switched
+        start_ns = time.perf_counter_ns()
+        with self.profile_lock:
+            prepared = self.prepared_profiles.get(name)
+            if prepared is not None:
+                self.activate_profile(prepared)
+        if prepared is None:
+            profiles_log.warning("Cannot switch to profile %s: not found", name)
+            return False
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        self.metrics.record("profile_switch", "hotkey", elapsed_ns)
+        profiles_log.info("Switched to profile %s (%.0fµs)", name, elapsed_ns / 1000)
+        PROFILE_STORE.set_last_profile(name)
+        self.on_profile_switched(name)
+        return True
+
+    def cycle_profile(self, step):
+        with self.profile_lock:
+            names = [name for name in PROFILE_STORE.names if name in self.prepared_profiles]
+            if not names:
+                return False
+            if self.profile_name in names:
+                position = (names.index(self.profile_name) + step) % len(names)
+            else:
+                position = 0
+            return self.switch_profile(names[position])
 
-        PROFILES[profile_name] = profile_data
-        try:
-            with open("profiles.json", "w") as f:
-                json.dump(PROFILES, f, indent=4)
-            self.signal_handler.log_message.emit(f"Saved profile: {profile_name}")
-            self.save_last_profile(profile_name)
-        except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to save profile: {e}")
-            self.signal_handler.log_message.emit(f"Failed to save profile: {e}")
+    def set_hotkey(self, slot, key_str):
+        with self.profile_lock:
+            if slot == "profile_switch":
+                self.profile_switch_keybind = key_str
+            else:
+                PROFILE_STORE.set_hotkey(slot, key_str)
+            self.rebuild_hotkey_index()
+        listener_log.info("Set %s keybind to %s", PROFILE_HOTKEY_LABELS[slot], key_str or "none")
+
+    def set_chain(self, index, name, stratagems, gap):
+        # Adds a chain when index is None, otherwise redefines it keeping its
+        # keybind. Raises ValueError with a message for the user.
+        taken = [chain.name for i, chain in enumerate(self.chains) if i != index]
+        problem = check_chain(name, stratagems, gap, taken)
+        if problem is None:
+            for strat_name in stratagems:
+                if strat_name not in STRATAGEM_DATA.entries and strat_name not in SUPPORT_STRATAGEMS:
+                    problem = f"unknown stratagem '{strat_name}'"
+                    break
+        if problem:
+            raise ValueError(problem[0].upper() + problem[1:])
+        chains = list(self.chains)
+        if index is None:
+            chains.append(StratagemChain(name, list(stratagems), gap))
+            executor_log.info("Added chain %s: %s", name, " → ".join(stratagems))
+        else:
+            chains[index] = StratagemChain(name, list(stratagems), gap, chains[index].keybind)
+            executor_log.info("Updated chain %s: %s, %ss apart", name, " → ".join(stratagems), gap)
+        self.rebuild_binding_index(chains=chains)
+        self.on_state_changed()
+
+    def set_chain_keybind(self, index, key_str):
+        chains = list(self.chains)
+        chain = chains[index]
+        chains[index] = StratagemChain(chain.name, chain.stratagems, chain.gap, key_str)
+        self.rebuild_binding_index(chains=chains)
+
+    def delete_chain(self, index):
+        # A keybind being captured for a chain could land on the wrong one
+        if isinstance(self.active_keybind, str) and self.active_keybind.startswith("chain:"):
+            self.active_keybind = None
+        chains = list(self.chains)
+        chain = chains.pop(index)
+        self.rebuild_binding_index(chains=chains)
+        executor_log.info("Deleted chain %s", chain.name)
+        self.on_state_changed()
+
+    def test_sequence(self, compiled):
+        # Test buttons: played by the executor like a triggered sequence, so
+        # never at the same time as one, but also while the system is stopped
+        if not self.macro_executor.submit((compiled, None, "test", True)):
+            executor_log.info("Macro busy, dropped test of %s (policy: %s)", compiled.name, self.macro_queue_policy)
+
+    def compiled_chain(self, index):
+        runtime = self.runtime
+        return runtime.chains[index].compile(runtime.compiled_stratagems, runtime.compiled_support)
+
+    # Saved under profile_lock, so a catalog reload that prepares every
+    # profile again cannot drop the change
+    def save_profile(self, name, profile_data):
+        with self.profile_lock:
+            PROFILE_STORE.put(name, profile_data)
+            self.prepared_profiles[name] = self.prepare_profile(name, profile_data)
+            self.rebuild_hotkey_index()
+
+    def rename_profile(self, old_name, new_name):
+        with self.profile_lock:
+            PROFILE_STORE.rename(old_name, new_name)
+            prepared = self.prepared_profiles.pop(old_name, None)
+            if prepared is not None:
+                self.prepared_profiles[new_name] = self.prepare_profile(new_name, prepared.data)
+            if self.profile_name == old_name:
+                self.profile_name = new_name
+            self.rebuild_hotkey_index()
+
+    def delete_profile(self, name):
+        with self.profile_lock:
+            PROFILE_STORE.delete(name)
+            self.prepared_profiles.pop(name, None)
+            if self.profile_name == name:
+                self.profile_name = None
+            self.rebuild_hotkey_index()
+
+    def collect_profile_data(self):
+        # Under profile_lock, so a hotkey switch cannot land half-way
+        with self.profile_lock:
+            return {
+                "keybinds": self.keybind_vars[:],
+                "stratagems": self.stratagem_names[:],
+                "support_keybinds": self.support_keybind_vars[:],
+                "weapons": {weapon_id: state.config() for weapon_id, state in self.weapons.items()},
+                "chains": [chain.config() for chain in self.chains],
+                "macro_delay": self.macro_delay,
+                "ctrl_lead_in": self.ctrl_lead_in,
+                "log_levels": get_log_levels(),
+                "macro_queue_policy": self.macro_queue_policy,
+                "switch_keybind": self.profile_switch_keybind
+            }
 
-    def load_profile(self, profile_name):
-        if not profile_name or profile_name not in PROFILES:
-            self.signal_handler.show_warning.emit("Invalid profile selected.")
-            self.signal_handler.log_message.emit("Failed to load profile: Invalid profile selected")
-            return
+    def set_keybind(self, slot, key_str):
+        # slot counts the stratagem keybinds, then the support ones
+        with self.profile_lock:
+            if slot < len(self.keybind_vars):
+                self.keybind_vars[slot] = key_str
+            else:
+                self.support_keybind_vars[slot - len(self.keybind_vars)] = key_str
+            self.rebuild_binding_index()
+
+    def set_stratagem_choice(self, index, strat_name):
+        with self.profile_lock:
+            self.stratagem_names[index] = strat_name
+            self.rebuild_binding_index()
+
+    def set_running(self, running):
+        # Stopping disables every weapon in the same snapshot
+        if running:
+            self.running_macro = True
+        else:
+            self.publish(running_macro=False, weapons_enabled=frozenset())
+        log.info("Macro system %s", 'started' if running else 'stopped')
 
-        try:
-            profile_data = PROFILES[profile_name]
-            self.keybind_vars = profile_data.get("keybinds", [""] * 5)
-            self.support_keybind_vars = profile_data.get("support_keybinds", [""] * len(SUPPORT_STRATAGEMS))
-
-            for i in range(len(self.keybind_buttons)):
-                self.keybind_buttons[i].setText(self.keybind_vars[i] if self.keybind_vars[i] else "Set Keybind")
-
-            for i in range(len(self.stratagem_combos)):
-                self.stratagem_combos[i].setCurrentText(profile_data.get("stratagems", ["Select Stratagem"] * 5)[i])
-                self.update_stratagem_output(i)
-
-            for i in range(len(self.support_keybind_buttons)):
-                self.support_keybind_buttons[i].setText(self.support_keybind_vars[i] if self.support_keybind_vars[i] else "Set Keybind")
-
-            self.railgun_timeout = profile_data.get("railgun_timeout", 2.95)
-            self.timeout_entry.setText(str(self.railgun_timeout))
-            self.arc_thrower_delay = profile_data.get("arc_thrower_delay", 1.05)
-            self.arc_thrower_delay_entry.setText(str(self.arc_thrower_delay))
-            self.arc_thrower_info.setText(f"Arc Thrower rapidfire releases and represses left click every {self.arc_thrower_delay}s when held.")
-            self.railgun_keybind = profile_data.get("railgun_keybind", "")
-            self.railgun_keybind_button.setText(self.railgun_keybind if self.railgun_keybind else "Set Keybind")
-            self.arc_thrower_keybind = profile_data.get("arc_thrower_keybind", "")
-            self.arc_thrower_keybind_button.setText(self.arc_thrower_keybind if self.arc_thrower_keybind else "Set Keybind")
-            self.railgun_use_keyboard_fallback = profile_data.get("railgun_use_keyboard_fallback", False)
-            self.railgun_fallback_checkbox.setChecked(self.railgun_use_keyboard_fallback)
-            self.macro_delay = profile_data.get("macro_delay", 0.05)
-            self.profile_name_entry.setText(profile_name)
-            self.signal_handler.log_message.emit(f"Loaded profile: {profile_name}")
-            self.save_last_profile(profile_name)
-        except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to load profile: {e}")
-            self.signal_handler.log_message.emit(f"Failed to load profile: {e}")
-
-    def rename_profile(self):
-        old_name = self.profile_combo.currentText()
-        new_name = self.profile_name_entry.text().strip()
-        if not old_name or not new_name:
-            self.signal_handler.show_warning.emit("Please select a profile and enter a new name.")
-            self.signal_handler.log_message.emit("Failed to rename profile: Missing profile or new name")
+        if not running:
+            self.stop_all_threads()
+        else:
+            for weapon_id in self.weapons_enabled:
+                self.resume_weapon(self.weapons[weapon_id])
+        self.on_state_changed()
+
+    def set_macro_queue_policy(self, policy):
+        if policy not in MACRO_QUEUE_POLICIES:
             return
-        if new_name in PROFILES:
-            self.signal_handler.show_warning.emit("Profile name already exists.")
-            self.signal_handler.log_message.emit("Failed to rename profile: Profile name already exists")
+        with self.profile_lock:
+            self.macro_queue_policy = policy
+            self.macro_executor.policy = policy
+        executor_log.info("Macro queue policy set to %s", policy)
+
+    def set_sequence_timing(self, delay, lead_in):
+        with self.profile_lock:
+            if delay != self.macro_delay and self.started:
+                # The new tables, index and lead-in go out in one snapshot
+                self.macro_delay = delay
+                compiled_stratagems, compiled_support = self.compile_sequences()
+                self.rebuild_binding_index(
+                    compiled_stratagems=compiled_stratagems, compiled_support=compiled_support, ctrl_lead_in=lead_in
+                )
+            else:
+                # Before start() the tables are compiled there with this delay
+                self.macro_delay = delay
+                self.publish(ctrl_lead_in=lead_in)
+        executor_log.info("Updated sequence timing: key delay %ss, Ctrl lead-in %ss", self.macro_delay, self.ctrl_lead_in)
+
+    def debounce(self, action, seconds):
+        # True while action is still debounced; otherwise starts its window
+        if action in self.debouncing:
+            return True
+        self.debouncing.add(action)
+        self.scheduler.call_later(seconds, lambda: self.debouncing.discard(action), "debounce")
+        return False
+
+    def set_weapon_catalog(self, catalog):
+        # Weapon states for a WeaponCatalog, with default settings until a
+        # profile is applied
+        self.weapons = {weapon_id: WeaponState(spec) for weapon_id, spec in catalog.weapons.items()}
+        triggers = {}
+        for state in self.weapons.values():
+            triggers.setdefault(state.spec.button, []).append(state)
+        self.weapon_triggers = {button: tuple(states) for button, states in triggers.items()}
+
+    def toggle_weapon(self, weapon_id):
+        state = self.weapons.get(weapon_id)
+        if state is None:
             return
-
-        try:
-            PROFILES[new_name] = PROFILES.pop(old_name)
-            with open("profiles.json", "w") as f:
-                json.dump(PROFILES, f, indent=4)
-            self.profile_combo.clear()
-            self.profile_combo.addItems(list(PROFILES.keys()))
-            self.profile_combo.setCurrentText(new_name)
-            self.profile_name_entry.clear()
-            self.signal_handler.log_message.emit(f"Renamed profile from {old_name} to {new_name}")
-            self.save_last_profile(new_name)
-        except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to rename profile: {e}")
-            self.signal_handler.log_message.emit(f"Failed to rename profile: {e}")
-
-    def confirm_delete_profile(self):
-        profile_name = self.profile_combo.currentText()
-        if not profile_name or profile_name not in PROFILES:
-            self.signal_handler.show_warning.emit("No valid profile selected.")
-            self.signal_handler.log_message.emit("Failed to delete profile: No valid profile selected")
+        if self.debounce(f"weapon:{weapon_id}", self.toggle_debounce):
+            weapons_log.info("%s toggle ignored (debounce)", state.spec.name)
             return
-        if profile_name == "Default":
-            self.signal_handler.show_warning.emit("Cannot delete the Default profile.")
-            self.signal_handler.log_message.emit("Failed to delete profile: Cannot delete Default profile")
+        self.set_weapon_enabled(weapon_id, weapon_id not in self.weapons_enabled)
+
+    def set_weapon_enabled(self, weapon_id, enabled):
+        state = self.weapons[weapon_id]
+        excluded = []
+        with self.runtime_lock:
+            weapons_enabled = set(self.runtime.weapons_enabled)
+            weapons_enabled.discard(weapon_id)
+            if enabled:
+                if state.spec.group:
+                    # Weapons of one exclusivity group would fight over the same input
+                    excluded = [self.weapons[other_id] for other_id in weapons_enabled if self.weapons[other_id].spec.group == state.spec.group]
+                    weapons_enabled.difference_update(other.spec.id for other in excluded)
+                weapons_enabled.add(weapon_id)
+            self.runtime = self.runtime.replace(weapons_enabled=weapons_enabled)
+        for other in excluded:
+            self.stop_weapon(other)
+            weapons_log.info("%s disabled (mutual exclusion with %s)", other.spec.name, state.spec.name)
+        if not enabled:
+            self.stop_weapon(state)
+        elif self.running_macro:
+            self.resume_weapon(state)
+        self.on_state_changed()
+        weapons_log.info("%s %s", state.spec.name, 'enabled' if enabled else 'disabled')
+
+    def set_weapon_setting(self, weapon_id, name, value):
+        # A running pattern uses the new value from its next step
+        state = self.weapons[weapon_id]
+        with self.weapon_lock:
+            state.settings[name] = value
+            state.compile()
+
+    def set_weapon_fallback(self, weapon_id, use_fallback):
+        state = self.weapons[weapon_id]
+        with self.weapon_lock:
+            state.use_fallback = use_fallback and bool(state.spec.fallback_steps)
+            state.compile()
+
+    def resume_weapon(self, state):
+        # Enabled while the trigger is already held: the pattern runs as if
+        # it had started with that press. Queued on the input dispatcher,
+        # which owns held_buttons.
+        self.input_dispatcher.queue.put((self.handle_weapon_resume, (state,), time.perf_counter_ns()))
+
+    def handle_weapon_resume(self, state, trigger_ns):
+        if state.spec.id not in self.runtime.weapons_enabled or not self.running_macro:
             return
-
-        reply = QMessageBox.question(self, "Confirmation", f"Are you sure you want to delete the profile '{profile_name}'?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-        if reply == QMessageBox.Yes:
-            self.delete_profile(profile_name)
-
-    def delete_profile(self, profile_name):
-        try:
-            del PROFILES[profile_name]
-            with open("profiles.json", "w") as f:
-                json.dump(PROFILES, f, indent=4)
-            self.profile_combo.clear()
-            self.profile_combo.addItems(list(PROFILES.keys()))
-            self.profile_combo.setCurrentText("Default")
-            self.profile_name_entry.clear()
-            self.load_profile("Default")
-            self.signal_handler.log_message.emit(f"Deleted profile: {profile_name}")
-        except Exception as e:
-            self.signal_handler.show_warning.emit(f"Failed to delete profile: {e}")
-            self.signal_handler.log_message.emit(f"Failed to delete profile: {e}")
-
-    def toggle_macro(self):
-        self.running_macro = not self.running_macro
-        color = "#EF5350" if self.running_macro else "#4CAF50"
-        text = "⏹ Stop" if self.running_macro else "▶ Start"
-        self.toggle_button.setText(text)
-        self.toggle_button.setStyleSheet(f"background-color: {color}; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;")
-        self.macro_indicator.setStyleSheet(f"background-color: {'green' if self.running_macro else 'red'}; border-radius: 10px;")
-        self.signal_handler.log_message.emit(f"Macro system {'started' if self.running_macro else 'stopped'}")
-
-        if not self.running_macro:
-            self.arc_thrower_rapidfire = False
-            self.railgun_safety = False
-            self.stop_all_threads()
-            self.arc_thrower_button.setText("Arc Thrower Rapidfire: OFF")
-            self.arc_thrower_button.setStyleSheet(
-                "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-            )
-            self.railgun_button.setText("Railgun/Epoch Safety: OFF")
-            self.railgun_button.setStyleSheet(
-                "background-color: #EF5350; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
-            )
-            self.arc_thrower_info.setText(f"Arc Thrower rapidfire releases and represses left click every {self.arc_thrower_delay}s when held.")
-        elif self.arc_thrower_rapidfire:
-            if self.arc_thrower_thread is None or not self.arc_thrower_thread.is_alive():
-                self.arc_thrower_thread = threading.Thread(target=self.arc_thrower_rapidfire_func, daemon=True)
-                self.arc_thrower_thread.start()
-
-    def run_macro_sequence(self, sequence, test_mode=False):
-        if not test_mode and not self.running_macro:
-            self.signal_handler.log_message.emit("Macro stopped, exiting sequence")
+        with self.weapon_lock:
+            press_ns = self.held_buttons.get(state.spec.button)
+            if press_ns is not None and not state.active:
+                self.start_weapon_pattern(state, press_ns)
+                weapons_log.info("%s pattern started", state.spec.name)
+
+    def stop_weapon(self, state):
+        with self.weapon_lock:
+            if state.active:
+                weapons_log.info("%s pattern stopped", state.spec.name)
+            self.release_weapon_keys(state, self.cancel_weapon_pattern(state))
+
+    def start_weapon_pattern(self, state, origin_ns):
+        # Under weapon_lock. Keys still held from a previous run stay held
+        # until a step or a stop releases them.
+        if state.deadline is not None:
+            state.deadline.cancel()
+            state.deadline = None
+        state.active = True
+        state.index = 0
+        state.echo = None
+        state.origin_ns = origin_ns
+        if state.steps:
+            self.schedule_weapon_step(state, max(origin_ns + state.steps[0][0], time.perf_counter_ns()))
+
+    def schedule_weapon_step(self, state, deadline_ns):
+        deadline = Deadline(deadline_ns, lambda: self.weapon_step(state, deadline), state.spec.id)
+        state.deadline = deadline
+        self.scheduler.submit(deadline)
+
+    def cancel_weapon_pattern(self, state, released=None):
+        # Under weapon_lock; returns the keys the pattern still holds down,
+        # except `released`, which the user has just released anyway
+        if state.deadline is not None:
+            state.deadline.cancel()
+            state.deadline = None
+        state.active = False
+        state.echo = None
+        held = [key for key in state.held if key != released]
+        state.held.clear()
+        return held
+
+    def release_weapon_keys(self, state, keys):
+        for key in keys:
+            try:
+                injector.release(input_key(key))
+            except Exception as e:
+                weapons_log.error("Error releasing %s for %s: %s", key, state.spec.name, e)
+
+    def weapon_click(self, state, pressed, trigger_ns):
+        # Called from the mouse listener for the weapon's trigger button.
+        # Our own injected trigger input comes back once; that echo is skipped.
+        with self.weapon_lock:
+            if state.echo == pressed:
+                state.echo = None
+                return
+            if pressed:
+                runtime = self.runtime
+                if runtime.running_macro and state.spec.id in runtime.weapons_enabled:
+                    # Measured from the click itself, not from when this runs
+                    self.start_weapon_pattern(state, trigger_ns)
+            elif state.active:
+                self.release_weapon_keys(state, self.cancel_weapon_pattern(state, released=state.spec.trigger))
+                weapons_log.debug("%s: trigger released, pattern stopped", state.spec.name)
+
+    def weapon_step(self, state, deadline):
+        # Scheduler callback for one step. The next step is due relative to
+        # this step's deadline, not to when it ran, so lateness never
+        # accumulates over a repeating pattern. The key is injected under
+        # weapon_lock, so once a stop has released the pattern's keys no step
+        # can press one again; the hooks only queue the echo, so holding the
+        # lock here never blocks them.
+        with self.weapon_lock:
+            if state.deadline is not deadline:
+                return
+            steps = state.steps
+            runtime = self.runtime
+            if not (runtime.running_macro and state.spec.id in runtime.weapons_enabled and state.index < len(steps)):
+                self.release_weapon_keys(state, self.cancel_weapon_pattern(state))
+                return
+            _, key, pressed = steps[state.index]
+            state.index += 1
+            if state.index == len(steps) and state.spec.repeat:
+                state.index = 0
+            if state.index < len(steps):
+                self.schedule_weapon_step(state, deadline.deadline_ns + steps[state.index][0])
+            else:
+                state.deadline = None
+            if key == state.spec.trigger:
+                state.echo = pressed
+            if pressed:
+                state.held.add(key)
+            else:
+                state.held.discard(key)
+            try:
+                if pressed:
+                    injector.press(input_key(key))
+                else:
+                    injector.release(input_key(key))
+            except Exception as e:
+                weapons_log.error("Error in %s: %s", state.spec.name, e)
+                self.release_weapon_keys(state, self.cancel_weapon_pattern(state))
+                return
+            # Taken once the input is out, unlike scheduler_lateness, so it
+            # is how far the step really landed from where it was due
+            self.metrics.record("weapon_step_error", state.spec.name, time.perf_counter_ns() - deadline.deadline_ns)
+        log_step = weapons_log.debug if state.spec.repeat else weapons_log.info
+        log_step("%s: %s %s at %.2fs", state.spec.name, 'pressed' if pressed else 'released', key,
+                 (time.perf_counter_ns() - state.origin_ns) / 1_000_000_000)
+
+    def run_macro_sequence(self, compiled, test_mode=False, cancel=None, trigger_ns=None, binding=None):
+        # Each batch is a scheduler deadline; the calling thread waits on the
+        # CancelToken until the sequence ends or is cancelled, then releases
+        # whatever is still held. The steps and that cleanup take turns on
+        # one lock, so no step can press a key after the cleanup.
+        runtime = self.runtime
+        if not test_mode and not runtime.running_macro:
+            executor_log.info("Macro stopped, exiting sequence")
             return
+        if cancel is None:
+            cancel = CancelToken()
+        held = set()
+        current = None
+        jitter_ns = []
+        finished = False
+        stopped = False
+        lock = threading.Lock()
+        trace = executor_log.isEnabledFor(logging.DEBUG)
+
+        def step(index):
+            nonlocal current
+            with lock:
+                if stopped:
+                    return
+                offset_ns, batch, has_press = compiled.batches[index]
+                # Stopping the macro system publishes a new snapshot, so this
+                # looks at the current one rather than the one it started with
+                if has_press and not test_mode and not self.runtime.running_macro:
+                    cancel.cancel()
+                    return
+                deadline_ns = start_ns + offset_ns
+                actual_ns = time.perf_counter_ns()
+                injector.send_batch(batch)
+                for key, pressed in batch:
+                    if pressed:
+                        held.add(key)
+                    else:
+                        held.discard(key)
+                    jitter_ns.append(actual_ns - deadline_ns)
+                if index + 1 < len(compiled.batches):
+                    current = self.scheduler.call_at(start_ns + compiled.batches[index + 1][0], lambda: step(index + 1), "macro_step")
+                else:
+                    current = self.scheduler.call_at(start_ns + compiled.duration_ns, finish, "macro_step")
+            if has_press:
+                if trace:
+                    executor_log.debug("Pressing %s at %.3fs (+%.0fµs)", [key_id(key) for key, pressed in batch if pressed], (actual_ns - start_ns) / 1_000_000_000, (actual_ns - deadline_ns) / 1000)
+                self.on_blink()
+
+        def finish():
+            nonlocal finished
+            with lock:
+                if stopped:
+                    return
+                finished = True
+            self.metrics.record("sequence_duration", compiled.name, time.perf_counter_ns() - ctrl_ns)
+            executor_log.info("Sequence completed (%s)", summarize_jitter(jitter_ns))
+            if compiled.recorded:
+                # Every event is due at its recorded offset, so its lateness
+                # is how far playback drifted from the recording there
+                for drift_ns in jitter_ns:
+                    self.metrics.record("playback_drift", compiled.name, abs(drift_ns))
+                executor_log.info("Playback drift from the recording: max %.0fµs", max(map(abs, jitter_ns), default=0) / 1000)
+            cancel.notify()
+
         try:
-            self.signal_handler.log_message.emit(f"Executing sequence: {sequence}")
-            keyboard.press(Key.ctrl)
-            time.sleep(0.05)
-            start_time = time.time()
-            for key in sequence:
-                if not test_mode and not self.running_macro:
-                    self.signal_handler.log_message.emit("Macro interrupted")
-                    break
-                key_map = {
-                    "up": Key.up,
-                    "down": Key.down,
-                    "left": Key.left,
-                    "right": Key.right
-                }
-                if key in key_map:
-                    self.signal_handler.log_message.emit(f"Pressing {key} at {time.time() - start_time:.2f}s")
-                    self.signal_handler.blink.emit()
-                    keyboard.press(key_map[key])
-                    time.sleep(self.macro_delay)
-                    keyboard.release(key_map[key])
-                    time.sleep(self.macro_delay)
-            self.signal_handler.log_message.emit("Sequence completed")
+            if trace:
+                executor_log.debug("Executing sequence: %s", list(compiled.directions))
+            self.queue_injected_modifiers(MOD_CTRL, True)
+            injector.press(Key.ctrl)
+            ctrl_ns = time.perf_counter_ns()
+            if trigger_ns is not None:
+                self.metrics.record("input_latency_by_binding", binding, ctrl_ns - trigger_ns)
+                self.metrics.record("input_latency_by_stratagem", compiled.name, ctrl_ns - trigger_ns)
+            # Every batch is scheduled against an absolute deadline from the
+            # Ctrl press, so the total time is exactly lead-in + duration.
+            start_ns = ctrl_ns + int(runtime.ctrl_lead_in * 1_000_000_000)
+            if compiled.batches:
+                current = self.scheduler.call_at(start_ns + compiled.batches[0][0], lambda: step(0), "macro_step")
+            else:
+                current = self.scheduler.call_at(start_ns + compiled.duration_ns, finish, "macro_step")
+            cancelled = cancel.wait_for(lambda: finished, (start_ns + compiled.duration_ns - time.perf_counter_ns()) / 1_000_000_000 + 1)
+            if not finished and not cancelled:
+                executor_log.error("Macro timed out")
         except Exception as e:
-            self.signal_handler.log_message.emit(f"Error executing macro: {e}")
+            executor_log.error("Error executing macro: %s", e)
         finally:
-            keyboard.release(Key.ctrl)
-            self.signal_handler.log_message.emit("Ctrl released")
-
-    def update_stratagem_output(self, idx):
-        strat_name = self.stratagem_combos[idx].currentText()
-        if strat_name in STRATAGEM_DATA and isinstance(STRATAGEM_DATA[strat_name], dict) and "sequence" in STRATAGEM_DATA[strat_name] and STRATAGEM_DATA[strat_name]["sequence"]:
-            sequence = STRATAGEM_DATA[strat_name]["sequence"]
-            color = STRATAGEM_DATA[strat_name].get("color", "#ECEFF1")
-            self.stratagem_outputs[idx].setText(" → ".join(sequence))
-            self.stratagem_outputs[idx].setStyleSheet(f"color: {color};")
-            self.signal_handler.log_message.emit(f"Updated Stratagem {idx+1} to {strat_name}")
+            with lock:
+                stopped = True
+                if current is not None:
+                    current.cancel()
+                injector.send_batch(tuple((key, False) for key in held) + ((Key.ctrl, False),))
+            self.queue_injected_modifiers(MOD_CTRL, False)
+            self.last_sequence_jitter_ns = tuple(jitter_ns)
+            executor_log.debug("Ctrl released")
+            if cancel.cancelled and not finished:
+                # From the cancel to every key being up again
+                stop_ns = time.perf_counter_ns() - cancel.cancelled_ns
+                self.metrics.record("stop_latency", "sequence", stop_ns)
+                executor_log.info("Macro interrupted, keys released in %.1f ms", stop_ns / 1_000_000)
+
+    def start_recording(self):
+        with self.runtime_lock:
+            if self.runtime.recorder is not None:
+                return
+            self.runtime = self.runtime.replace(active_keybind=None, recorder=MacroRecorder())
+        listener_log.info("Recording macro, press Esc to stop")
+
+    def stop_recording(self):
+        # From the front end or the Esc key; returns the MacroRecorder, or
+        # None if nothing was recording
+        # Taken under the lock, so Esc and the Stop button never both get it
+        with self.runtime_lock:
+            recorder = self.runtime.recorder
+            self.runtime = self.runtime.replace(recorder=None)
+        if recorder is not None:
+            listener_log.info("Recording stopped: %d key events", len(recorder.events))
+            self.on_recording_stopped(recorder)
+        return recorder
+
+    def save_recording(self, name, recorder):
+        # Saves a recording as a stratagems.json entry in the Recorded
+        # category and reloads the catalog. Returns a summary for the user;
+        # raises ValueError for an unusable name or an empty recording and
+        # OSError or ValueError if stratagems.json cannot be rewritten.
+        if not name or separator_category(name) is not None:
+            raise ValueError(f"'{name}' cannot be used as a stratagem name")
+        timeline, worst_ns = compress_recording(recorder.events)
+        if not timeline:
+            raise ValueError("Nothing was recorded")
+        save_catalog_entry("stratagems.json", name, {"timeline": timeline, "color": DEFAULT_STRATAGEM_COLOR}, RECORDING_CATEGORY)
+        self.reload_stratagems()
+        presses = sum(1 for _, _, pressed in timeline if pressed)
+        summary = (f"Saved '{name}': {presses} key presses over {timeline[-1][0] / 1000:.2f}s, "
+                   f"timing rounded by at most {worst_ns / 1_000_000:.1f} ms")
+        executor_log.info("%s", summary)
+        return summary
+
+    def capture_keybind(self, key_str):
+        with self.runtime_lock:
+            slot = self.runtime.active_keybind
+            self.runtime = self.runtime.replace(active_keybind=None)
+        with self.profile_lock:
+            conflict_msg = self.check_keybind_conflict(key_str, slot)
+            if conflict_msg is None:
+                self.assign_keybind(slot, key_str)
+                self.rebuild_binding_index()
+        if conflict_msg:
+            self.on_warning(conflict_msg)
+            listener_log.warning("%s", conflict_msg)
+        self.on_state_changed()
+
+    def assign_keybind(self, slot, key_str):
+        # Under profile_lock
+        if isinstance(slot, int) and slot < len(self.keybind_vars):
+            self.keybind_vars[slot] = key_str
+            listener_log.info("Set keybind for Stratagem %s to %s", slot+1, key_str)
+        elif isinstance(slot, int):
+            support_idx = slot - len(self.keybind_vars)
+            self.support_keybind_vars[support_idx] = key_str
+            listener_log.info("Set keybind for Support Stratagem %s to %s", list(SUPPORT_STRATAGEMS.keys())[support_idx], key_str)
+        elif slot.startswith("chain:") and int(slot[6:]) < len(self.chains):
+            self.set_chain_keybind(int(slot[6:]), key_str)
+            listener_log.info("Set keybind for chain %s to %s", self.chains[int(slot[6:])].name, key_str)
+        elif slot.startswith("weapon:") and slot[7:] in self.weapons:
+            state = self.weapons[slot[7:]]
+            with self.weapon_lock:
+                state.keybind = key_str
+            listener_log.info("Set %s keybind to %s", state.spec.name, key_str)
+        elif slot in PROFILE_HOTKEY_LABELS:
+            self.set_hotkey(slot, key_str)
+
+    def dispatch_action(self, action, binding, trigger_ns):
+        if action.kind == "weapon":
+            self.toggle_weapon(action.name)
+        elif action.kind == "profile":
+            self.switch_profile(action.name)
+        elif action.kind == "next_profile":
+            self.cycle_profile(1)
+        elif action.kind == "previous_profile":
+            self.cycle_profile(-1)
+        else:
+            label = {"support": "support stratagem", "chain": "chain"}.get(action.kind, "stratagem")
+            if self.macro_executor.submit((action.sequence, trigger_ns, binding, False)):
+                executor_log.info("Launching %s: %s", label, action.name)
+            else:
+                executor_log.info("Macro busy, dropped %s: %s (policy: %s)", label, action.name, self.macro_queue_policy)
+
+    def queue_injected_modifiers(self, mask, pressed):
+        # Called by a sequence just before it presses, and just after it
+        # releases, the modifiers in `mask`. Queued behind the hook events
+        # already waiting, so those are still looked up with the real
+        # modifiers only.
+        self.input_dispatcher.queue.put((self.handle_injected_modifiers, (mask, pressed), time.perf_counter_ns()))
+
+    # The input handlers run on the input dispatcher and read everything
+    # they decide on from one RuntimeSnapshot per event
+    def handle_injected_modifiers(self, mask, pressed, trigger_ns):
+        # The next press of these modifiers is the sequence's own. Once the
+        # sequence is done, an injected press that never came back (an
+        # injector the hooks do not see) is no longer expected.
+        if pressed:
+            self.expected_injected |= mask
+        else:
+            self.expected_injected &= ~mask
+
+    def handle_key_press(self, key, trigger_ns):
+        runtime = self.runtime
+        key_str = key_id(key)
+        listener_log.debug("Key pressed: %s", key_str)
+        # A modifier key is looked up with the modifiers held before it, so
+        # it can be bound on its own
+        modifiers = self.modifiers & ~self.injected_modifiers
+        modifier_bit = MODIFIER_KEY_BITS.get(key_str)
+        if modifier_bit is not None:
+            injected = chord_modifiers(modifier_bit) & self.expected_injected
+            if injected:
+                self.expected_injected &= ~injected
+                self.injected_modifiers |= injected
+            self.held_modifiers |= modifier_bit
+            self.modifiers = chord_modifiers(self.held_modifiers)
+        recorder = runtime.recorder
+        if recorder is not None:
+            if key_str == "esc":
+                self.stop_recording()
+            else:
+                recorder.record(trigger_ns, key_str, True)
+        elif runtime.active_keybind is not None:
+            if key_str in RESERVED_KEYS:
+                self.on_warning(f"Key '{key_str}' cannot be used as a keybind.")
+                listener_log.warning("Key '%s' cannot be used as a keybind", key_str)
+                return
+            # Modifiers wait for the chord's key, or are bound on their own
+            # when released first
+            if modifier_bit is None:
+                self.capture_keybind(chord_name(modifiers, key_str))
+        elif runtime.running_macro and not (modifier_bit and modifier_bit & self.injected_modifiers):
+            actions = runtime.hotkey_index.lookup(modifiers, key_str) or runtime.binding_index.lookup(modifiers, key_str)
+            if actions:
+                binding = chord_name(modifiers, key_str) if modifiers else key_str
+                for action in actions:
+                    self.dispatch_action(action, binding, trigger_ns)
+
+    def handle_key_release(self, key, trigger_ns):
+        # Releases only update the held modifiers and feed recordings
+        runtime = self.runtime
+        key_str = key_id(key)
+        modifier_bit = MODIFIER_KEY_BITS.get(key_str)
+        if modifier_bit is not None:
+            self.held_modifiers &= ~modifier_bit
+            self.modifiers = chord_modifiers(self.held_modifiers)
+            # The release of a modifier a sequence pressed itself ends its
+            # injected hold and is never captured as a keybind
+            injected = chord_modifiers(modifier_bit) & self.injected_modifiers
+            if injected:
+                self.injected_modifiers &= ~injected
+            elif runtime.active_keybind is not None and runtime.recorder is None:
+                self.capture_keybind(chord_name(self.modifiers & ~self.injected_modifiers, key_str))
+        recorder = runtime.recorder
+        if recorder is not None:
+            recorder.record(trigger_ns, key_str, False)
+
+    def handle_click(self, button, pressed, trigger_ns):
+        runtime = self.runtime
+        button_str = key_id(button)
+        if pressed:
+            self.held_buttons[button_str] = trigger_ns
         else:
-            self.stratagem_outputs[idx].setText("")
-            self.stratagem_outputs[idx].setStyleSheet("color: #ECEFF1;")
-            self.signal_handler.log_message.emit(f"Cleared Stratagem {idx+1} output")
+            self.held_buttons.pop(button_str, None)
+        for state in self.weapon_triggers.get(button_str, ()):
+            self.weapon_click(state, pressed, trigger_ns)
+        if pressed and button_str in ("x1", "x2"):
+            listener_log.debug("Mouse button pressed: %s", button_str)
+            modifiers = self.modifiers & ~self.injected_modifiers
+            if runtime.active_keybind is not None:
+                self.capture_keybind(chord_name(modifiers, button_str))
+            elif runtime.running_macro:
+                actions = runtime.hotkey_index.lookup(modifiers, button_str) or runtime.binding_index.lookup(modifiers, button_str)
+                if actions:
+                    binding = chord_name(modifiers, button_str) if modifiers else button_str
+                    for action in actions:
+                        self.dispatch_action(action, binding, trigger_ns)
 
     def start_listeners(self):
+        # The hooks run inside the OS input hook: they only timestamp the
+        # event and queue it for the input dispatcher, which calls the
+        # handle_* methods above
+        dispatcher = self.input_dispatcher
+        dispatcher.start()
+        queue_event = dispatcher.queue.put
+        hook_time = dispatcher.hook_times.append
+        handle_key_press = self.handle_key_press
+        handle_key_release = self.handle_key_release
+        handle_click = self.handle_click
+
         def on_press(key):
-            try:
-                key_str = str(key).replace("Key.", "").replace("'", "").lower()
-                self.signal_handler.log_message.emit(f"Key pressed: {key_str}")
-                if self.active_keybind is not None:
-                    if key_str in ["esc", "enter", "tab"]:
-                        self.signal_handler.show_warning.emit(f"Key '{key_str}' cannot be used as a keybind.")
-                        self.signal_handler.log_message.emit(f"Key '{key_str}' cannot be used as a keybind")
-                        return
-                    conflict_msg = self.check_keybind_conflict(key_str, self.active_keybind)
-                    if conflict_msg:
-                        self.signal_handler.show_warning.emit(conflict_msg)
-                        self.signal_handler.log_message.emit(conflict_msg)
-                        if isinstance(self.active_keybind, int) and self.active_keybind < len(self.keybind_buttons):
-                            self.keybind_buttons[self.active_keybind].setText(
-                                self.keybind_vars[self.active_keybind] if self.keybind_vars[self.active_keybind] else "Set Keybind"
-                            )
-                        elif isinstance(self.active_keybind, int):
-                            support_idx = self.active_keybind - len(self.keybind_buttons)
-                            self.support_keybind_buttons[support_idx].setText(
-                                self.support_keybind_vars[support_idx] if self.support_keybind_vars[support_idx] else "Set Keybind"
-                            )
-                        elif self.active_keybind == "railgun":
-                            self.railgun_keybind_button.setText(self.railgun_keybind if self.railgun_keybind else "Set Keybind")
-                        elif self.active_keybind == "arc_thrower":
-                            self.arc_thrower_keybind_button.setText(self.arc_thrower_keybind if self.arc_thrower_keybind else "Set Keybind")
-                        self.active_keybind = None
-                        return
-                    if isinstance(self.active_keybind, int) and self.active_keybind < len(self.keybind_buttons):
-                        self.keybind_vars[self.active_keybind] = key_str
-                        self.keybind_buttons[self.active_keybind].setText(key_str)
-                        self.signal_handler.log_message.emit(f"Set keybind for Stratagem {self.active_keybind+1} to {key_str}")
-                    elif isinstance(self.active_keybind, int):
-                        support_idx = self.active_keybind - len(self.keybind_buttons)
-                        self.support_keybind_vars[support_idx] = key_str
-                        self.support_keybind_buttons[support_idx].setText(key_str)
-                        self.signal_handler.log_message.emit(f"Set keybind for Support Stratagem {list(SUPPORT_STRATAGEMS.keys())[support_idx]} to {key_str}")
-                    elif self.active_keybind == "railgun":
-                        self.railgun_keybind = key_str
-                        self.railgun_keybind_button.setText(key_str)
-                        self.signal_handler.log_message.emit(f"Set Railgun/Epoch keybind to {key_str}")
-                    elif self.active_keybind == "arc_thrower":
-                        self.arc_thrower_keybind = key_str
-                        self.arc_thrower_keybind_button.setText(key_str)
-                        self.signal_handler.log_message.emit(f"Set Arc Thrower keybind to {key_str}")
-                    self.active_keybind = None
-                elif self.running_macro:
-                    if key_str == self.railgun_keybind:
-                        self.toggle_railgun_safety()
-                    elif key_str == self.arc_thrower_keybind:
-                        self.toggle_arc_thrower_rapidfire()
-                    for i, key_var in enumerate(self.keybind_vars):
-                        if key_var == key_str and i < len(self.stratagem_combos):
-                            strat_name = self.stratagem_combos[i].currentText()
-                            if strat_name in STRATAGEM_DATA and isinstance(STRATAGEM_DATA[strat_name], dict) and "sequence" in STRATAGEM_DATA[strat_name] and STRATAGEM_DATA[strat_name]["sequence"]:
-                                if self.macro_thread and self.macro_thread.is_alive():
-                                    self.signal_handler.log_message.emit("Macro thread busy, skipping")
-                                    continue
-                                self.signal_handler.log_message.emit(f"Launching stratagem: {strat_name}")
-                                self.macro_thread = threading.Thread(
-                                    target=self.run_macro_sequence,
-                                    args=(STRATAGEM_DATA[strat_name]["sequence"],),
-                                    daemon=True
-                                )
-                                self.macro_thread.start()
-                    for i, key_var in enumerate(self.support_keybind_vars):
-                        if key_var == key_str:
-                            strat_name = list(SUPPORT_STRATAGEMS.keys())[i]
-                            if strat_name in SUPPORT_STRATAGEMS:
-                                if self.macro_thread and self.macro_thread.is_alive():
-                                    self.signal_handler.log_message.emit("Macro thread busy, skipping")
-                                    continue
-                                self.signal_handler.log_message.emit(f"Launching support stratagem: {strat_name}")
-                                self.macro_thread = threading.Thread(
-                                    target=self.run_macro_sequence,
-                                    args=(SUPPORT_STRATAGEMS[strat_name],),
-                                    daemon=True
-                                )
-                                self.macro_thread.start()
-            except Exception as e:
-                self.signal_handler.log_message.emit(f"Error in key press: {e}")
+            t_ns = time.perf_counter_ns()
+            queue_event((handle_key_press, (key,), t_ns))
+            hook_time(("key_press", time.perf_counter_ns() - t_ns))
+
+        def on_release(key):
+            t_ns = time.perf_counter_ns()
+            queue_event((handle_key_release, (key,), t_ns))
+            hook_time(("key_release", time.perf_counter_ns() - t_ns))
 
         def on_click(x, y, button, pressed):
-            try:
-                if button == Button.left:
-                    self.left_click_active = pressed
-                    self.left_click_time = time.time() if pressed else self.left_click_time
-                    if pressed and self.railgun_safety and self.running_macro:
-                        if self.railgun_timer is not None:
-                            self.railgun_timer.cancel()
-                        self.railgun_timer = threading.Timer(self.railgun_timeout - 0.05, self.perform_mouse_release)
-                        self.railgun_timer.daemon = True
-                        self.railgun_timer.start()
-                        self.signal_handler.log_message.emit("Railgun timer started")
-                    elif not pressed and self.railgun_timer is not None:
-                        self.railgun_timer.cancel()
-                        self.railgun_timer = None
-                        self.signal_handler.log_message.emit("Railgun timer cancelled on release")
-                if pressed and button in [Button.x1, Button.x2]:
-                    button_str = str(button).replace("Button.", "").lower()
-                    self.signal_handler.log_message.emit(f"Mouse button pressed: {button_str}")
-                    if self.active_keybind is not None:
-                        conflict_msg = self.check_keybind_conflict(button_str, self.active_keybind)
-                        if conflict_msg:
-                            self.signal_handler.show_warning.emit(conflict_msg)
-                            self.signal_handler.log_message.emit(conflict_msg)
-                            if isinstance(self.active_keybind, int) and self.active_keybind < len(self.keybind_buttons):
-                                self.keybind_buttons[self.active_keybind].setText(
-                                    self.keybind_vars[self.active_keybind] if self.keybind_vars[self.active_keybind] else "Set Keybind"
-                                )
-                            elif isinstance(self.active_keybind, int):
-                                support_idx = self.active_keybind - len(self.keybind_buttons)
-                                self.support_keybind_buttons[support_idx].setText(
-                                    self.support_keybind_vars[support_idx] if self.support_keybind_vars[support_idx] else "Set Keybind"
-                                )
-                            elif self.active_keybind == "railgun":
-                                self.railgun_keybind_button.setText(self.railgun_keybind if self.railgun_keybind else "Set Keybind")
-                            elif self.active_keybind == "arc_thrower":
-                                self.arc_thrower_keybind_button.setText(self.arc_thrower_keybind if self.arc_thrower_keybind else "Set Keybind")
-                            self.active_keybind = None
-                            return
-                        if isinstance(self.active_keybind, int) and self.active_keybind < len(self.keybind_buttons):
-                            self.keybind_vars[self.active_keybind] = button_str
-                            self.keybind_buttons[self.active_keybind].setText(button_str)
-                            self.signal_handler.log_message.emit(f"Set keybind for Stratagem {self.active_keybind+1} to {button_str}")
-                        elif isinstance(self.active_keybind, int):
-                            support_idx = self.active_keybind - len(self.keybind_buttons)
-                            self.support_keybind_vars[support_idx] = button_str
-                            self.support_keybind_buttons[support_idx].setText(button_str)
-                            self.signal_handler.log_message.emit(f"Set keybind for Support Stratagem {list(SUPPORT_STRATAGEMS.keys())[support_idx]} to {button_str}")
-                        elif self.active_keybind == "railgun":
-                            self.railgun_keybind = button_str
-                            self.railgun_keybind_button.setText(button_str)
-                            self.signal_handler.log_message.emit(f"Set Railgun keybind to {button_str}")
-                        elif self.active_keybind == "arc_thrower":
-                            self.arc_thrower_keybind = button_str
-                            self.arc_thrower_keybind_button.setText(button_str)
-                            self.signal_handler.log_message.emit(f"Set Arc Thrower keybind to {button_str}")
-                        self.active_keybind = None
-                    elif self.running_macro:
-                        if button_str == self.railgun_keybind:
-                            self.toggle_railgun_safety()
-                        elif button_str == self.arc_thrower_keybind:
-                            self.toggle_arc_thrower_rapidfire()
-                        for i, key_var in enumerate(self.keybind_vars):
-                            if key_var == button_str and i < len(self.stratagem_combos):
-                                strat_name = self.stratagem_combos[i].currentText()
-                                if strat_name in STRATAGEM_DATA and isinstance(STRATAGEM_DATA[strat_name], dict) and "sequence" in STRATAGEM_DATA[strat_name] and STRATAGEM_DATA[strat_name]["sequence"]:
-                                    if self.macro_thread and self.macro_thread.is_alive():
-                                        self.signal_handler.log_message.emit("Macro thread busy, skipping")
-                                        continue
-                                    self.signal_handler.log_message.emit(f"Launching stratagem: {strat_name}")
-                                    self.macro_thread = threading.Thread(
-                                        target=self.run_macro_sequence,
-                                        args=(STRATAGEM_DATA[strat_name]["sequence"],),
-                                        daemon=True
-                                    )
-                                    self.macro_thread.start()
-                        for i, key_var in enumerate(self.support_keybind_vars):
-                            if key_var == button_str:
-                                strat_name = list(SUPPORT_STRATAGEMS.keys())[i]
-                                if strat_name in SUPPORT_STRATAGEMS:
-                                    if self.macro_thread and self.macro_thread.is_alive():
-                                        self.signal_handler.log_message.emit("Macro thread busy, skipping")
-                                        continue
-                                    self.signal_handler.log_message.emit(f"Launching support stratagem: {strat_name}")
-                                    self.macro_thread = threading.Thread(
-                                        target=self.run_macro_sequence,
-                                        args=(SUPPORT_STRATAGEMS[strat_name],),
-                                        daemon=True
-                                    )
-                                    self.macro_thread.start()
-            except Exception as e:
-                self.signal_handler.log_message.emit(f"Error in mouse click: {e}")
+            t_ns = time.perf_counter_ns()
+            queue_event((handle_click, (button, pressed), t_ns))
+            hook_time(("click", time.perf_counter_ns() - t_ns))
 
         global mouse_listener, keyboard_listener
         mouse_listener = pynput_mouse.Listener(on_click=on_click)
-        keyboard_listener = KeyboardListener(on_press=on_press)
+        keyboard_listener = KeyboardListener(on_press=on_press, on_release=on_release)
         mouse_listener.start()
         keyboard_listener.start()
 
     def stop_all_threads(self):
-        if self.arc_thrower_thread and self.arc_thrower_thread.is_alive():
-            self.arc_thrower_rapidfire = False
-            self.arc_thrower_thread.join(timeout=1)
-        if self.railgun_timer:
-            self.railgun_timer.cancel()
-        if self.macro_thread and self.macro_thread.is_alive():
-            self.macro_thread.join(timeout=1)
-
-    def test_stratagem(self, idx):
-        strat_name = self.stratagem_combos[idx].currentText()
-        if strat_name in STRATAGEM_DATA and isinstance(STRATAGEM_DATA[strat_name], dict) and "sequence" in STRATAGEM_DATA[strat_name]:
-            self.signal_handler.log_message.emit(f"[TEST] Stratagem {strat_name}: {STRATAGEM_DATA[strat_name]['sequence']}")
-            self.run_macro_sequence(STRATAGEM_DATA[strat_name]['sequence'], test_mode=True)
-        else:
-            self.signal_handler.log_message.emit("[TEST] No valid sequence for this stratagem.")
-
-    def test_support_stratagem(self, idx):
-        strat_name = list(SUPPORT_STRATAGEMS.keys())[idx]
-        sequence = SUPPORT_STRATAGEMS.get(strat_name, [])
-        if sequence:
-            self.signal_handler.log_message.emit(f"[TEST] Support Stratagem {strat_name}: {sequence}")
-            self.run_macro_sequence(sequence, test_mode=True)
-        else:
-            self.signal_handler.log_message.emit("[TEST] No valid sequence for this support stratagem.")
-
-    def save_last_profile(self, profile_name):
+        # Cancels the weapon deadlines and the running sequence, and waits
+        # until every key they held is released again
+        start_ns = time.perf_counter_ns()
+        for state in self.weapons.values():
+            self.stop_weapon(state)
+        self.macro_executor.cancel_all()
+        self.macro_executor.wait_idle(timeout=1)
+        stop_ns = time.perf_counter_ns() - start_ns
+        self.metrics.record("stop_latency", "stop_all", stop_ns)
+        executor_log.debug("Stopped all workers in %.1f ms", stop_ns / 1_000_000)
+
+    def stop_listeners(self):
+        global mouse_listener, keyboard_listener
+        for listener in (mouse_listener, keyboard_listener):
+            if listener is not None:
+                listener.stop()
+        mouse_listener = keyboard_listener = None
+        self.input_dispatcher.stop()
+        self.held_modifiers = self.modifiers = 0
+        self.injected_modifiers = self.expected_injected = 0
+
+def run_headless(args):
+    load_data_files()
+    if args.list_profiles:
+        for name in PROFILE_STORE.names:
+            print(f"{name} (last used)" if name == PROFILE_STORE.last_profile else name)
+        return 0
+    profile_name = args.profile or PROFILE_STORE.last_profile
+    profile_data = PROFILE_STORE.get(profile_name)
+    if profile_data is None:
+        print(f"Unknown or unreadable profile '{profile_name}'. Available: {', '.join(PROFILE_STORE.names) or 'none'}", file=sys.stderr)
+        return 2
+
+    engine = MacroEngine()
+    engine.on_warning = lambda message: log.warning("%s", message)
+    engine.apply_profile(profile_data, profile_name)
+    set_injector(args.injector)
+    engine.start()
+    engine.set_running(True)
+    profiles_log.info("Headless mode running profile: %s", profile_name)
+    print(f"Running profile '{profile_name}' with the {args.injector} injector, "
+          f"{len(engine.binding_index.actions)} keybinds. Logging to {args.log_file}. Press Ctrl+C to stop.")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    # Wake up regularly so signals are handled on every platform
+    while not stop.wait(0.5):
+        pass
+
+    engine.shutdown()
+    injector.close()
+    PROFILE_STORE.close()
+    if args.metrics_file:
         try:
-            with open("last_profile.json", "w") as f:
-                json.dump({"last_profile": profile_name}, f)
+            engine.metrics.export_json(args.metrics_file)
         except Exception as e:
-            logging.error(f"Error saving last profile: {e}")
+            log.error("Failed to export metrics: %s", e)
+    log.info("Headless mode stopped")
+    print("Stopped.")
+    return 0
+
+def run_record(args):
+    # Records one macro from the keyboard and saves it to stratagems.json
+    load_data_files()
+    engine = MacroEngine()
+    engine.on_warning = lambda message: log.warning("%s", message)
+    stopped = threading.Event()
+    recordings = []
+
+    def recording_stopped(recorder):
+        recordings.append(recorder)
+        stopped.set()
+
+    engine.on_recording_stopped = recording_stopped
+    set_injector(args.injector)
+    engine.start()
+    engine.start_recording()
+    print(f"Recording '{args.record}': press the keys to record, then Esc to save. Ctrl+C cancels.")
+
+    signal.signal(signal.SIGINT, lambda signum, frame: stopped.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    # Wake up regularly so signals are handled on every platform
+    while not stopped.wait(0.5):
+        pass
+
+    result = 1
+    if not recordings:
+        print("Recording cancelled.")
+    else:
+        try:
+            print(engine.save_recording(args.record, recordings[0]))
+            result = 0
+        except (OSError, ValueError) as e:
+            print(f"Could not save the recording: {e}", file=sys.stderr)
+    engine.shutdown()
+    injector.close()
+    PROFILE_STORE.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Helldivers 2 stratagem and weapon macro tool")
+    parser.add_argument("--injector", choices=list(INJECTOR_BACKENDS), default="pynput",
+                        help="Backend used to send synthetic input (default: pynput)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run the macros without the GUI, stop with Ctrl+C")
+    parser.add_argument("--profile", help="Profile to run in headless mode (default: the last used profile)")
+    parser.add_argument("--list-profiles", action="store_true", help="Print the saved profiles and exit")
+    parser.add_argument("--log-file", default="hellmacro.log", help="Log file in headless mode (default: hellmacro.log)")
+    parser.add_argument("--metrics-file", help="Write timing metrics to this JSON file when headless mode stops")
+    parser.add_argument("--record", metavar="NAME", help="Record a macro from the keyboard into stratagems.json as NAME, stop with Esc")
+    args, qt_args = parser.parse_known_args()
+    if args.headless or args.list_profiles or args.record:
+        if qt_args:
+            parser.error(f"unrecognized arguments: {' '.join(qt_args)}")
+        configure_logging(args.log_file)
+        return run_record(args) if args.record else run_headless(args)
+
+    configure_logging()
+    # Qt is only imported for the GUI
+    from hellmacro_gui import run_gui
+    return run_gui(args, qt_args)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MacroApp()
-    window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    # hellmacro_gui imports this file as "hellmacro"; make that the running
+    # module instead of a second copy with its own globals
+    sys.modules.setdefault("hellmacro", sys.modules[__name__])
+    sys.exit(main())
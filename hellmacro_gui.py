@@ -0,0 +1,1474 @@
+import sys
+import time
+import logging
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QTabWidget, QWidget,
+    QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QLineEdit, QGridLayout, QPlainTextEdit,
+    QStyledItemDelegate, QMessageBox, QCheckBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog
+)
+from PySide6.QtCore import Qt, Signal, QObject, QTimer, QSortFilterProxyModel
+from PySide6.QtGui import QStandardItemModel, QStandardItem, QColor, QPalette, QFont
+
+import hellmacro
+from hellmacro import (
+    log, listener_log, executor_log, weapons_log, profiles_log,
+    LOG_SUBSYSTEMS, LOG_LEVELS, DEFAULT_LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT,
+    LOG_FLUSH_INTERVAL_MS, DEFAULT_LOG_MAX_LINES, METRICS_REFRESH_INTERVAL_MS,
+    MACRO_QUEUE_POLICIES, SUPPORT_STRATAGEMS, DEFAULT_CHAIN_GAP, MAX_CHAIN_GAP, STARTUP_T0_NS, STARTUP_BUDGET_MS, PROFILE_STORE, PROFILE_HOTKEY_LABELS,
+    LogRing, LogRingHandler, MacroEngine, StratagemIndex, get_log_levels, set_injector
+)
+
+# Item data role telling picker rows apart: "placeholder", "category" or "entry"
+PICKER_KIND_ROLE = Qt.UserRole + 1
+
+class SignalHandler(QObject):
+    show_warning = Signal(str)
+    blink = Signal()
+    state_changed = Signal()
+    catalog_changed = Signal(object)
+    profile_switched = Signal(str)
+    recording_stopped = Signal(object)
+
+class ColorDelegate(QStyledItemDelegate):
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        color = index.data(Qt.UserRole)
+        if color:
+            option.palette.setColor(QPalette.Text, QColor(color))
+
+class StratagemFilterProxy(QSortFilterProxyModel):
+    # One per combo over the shared picker model. Shows the entries matched
+    # by the search, their categories and the combo's current selection, so
+    # filtering never changes what is selected.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = None
+        self.categories = None
+
+    def set_matches(self, entries, keep):
+        # Qt 6.9 replaced invalidateFilter() with begin/endFilterChange()
+        batched = hasattr(self, "beginFilterChange")
+        if batched:
+            self.beginFilterChange()
+        if entries is None:
+            self.names = self.categories = None
+        else:
+            self.names = {entry.name for entry in entries}
+            self.names.add(keep)
+            self.categories = {entry.category for entry in entries}
+        if batched:
+            self.endFilterChange()
+        else:
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        if self.names is None:
+            return True
+        index = self.sourceModel().index(row, 0, parent)
+        kind = index.data(PICKER_KIND_ROLE)
+        if kind == "category":
+            return index.data() in self.categories
+        if kind == "entry":
+            return index.data() in self.names
+        return True
+
+class MacroApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Helldivers 2 Macro")
+        self.setMinimumSize(800, 600)
+
+        self.log_max_lines = DEFAULT_LOG_MAX_LINES
+        self.log_ring = LogRing(self.log_max_lines)
+        self.log_handler = LogRingHandler(self.log_ring)
+        self.log_formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+        log.addHandler(self.log_handler)
+
+        data_warnings = hellmacro.load_data_files()
+        # The engine's weapons come from weapons.json, so it follows the load
+        self.engine = MacroEngine()
+
+        self.signal_handler = SignalHandler()
+        self.signal_handler.show_warning.connect(self.show_warning_message)
+        self.signal_handler.blink.connect(self.blink_indicator)
+        self.signal_handler.state_changed.connect(self.sync_state)
+        self.signal_handler.catalog_changed.connect(self.apply_catalog_change)
+        self.signal_handler.profile_switched.connect(self.apply_profile_switch)
+        self.signal_handler.recording_stopped.connect(self.save_recording)
+        self.engine.on_warning = self.signal_handler.show_warning.emit
+        self.engine.on_blink = self.signal_handler.blink.emit
+        self.engine.on_state_changed = self.signal_handler.state_changed.emit
+        self.engine.on_catalog_changed = self.signal_handler.catalog_changed.emit
+        self.engine.on_profile_switched = self.signal_handler.profile_switched.emit
+        self.engine.on_recording_stopped = self.signal_handler.recording_stopped.emit
+        PROFILE_STORE.on_error = self.signal_handler.show_warning.emit
+        for warning in data_warnings:
+            QMessageBox.warning(self, "Warning", warning)
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.main_layout = QVBoxLayout(self.central_widget)
+        self.main_layout.setContentsMargins(10, 10, 10, 10)
+        self.main_layout.setSpacing(10)
+
+        self.setStyleSheet("""
+            QMainWindow { background-color: #263238; color: #ECEFF1; }
+            QTabWidget::pane { border: 1px solid #455A64; background: #37474F; }
+            QTabBar::tab { 
+                background: #455A64; 
+                color: #ECEFF1; 
+                padding: 8px 16px; 
+                margin-right: 2px;
+                border-top-left-radius: 4px;
+                border-top-right-radius: 4px;
+            }
+            QTabBar::tab:selected { 
+                background: #37474F; 
+                border-bottom: 2px solid #4FC3F7;
+                color: #E1F5FE;
+            }
+            QLabel { color: #ECEFF1; font-size: 14px; }
+            QPushButton { 
+                background-color: #546E7A; 
+                color: #ECEFF1; 
+                padding: 3px 8px; 
+                border: none;
+                border-radius: 4px;
+                font-size: 11px;
+                min-height: 24px;
+                white-space: nowrap;
+            }
+            QPushButton:hover { background-color: #78909C; }
+            QPushButton:pressed { background-color: #455A64; }
+            QPushButton[clear="true"] { 
+                background-color: #EF5350; 
+                color: #FFFFFF; 
+                padding: 3px 8px; 
+                border-radius: 4px;
+                min-height: 24px;
+                white-space: nowrap;
+            }
+            QComboBox { 
+                background-color: #546E7A; 
+                color: #ECEFF1; 
+                border: none;
+                padding: 3px 8px;
+                border-radius: 4px;
+                font-size: 11px;
+                min-height: 24px;
+                white-space: nowrap;
+            }
+            QComboBox::drop-down { 
+                border: none;
+                width: 20px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #37474F;
+                color: #ECEFF1;
+                selection-background-color: #4FC3F7;
+            }
+            QLineEdit { 
+                background-color: #546E7A; 
+                color: #ECEFF1; 
+                border: none;
+                padding: 3px 8px;
+                border-radius: 4px;
+                font-size: 11px;
+                min-height: 24px;
+            }
+            QPlainTextEdit {
+                background-color: #1E272C;
+                color: #ECEFF1;
+                border: 1px solid #455A64;
+                padding: 5px;
+                font-family: Consolas, "Courier New", monospace;
+                font-size: 12px;
+            }
+            QCheckBox { 
+                color: #ECEFF1; 
+                font-size: 12px;
+                spacing: 5px;
+            }
+            QCheckBox::indicator {
+                width: 18px;
+                height: 18px;
+                background-color: #546E7A;
+                border: 1px solid #455A64;
+                border-radius: 3px;
+            }
+            QCheckBox::indicator:checked {
+                background-color: #4CAF50;
+                border: 1px solid #455A64;
+            }
+        """)
+
+        self.tab_widget = QTabWidget()
+        self.main_layout.addWidget(self.tab_widget)
+
+        self.stratagems_tab = QWidget()
+        self.weapons_tab = QWidget()
+        self.support_tab = QWidget()
+        self.chains_tab = QWidget()
+        self.logs_tab = QWidget()
+        self.metrics_tab = QWidget()
+        self.tab_widget.addTab(self.stratagems_tab, "Stratagems")
+        self.tab_widget.addTab(self.weapons_tab, "Weapons")
+        self.tab_widget.addTab(self.support_tab, "Support")
+        self.tab_widget.addTab(self.chains_tab, "Chains")
+        self.tab_widget.addTab(self.logs_tab, "Logs")
+        self.tab_widget.addTab(self.metrics_tab, "Metrics")
+        # Only the Stratagems tab is built up front; the others are built the
+        # first time they are opened
+        self.tab_builders = {
+            self.weapons_tab: self.create_weapons_tab,
+            self.support_tab: self.create_support_tab,
+            self.chains_tab: self.create_chains_tab,
+            self.logs_tab: self.create_logs_tab,
+            self.metrics_tab: self.create_metrics_tab
+        }
+        self.tab_widget.currentChanged.connect(self.build_tab)
+
+        self.keybind_buttons = []
+        self.stratagem_combos = []
+        self.stratagem_proxies = []
+        self.stratagem_filters = []
+        self.stratagem_outputs = []
+        self.delete_keybind_buttons = []
+        self.support_keybind_buttons = []
+        self.support_outputs = []
+        self.support_delete_keybind_buttons = []
+        self.support_test_buttons = []
+
+        self.create_stratagems_tab()
+        self.create_profile_section()
+
+        toggle_hbox = QHBoxLayout()
+        toggle_hbox.addStretch()
+        self.toggle_button = QPushButton("▶ Start")
+        self.toggle_button.setToolTip("Start or stop the macro system")
+        self.toggle_button.setStyleSheet("background-color: #4CAF50; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;")
+        self.toggle_button.clicked.connect(self.toggle_macro)
+        toggle_hbox.addWidget(self.toggle_button)
+        self.macro_indicator = QLabel()
+        self.macro_indicator.setFixedSize(20, 20)
+        self.macro_indicator.setStyleSheet("background-color: red; border-radius: 10px;")
+        toggle_hbox.addWidget(self.macro_indicator)
+        toggle_hbox.addStretch()
+        self.main_layout.addLayout(toggle_hbox)
+
+        self.load_profile(PROFILE_STORE.last_profile)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.engine.started:
+            self.engine.metrics.record("startup", "window_shown", time.perf_counter_ns() - STARTUP_T0_NS)
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        # Everything the window does not need to be drawn: input backend,
+        # sequence compilation, executor and listeners
+        if self.engine.started:
+            return
+        self.engine.start()
+
+        ready_ms = (time.perf_counter_ns() - STARTUP_T0_NS) / 1_000_000
+        self.engine.metrics.record("startup", "ready", int(ready_ms * 1_000_000))
+        if ready_ms > STARTUP_BUDGET_MS:
+            log.warning("Startup took %.0f ms (budget %d ms)", ready_ms, STARTUP_BUDGET_MS)
+        else:
+            log.info("Startup took %.0f ms (budget %d ms)", ready_ms, STARTUP_BUDGET_MS)
+
+        QMessageBox.warning(self, "Important Notice", "This tool is for personal use only. Please check Helldivers 2 Terms of Service regarding macros.")
+
+    def build_tab(self, index):
+        tab = self.tab_widget.widget(index)
+        builder = self.tab_builders.pop(tab, None)
+        if builder is not None:
+            started_ns = time.perf_counter_ns()
+            builder()
+            log.debug("Built %s tab in %.1f ms", self.tab_widget.tabText(index), (time.perf_counter_ns() - started_ns) / 1_000_000)
+
+    def is_tab_built(self, tab):
+        return tab not in self.tab_builders
+
+    def create_stratagems_tab(self):
+        layout = QGridLayout(self.stratagems_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Assign Stratagems")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label, 0, 0, 1, 3)
+
+        reload_button = QPushButton("Reload Stratagems")
+        reload_button.setToolTip("Reload stratagems from stratagems.json now; saved changes are also picked up automatically")
+        reload_button.clicked.connect(lambda: self.engine.reload_stratagems())
+        layout.addWidget(reload_button, 0, 2, 1, 1, alignment=Qt.AlignRight)
+
+        strat_labels = ["Stratagem 1", "Stratagem 2", "Stratagem 3", "Stratagem 4", "EXTRA 5"]
+        self.stratagem_model = QStandardItemModel(self)
+        self.stratagem_colors = {}
+        self.build_stratagem_model()
+
+        for i, strat_label in enumerate(strat_labels):
+            frame = QWidget()
+            frame_layout = QVBoxLayout(frame)
+            frame_layout.setContentsMargins(0, 4, 0, 4)
+            frame_layout.setSpacing(4)
+
+            label = QLabel(strat_label)
+            label.setStyleSheet("font-size: 16px; font-weight: bold;")
+            frame_layout.addWidget(label)
+
+            button_combo_frame = QWidget()
+            button_combo_layout = QHBoxLayout(button_combo_frame)
+            button_combo_layout.setContentsMargins(0, 0, 0, 0)
+            button_combo_layout.setSpacing(8)
+
+            keybind_button = QPushButton("Set Keybind")
+            keybind_button.setFixedWidth(120)
+            keybind_button.setToolTip("Assign a key or mouse button for this stratagem")
+            keybind_button.clicked.connect(lambda checked, idx=i: self.set_keybind(idx))
+            button_combo_layout.addWidget(keybind_button)
+            self.keybind_buttons.append(keybind_button)
+
+            del_button = QPushButton("Clear")
+            del_button.setFixedWidth(60)
+            del_button.setProperty("clear", True)
+            del_button.clicked.connect(lambda checked, idx=i: self.delete_keybind(idx))
+            button_combo_layout.addWidget(del_button)
+            self.delete_keybind_buttons.append(del_button)
+
+            filter_entry = QLineEdit()
+            filter_entry.setFixedWidth(110)
+            filter_entry.setPlaceholderText("Search...")
+            filter_entry.setToolTip("Filter by name, category or sequence (e.g. 'eag air', 'orbital', 'rrd'); Enter picks the first match")
+            filter_entry.textChanged.connect(lambda text, idx=i: self.filter_stratagem_combo(idx, text))
+            filter_entry.returnPressed.connect(lambda idx=i: self.pick_first_match(idx))
+            button_combo_layout.addWidget(filter_entry)
+            self.stratagem_filters.append(filter_entry)
+
+            combo = QComboBox()
+            combo.setFixedWidth(250)
+            proxy = StratagemFilterProxy(combo)
+            proxy.setSourceModel(self.stratagem_model)
+            combo.setModel(proxy)
+            combo.setItemDelegate(ColorDelegate())
+            self.stratagem_proxies.append(proxy)
+            combo.view().setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            combo.currentTextChanged.connect(lambda value, idx=i: self.update_stratagem_output(idx))
+            combo.currentTextChanged.connect(lambda value, idx=i: self.update_stratagem_choice(idx, value))
+            button_combo_layout.addWidget(combo)
+            self.stratagem_combos.append(combo)
+
+            test_button = QPushButton("Test")
+            test_button.setFixedWidth(60)
+            test_button.setToolTip("Test this stratagem sequence")
+            test_button.clicked.connect(lambda checked, idx=i: self.test_stratagem(idx))
+            button_combo_layout.addWidget(test_button)
+
+            button_combo_layout.addStretch()
+            frame_layout.addWidget(button_combo_frame)
+
+            output_frame = QWidget()
+            output_layout = QHBoxLayout(output_frame)
+            output_layout.setContentsMargins(0, 0, 0, 0)
+            output_layout.setSpacing(8)
+
+            output_label = QLabel("")
+            output_layout.addWidget(output_label)
+            self.stratagem_outputs.append(output_label)
+            output_layout.addStretch()
+
+            frame_layout.addWidget(output_frame)
+            layout.addWidget(frame, i + 1, 0, 1, 3)
+
+        policy_frame = QWidget()
+        policy_layout = QHBoxLayout(policy_frame)
+        policy_layout.setContentsMargins(0, 4, 0, 4)
+        policy_layout.setSpacing(8)
+        policy_layout.addWidget(QLabel("When a macro is busy:"))
+        self.macro_policy_combo = QComboBox()
+        self.macro_policy_combo.setFixedWidth(120)
+        self.macro_policy_combo.addItems(list(MACRO_QUEUE_POLICIES))
+        self.macro_policy_combo.setCurrentText(self.engine.macro_queue_policy)
+        self.macro_policy_combo.setToolTip(
+            "drop: ignore the trigger\n"
+            "queue: run it after the current sequence\n"
+            "latest: run only the most recent pending trigger\n"
+            "preempt: interrupt the current sequence"
+        )
+        self.macro_policy_combo.currentTextChanged.connect(self.engine.set_macro_queue_policy)
+        policy_layout.addWidget(self.macro_policy_combo)
+
+        policy_layout.addWidget(QLabel("Key delay (s):"))
+        self.macro_delay_entry = QLineEdit(str(self.engine.macro_delay))
+        self.macro_delay_entry.setFixedWidth(60)
+        self.macro_delay_entry.setToolTip("Enter value >= 0.01 and <= 1 for the press/release delay of each key")
+        policy_layout.addWidget(self.macro_delay_entry)
+
+        policy_layout.addWidget(QLabel("Ctrl lead-in (s):"))
+        self.ctrl_lead_in_entry = QLineEdit(str(self.engine.ctrl_lead_in))
+        self.ctrl_lead_in_entry.setFixedWidth(60)
+        self.ctrl_lead_in_entry.setToolTip("Enter value >= 0 and <= 1 for the delay between holding Ctrl and the first key")
+        policy_layout.addWidget(self.ctrl_lead_in_entry)
+
+        timing_update_button = QPushButton("Update")
+        timing_update_button.setFixedWidth(80)
+        timing_update_button.clicked.connect(self.update_sequence_timing)
+        policy_layout.addWidget(timing_update_button)
+        policy_layout.addStretch()
+        layout.addWidget(policy_frame, i + 2, 0, 1, 3)
+
+        record_frame = QWidget()
+        record_layout = QHBoxLayout(record_frame)
+        record_layout.setContentsMargins(0, 4, 0, 4)
+        record_layout.setSpacing(8)
+        record_layout.addWidget(QLabel("Record a macro:"))
+        self.record_name_entry = QLineEdit()
+        self.record_name_entry.setFixedWidth(180)
+        self.record_name_entry.setPlaceholderText("Name for the recording")
+        record_layout.addWidget(self.record_name_entry)
+        self.record_button = QPushButton("● Record")
+        self.record_button.setFixedWidth(120)
+        self.record_button.setToolTip("Record key presses with their timing; press Esc or click again to stop and save")
+        self.record_button.clicked.connect(self.toggle_recording)
+        record_layout.addWidget(self.record_button)
+        self.record_status = QLabel("")
+        self.record_status.setStyleSheet("font-size: 12px; color: #B0BEC5;")
+        record_layout.addWidget(self.record_status)
+        record_layout.addStretch()
+        layout.addWidget(record_frame, i + 3, 0, 1, 3)
+
+        layout.setRowStretch(i + 4, 1)
+
+    def apply_catalog_change(self, change):
+        if change.errors:
+            self.signal_handler.show_warning.emit("Invalid stratagem sequences were skipped:\n" + "\n".join(change.errors))
+        # Updating the shared model can move every combo's current row; keep
+        # the engine's selections and restore them afterwards
+        for combo in self.stratagem_combos:
+            combo.blockSignals(True)
+        self.update_stratagem_model()
+        for i, combo in enumerate(self.stratagem_combos):
+            if combo.currentText() != self.engine.stratagem_names[i]:
+                combo.setCurrentText(self.engine.stratagem_names[i])  # Preserve selection if possible
+            combo.blockSignals(False)
+            self.filter_stratagem_combo(i, self.stratagem_filters[i].text())
+            self.update_stratagem_output(i)
+
+    def picker_color(self, name):
+        if name not in self.stratagem_colors:
+            self.stratagem_colors[name] = QColor(name)
+        return self.stratagem_colors[name]
+
+    def make_category_item(self, category, color):
+        item = QStandardItem(category)
+        font = QFont()
+        font.setBold(True)
+        item.setFont(font)
+        item.setForeground(self.picker_color(color))
+        item.setData(color, Qt.UserRole)
+        item.setData("category", PICKER_KIND_ROLE)
+        item.setFlags(Qt.ItemIsEnabled)
+        self.stratagem_category_items[category] = item
+        return item
+
+    def make_entry_item(self, entry):
+        item = QStandardItem(entry.name)
+        item.setForeground(self.picker_color(entry.color))
+        item.setData(entry.color, Qt.UserRole)
+        item.setData("entry", PICKER_KIND_ROLE)
+        self.stratagem_items[entry.name] = item
+        return item
+
+    def build_stratagem_model(self):
+        # One model shared by all five combos, categories as real headers
+        self.stratagem_index = StratagemIndex(hellmacro.STRATAGEM_DATA)
+        self.stratagem_items = {}
+        self.stratagem_category_items = {}
+        self.stratagem_model.clear()
+        item = QStandardItem("Select Stratagem")
+        item.setForeground(self.picker_color("#ECEFF1"))
+        item.setData("#ECEFF1", Qt.UserRole)
+        item.setData("placeholder", PICKER_KIND_ROLE)
+        rows = [item]
+        category_colors = dict(self.stratagem_index.categories)
+        category = None
+        for entry in self.stratagem_index.entries:
+            if entry.category != category and entry.category:
+                rows.append(self.make_category_item(entry.category, category_colors[entry.category]))
+            category = entry.category
+            rows.append(self.make_entry_item(entry))
+        for item in rows:
+            self.stratagem_model.appendRow(item)
+
+    def update_stratagem_model(self):
+        # Patches the shared model in place when only entries were added,
+        # removed or edited; falls back to a rebuild if categories or the
+        # order of the remaining entries changed
+        old = self.stratagem_index
+        new = StratagemIndex(hellmacro.STRATAGEM_DATA)
+        old_entries = {entry.name: entry for entry in old.entries}
+        new_entries = {entry.name: entry for entry in new.entries}
+        kept_old = [(e.name, e.category) for e in old.entries if e.name in new_entries]
+        kept_new = [(e.name, e.category) for e in new.entries if e.name in old_entries]
+        used_old = {e.category for e in old.entries}
+        used_new = {e.category for e in new.entries}
+        if kept_old != kept_new or used_old != used_new or dict(old.categories) != dict(new.categories):
+            self.build_stratagem_model()
+            return
+
+        self.stratagem_index = new
+        for name in old_entries:
+            if name not in new_entries:
+                item = self.stratagem_items.pop(name)
+                self.stratagem_model.removeRow(item.row())
+        previous = None
+        for entry in new.entries:
+            item = self.stratagem_items.get(entry.name)
+            if item is None:
+                if previous is not None and previous.category == entry.category:
+                    anchor = self.stratagem_items[previous.name]
+                elif entry.category:
+                    anchor = self.stratagem_category_items[entry.category]
+                else:
+                    anchor = self.stratagem_model.item(0)
+                self.stratagem_model.insertRow(anchor.row() + 1, self.make_entry_item(entry))
+            elif old_entries[entry.name].color != entry.color:
+                item.setForeground(self.picker_color(entry.color))
+                item.setData(entry.color, Qt.UserRole)
+            previous = entry
+
+    def filter_stratagem_combo(self, idx, text):
+        self.stratagem_proxies[idx].set_matches(self.stratagem_index.search(text), self.engine.stratagem_names[idx])
+
+    def pick_first_match(self, idx):
+        matches = self.stratagem_index.search(self.stratagem_filters[idx].text())
+        if matches:
+            self.stratagem_combos[idx].setCurrentText(matches[0].name)
+            self.stratagem_filters[idx].clear()
+
+    def create_weapons_tab(self):
+        layout = QVBoxLayout(self.weapons_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Weapons Configuration")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label)
+
+        # One section per weapon in weapons.json
+        self.weapon_buttons = {}
+        self.weapon_keybind_buttons = {}
+        self.weapon_info_labels = {}
+        self.weapon_fallback_checkboxes = {}
+        self.weapon_setting_entries = {}
+        for weapon_id, state in self.engine.weapons.items():
+            spec = state.spec
+            weapon_frame = QWidget()
+            weapon_layout = QVBoxLayout(weapon_frame)
+            weapon_layout.setSpacing(4)
+            weapon_layout.setContentsMargins(0, 0, 0, 0)
+
+            button_frame = QWidget()
+            button_layout = QHBoxLayout(button_frame)
+            button_layout.setSpacing(8)
+            button_layout.setContentsMargins(0, 0, 0, 0)
+
+            toggle_button = QPushButton(f"{spec.name}: OFF")
+            toggle_button.clicked.connect(lambda checked=False, w=weapon_id: self.engine.toggle_weapon(w))
+            button_layout.addWidget(toggle_button)
+            self.weapon_buttons[weapon_id] = toggle_button
+
+            keybind_button = QPushButton("Set Keybind")
+            keybind_button.setFixedWidth(120)
+            keybind_button.setToolTip(f"Assign a key to toggle {spec.name}")
+            keybind_button.clicked.connect(lambda checked=False, w=weapon_id: self.set_weapon_keybind(w))
+            button_layout.addWidget(keybind_button)
+            self.weapon_keybind_buttons[weapon_id] = keybind_button
+
+            delete_button = QPushButton("Clear")
+            delete_button.setFixedWidth(60)
+            delete_button.setProperty("clear", True)
+            delete_button.clicked.connect(lambda checked=False, w=weapon_id: self.delete_weapon_keybind(w))
+            button_layout.addWidget(delete_button)
+
+            button_layout.addStretch()
+            weapon_layout.addWidget(button_frame)
+
+            info = QLabel(state.description())
+            info.setStyleSheet("font-size: 12px; color: #B0BEC5;")
+            weapon_layout.addWidget(info)
+            self.weapon_info_labels[weapon_id] = info
+
+            if spec.fallback_steps:
+                fallback_checkbox = QCheckBox(spec.fallback_label)
+                fallback_checkbox.toggled.connect(lambda checked, w=weapon_id: self.update_weapon_fallback(w, checked))
+                weapon_layout.addWidget(fallback_checkbox)
+                self.weapon_fallback_checkboxes[weapon_id] = fallback_checkbox
+
+            for name, setting in spec.settings.items():
+                setting_frame = QHBoxLayout()
+                setting_frame.addWidget(QLabel(f"{setting.label} (seconds):"))
+
+                entry = QLineEdit(str(state.settings[name]))
+                entry.setFixedWidth(60)
+                entry.setToolTip(f"Enter value >= {setting.minimum} and <= {setting.maximum}")
+                setting_frame.addWidget(entry)
+                self.weapon_setting_entries[(weapon_id, name)] = entry
+
+                update_button = QPushButton("Update")
+                update_button.setFixedWidth(80)
+                update_button.clicked.connect(lambda checked=False, w=weapon_id, n=name: self.update_weapon_setting(w, n))
+                setting_frame.addWidget(update_button)
+                setting_frame.addStretch()
+                weapon_layout.addLayout(setting_frame)
+
+            layout.addWidget(weapon_frame)
+
+        if not self.engine.weapons:
+            empty_label = QLabel("No weapons defined. Add them to weapons.json and restart.")
+            empty_label.setStyleSheet("font-size: 12px; color: #B0BEC5;")
+            layout.addWidget(empty_label)
+        layout.addStretch()
+        self.sync_weapons_tab()
+
+    def create_support_tab(self):
+        layout = QGridLayout(self.support_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Support Stratagems")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label, 0, 0, 1, 5)  # Adjusted for test button
+
+        support_stratagems = list(SUPPORT_STRATAGEMS.keys())
+
+        for i, strat_name in enumerate(support_stratagems):
+            frame = QWidget()
+            frame_layout = QHBoxLayout(frame)
+            frame_layout.setContentsMargins(0, 6, 0, 6)
+            frame_layout.setSpacing(8)
+
+            label = QLabel(strat_name)
+            label.setFixedWidth(120)
+            frame_layout.addWidget(label)
+
+            keybind_button = QPushButton("Set Keybind")
+            keybind_button.setFixedWidth(120)
+            keybind_button.setToolTip("Assign a key or mouse button for this support stratagem")
+            keybind_button.clicked.connect(lambda checked, idx=i: self.set_support_keybind(idx))
+            frame_layout.addWidget(keybind_button)
+            self.support_keybind_buttons.append(keybind_button)
+
+            del_button = QPushButton("Clear")
+            del_button.setFixedWidth(60)
+            del_button.setProperty("clear", True)
+            del_button.clicked.connect(lambda checked, idx=i: self.delete_support_keybind(idx))
+            frame_layout.addWidget(del_button)
+            self.support_delete_keybind_buttons.append(del_button)
+
+            test_button = QPushButton("Test")
+            test_button.setFixedWidth(60)
+            test_button.setToolTip("Test this support stratagem sequence")
+            test_button.clicked.connect(lambda checked, idx=i: self.test_support_stratagem(idx))
+            frame_layout.addWidget(test_button)
+            self.support_test_buttons.append(test_button)
+
+            sequence = SUPPORT_STRATAGEMS.get(strat_name, [])
+            output_label = QLabel(" → ".join(sequence))
+            frame_layout.addWidget(output_label)
+            self.support_outputs.append(output_label)
+
+            layout.addWidget(frame, i + 1, 0, 1, 5)
+
+        layout.setRowStretch(i + 2, 1)
+        self.sync_support_tab()
+
+    def create_chains_tab(self):
+        layout = QVBoxLayout(self.chains_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Stratagem Chains")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label)
+
+        info = QLabel("A chain plays its stratagems one after another while holding Ctrl once. "
+                      "List two or more stratagem or support stratagem names, separated by commas.")
+        info.setWordWrap(True)
+        info.setStyleSheet("font-size: 12px; color: #B0BEC5;")
+        layout.addWidget(info)
+
+        # One row per chain of the current profile, rebuilt by sync_chains_tab
+        self.chain_rows = QWidget()
+        self.chain_rows_layout = QVBoxLayout(self.chain_rows)
+        self.chain_rows_layout.setContentsMargins(0, 0, 0, 0)
+        self.chain_rows_layout.setSpacing(6)
+        layout.addWidget(self.chain_rows)
+        self.chain_row_names = None
+        self.chain_entries = []
+        self.chain_keybind_buttons = []
+
+        add_frame = QWidget()
+        add_layout = QHBoxLayout(add_frame)
+        add_layout.setContentsMargins(0, 4, 0, 4)
+        add_layout.setSpacing(8)
+        add_button = QPushButton("Add Chain")
+        add_button.setFixedWidth(120)
+        add_button.clicked.connect(self.add_chain)
+        add_layout.addWidget(add_button)
+        self.new_chain_entries = self.chain_row_fields(add_layout, "", [], DEFAULT_CHAIN_GAP)
+        add_layout.addStretch()
+        layout.addWidget(add_frame)
+
+        layout.addStretch()
+        self.sync_chains_tab()
+
+    def chain_row_fields(self, row_layout, name, stratagems, gap):
+        name_entry = QLineEdit(name)
+        name_entry.setFixedWidth(140)
+        name_entry.setPlaceholderText("Chain name")
+        row_layout.addWidget(name_entry)
+        stratagems_entry = QLineEdit(", ".join(stratagems))
+        stratagems_entry.setMinimumWidth(260)
+        stratagems_entry.setPlaceholderText("Resupply, Eagle Rearm")
+        row_layout.addWidget(stratagems_entry)
+        row_layout.addWidget(QLabel("Gap (s):"))
+        gap_entry = QLineEdit(str(gap))
+        gap_entry.setFixedWidth(50)
+        gap_entry.setToolTip(f"Enter value >= 0 and <= {MAX_CHAIN_GAP} for the pause between stratagems")
+        row_layout.addWidget(gap_entry)
+        return name_entry, stratagems_entry, gap_entry
+
+    def sync_chains_tab(self):
+        if not self.is_tab_built(self.chains_tab):
+            return
+        chains = self.engine.chains
+        names = [chain.name for chain in chains]
+        if names != self.chain_row_names:
+            # Rows are only rebuilt when chains come or go, so a keybind
+            # change does not throw away edits in progress
+            while self.chain_rows_layout.count():
+                self.chain_rows_layout.takeAt(0).widget().deleteLater()
+            self.chain_entries = []
+            self.chain_keybind_buttons = []
+            for i, chain in enumerate(chains):
+                row = QWidget()
+                row_layout = QHBoxLayout(row)
+                row_layout.setContentsMargins(0, 0, 0, 0)
+                row_layout.setSpacing(8)
+
+                keybind_button = QPushButton("Set Keybind")
+                keybind_button.setFixedWidth(120)
+                keybind_button.setToolTip("Assign a key or mouse button for this chain")
+                keybind_button.clicked.connect(lambda checked=False, idx=i: self.set_chain_keybind(idx))
+                row_layout.addWidget(keybind_button)
+                self.chain_keybind_buttons.append(keybind_button)
+
+                del_button = QPushButton("Clear")
+                del_button.setFixedWidth(60)
+                del_button.setProperty("clear", True)
+                del_button.clicked.connect(lambda checked=False, idx=i: self.delete_chain_keybind(idx))
+                row_layout.addWidget(del_button)
+
+                self.chain_entries.append(self.chain_row_fields(row_layout, chain.name, chain.stratagems, chain.gap))
+
+                update_button = QPushButton("Update")
+                update_button.setFixedWidth(80)
+                update_button.clicked.connect(lambda checked=False, idx=i: self.update_chain(idx))
+                row_layout.addWidget(update_button)
+
+                test_button = QPushButton("Test")
+                test_button.setFixedWidth(60)
+                test_button.setToolTip("Test this chain")
+                test_button.clicked.connect(lambda checked=False, idx=i: self.test_chain(idx))
+                row_layout.addWidget(test_button)
+
+                delete_button = QPushButton("Delete")
+                delete_button.setFixedWidth(70)
+                delete_button.clicked.connect(lambda checked=False, idx=i: self.delete_chain(idx))
+                row_layout.addWidget(delete_button)
+                row_layout.addStretch()
+                self.chain_rows_layout.addWidget(row)
+            self.chain_row_names = names
+        for chain, button, (name_entry, stratagems_entry, gap_entry) in zip(chains, self.chain_keybind_buttons, self.chain_entries):
+            button.setText(chain.keybind if chain.keybind else "Set Keybind")
+            for entry, text in ((name_entry, chain.name), (stratagems_entry, ", ".join(chain.stratagems)), (gap_entry, str(chain.gap))):
+                if not entry.hasFocus():
+                    entry.setText(text)
+
+    def read_chain_fields(self, entries):
+        # (name, stratagems, gap) from a chain row, or None after a warning
+        name_entry, stratagems_entry, gap_entry = entries
+        try:
+            gap = float(gap_entry.text())
+        except ValueError:
+            self.signal_handler.show_warning.emit("Please enter a valid number for the chain gap.")
+            executor_log.warning("Failed to save chain: Invalid gap entered")
+            return None
+        stratagems = [name.strip() for name in stratagems_entry.text().split(",") if name.strip()]
+        return name_entry.text().strip(), stratagems, gap
+
+    def add_chain(self):
+        fields = self.read_chain_fields(self.new_chain_entries)
+        if fields is not None and self.save_chain(None, *fields):
+            self.new_chain_entries[0].clear()
+            self.new_chain_entries[1].clear()
+
+    def update_chain(self, index):
+        fields = self.read_chain_fields(self.chain_entries[index])
+        if fields is not None:
+            self.save_chain(index, *fields)
+
+    def save_chain(self, index, name, stratagems, gap):
+        try:
+            self.engine.set_chain(index, name, stratagems, gap)
+        except ValueError as e:
+            self.signal_handler.show_warning.emit(str(e))
+            executor_log.warning("Failed to save chain: %s", e)
+            return False
+        return True
+
+    def delete_chain(self, index):
+        self.engine.delete_chain(index)
+
+    def set_chain_keybind(self, index):
+        self.engine.active_keybind = f"chain:{index}"
+        self.chain_keybind_buttons[index].setText("Press a key, chord or side mouse button...")
+        listener_log.debug("Setting keybind for chain %s...", self.engine.chains[index].name)
+
+    def delete_chain_keybind(self, index):
+        self.engine.set_chain_keybind(index, "")
+        self.chain_keybind_buttons[index].setText("Set Keybind")
+        listener_log.info("Cleared keybind for chain %s", self.engine.chains[index].name)
+
+    def test_chain(self, index):
+        compiled = self.engine.compiled_chain(index)
+        if compiled:
+            executor_log.info("[TEST] Chain %s: %s", compiled.name, " → ".join(self.engine.chains[index].stratagems))
+            self.engine.test_sequence(compiled)
+        else:
+            executor_log.info("[TEST] Chain %s has a stratagem without a valid sequence.", self.engine.chains[index].name)
+
+    def create_logs_tab(self):
+        layout = QVBoxLayout(self.logs_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Logs")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label)
+
+        self.log_text = QPlainTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.log_max_lines)
+        self.log_text.setStyleSheet("""
+            QPlainTextEdit {
+                background-color: #1E272C;
+                color: #ECEFF1;
+                border: 1px solid #455A64;
+                padding: 5px;
+                font-family: Consolas, "Courier New", monospace;
+                font-size: 12px;
+            }
+        """)
+        layout.addWidget(self.log_text)
+
+        controls_frame = QHBoxLayout()
+        clear_button = QPushButton("Clear Logs")
+        clear_button.setFixedWidth(100)
+        clear_button.setProperty("clear", True)
+        clear_button.clicked.connect(self.clear_logs)
+        controls_frame.addWidget(clear_button)
+
+        controls_frame.addWidget(QLabel("Max lines:"))
+        self.log_max_lines_entry = QLineEdit(str(self.log_max_lines))
+        self.log_max_lines_entry.setFixedWidth(60)
+        self.log_max_lines_entry.setToolTip("Enter a whole number between 100 and 100000")
+        controls_frame.addWidget(self.log_max_lines_entry)
+
+        log_update_button = QPushButton("Update")
+        log_update_button.setFixedWidth(80)
+        log_update_button.clicked.connect(self.update_log_max_lines)
+        controls_frame.addWidget(log_update_button)
+        controls_frame.addStretch()
+        layout.addLayout(controls_frame)
+
+        levels_frame = QHBoxLayout()
+        levels_frame.addWidget(QLabel("Log levels:"))
+        self.log_level_combos = {}
+        for name in LOG_SUBSYSTEMS:
+            levels_frame.addWidget(QLabel(name.capitalize()))
+            combo = QComboBox()
+            combo.setFixedWidth(90)
+            combo.addItems(list(LOG_LEVELS))
+            combo.setCurrentText(DEFAULT_LOG_LEVEL)
+            combo.setToolTip(f"Minimum level logged for the {name} subsystem; DEBUG traces every event")
+            combo.currentTextChanged.connect(lambda level, name=name: self.update_log_level(name, level))
+            levels_frame.addWidget(combo)
+            self.log_level_combos[name] = combo
+        levels_frame.addStretch()
+        layout.addLayout(levels_frame)
+
+        self.log_flush_timer = QTimer(self)
+        self.log_flush_timer.timeout.connect(self.flush_logs)
+        self.log_flush_timer.start(LOG_FLUSH_INTERVAL_MS)
+        self.sync_logs_tab()
+
+    def sync_weapons_tab(self):
+        if not self.is_tab_built(self.weapons_tab):
+            return
+        weapons_enabled = self.engine.weapons_enabled
+        for weapon_id, state in self.engine.weapons.items():
+            button = self.weapon_buttons[weapon_id]
+            enabled = weapon_id in weapons_enabled
+            color = "#4CAF50" if enabled else "#EF5350"
+            button.setText(f"{state.spec.name}: {'ON' if enabled else 'OFF'}")
+            button.setStyleSheet(
+                f"background-color: {color}; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;"
+            )
+            self.weapon_keybind_buttons[weapon_id].setText(state.keybind if state.keybind else "Set Keybind")
+            self.weapon_info_labels[weapon_id].setText(state.description())
+            checkbox = self.weapon_fallback_checkboxes.get(weapon_id)
+            if checkbox is not None:
+                checkbox.blockSignals(True)
+                checkbox.setChecked(state.use_fallback)
+                checkbox.blockSignals(False)
+            for name, value in state.settings.items():
+                self.weapon_setting_entries[(weapon_id, name)].setText(str(value))
+
+    def sync_support_tab(self):
+        if not self.is_tab_built(self.support_tab):
+            return
+        for i in range(len(self.support_keybind_buttons)):
+            self.support_keybind_buttons[i].setText(self.engine.support_keybind_vars[i] if self.engine.support_keybind_vars[i] else "Set Keybind")
+
+    def sync_logs_tab(self):
+        if not self.is_tab_built(self.logs_tab):
+            return
+        self.log_text.setMaximumBlockCount(self.log_max_lines)
+        self.log_max_lines_entry.setText(str(self.log_max_lines))
+        for name, level in get_log_levels().items():
+            self.log_level_combos[name].blockSignals(True)
+            self.log_level_combos[name].setCurrentText(level)
+            self.log_level_combos[name].blockSignals(False)
+
+    def create_metrics_tab(self):
+        layout = QVBoxLayout(self.metrics_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        label = QLabel("Timing Metrics")
+        label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(label)
+
+        info = QLabel("Input latency is measured from the physical key to the first synthetic key. All values in milliseconds.")
+        info.setStyleSheet("font-size: 12px; color: #B0BEC5;")
+        layout.addWidget(info)
+
+        self.metrics_table = QTableWidget(0, 7)
+        self.metrics_table.setHorizontalHeaderLabels(["Metric", "Label", "Count", "p50", "p95", "p99", "Max"])
+        self.metrics_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.metrics_table.verticalHeader().setVisible(False)
+        self.metrics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.metrics_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #1E272C;
+                color: #ECEFF1;
+                border: 1px solid #455A64;
+                gridline-color: #455A64;
+                font-size: 12px;
+            }
+            QHeaderView::section {
+                background-color: #455A64;
+                color: #ECEFF1;
+                border: none;
+                padding: 4px;
+            }
+        """)
+        layout.addWidget(self.metrics_table)
+
+        buttons_frame = QHBoxLayout()
+        export_button = QPushButton("Export JSON")
+        export_button.setFixedWidth(100)
+        export_button.setToolTip("Save all histograms to a JSON file")
+        export_button.clicked.connect(self.export_metrics)
+        buttons_frame.addWidget(export_button)
+
+        reset_button = QPushButton("Reset")
+        reset_button.setFixedWidth(80)
+        reset_button.setProperty("clear", True)
+        reset_button.clicked.connect(self.reset_metrics)
+        buttons_frame.addWidget(reset_button)
+        buttons_frame.addStretch()
+        layout.addLayout(buttons_frame)
+
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
+        self.metrics_timer.start(METRICS_REFRESH_INTERVAL_MS)
+
+    def create_profile_section(self):
+        profile_frame = QWidget()
+        profile_layout = QHBoxLayout(profile_frame)
+        profile_layout.setContentsMargins(0, 5, 0, 5)
+        profile_layout.setSpacing(8)
+
+        label = QLabel("Profile Management")
+        label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        profile_layout.addWidget(label)
+
+        self.profile_combo = QComboBox()
+        self.profile_combo.setFixedWidth(150)
+        self.profile_combo.addItems(list(PROFILE_STORE.names))
+        self.profile_combo.currentTextChanged.connect(self.load_profile)
+        profile_layout.addWidget(self.profile_combo)
+
+        self.profile_name_entry = QLineEdit()
+        self.profile_name_entry.setFixedWidth(150)
+        self.profile_name_entry.setPlaceholderText("Enter profile name")
+        profile_layout.addWidget(self.profile_name_entry)
+
+        create_button = QPushButton("Create Profile")
+        create_button.setFixedWidth(100)
+        create_button.setToolTip("Create a new profile with current configuration")
+        create_button.clicked.connect(self.create_new_profile)
+        profile_layout.addWidget(create_button)
+
+        save_button = QPushButton("Save Profile")
+        save_button.setFixedWidth(100)
+        save_button.setToolTip("Save the current configuration to the selected profile")
+        save_button.clicked.connect(self.save_profile)
+        profile_layout.addWidget(save_button)
+
+        rename_button = QPushButton("Rename Profile")
+        rename_button.setFixedWidth(100)
+        rename_button.setToolTip("Rename the selected profile")
+        rename_button.clicked.connect(self.rename_profile)
+        profile_layout.addWidget(rename_button)
+
+        del_button = QPushButton("Delete")
+        del_button.setFixedWidth(80)
+        del_button.setProperty("clear", True)
+        del_button.setToolTip("Delete the selected profile")
+        del_button.clicked.connect(self.confirm_delete_profile)
+        profile_layout.addWidget(del_button)
+
+        profile_layout.addStretch()
+        self.main_layout.addWidget(profile_frame)
+
+        # Hotkeys that switch profiles while the game has focus
+        hotkey_frame = QWidget()
+        hotkey_layout = QHBoxLayout(hotkey_frame)
+        hotkey_layout.setContentsMargins(0, 0, 0, 5)
+        hotkey_layout.setSpacing(8)
+        self.hotkey_buttons = {}
+        for slot, tooltip in (
+            ("profile_switch", "Assign a key that switches to this profile (saved with the profile)"),
+            ("next_profile", "Assign a key that switches to the next profile"),
+            ("previous_profile", "Assign a key that switches to the previous profile")
+        ):
+            hotkey_layout.addWidget(QLabel(f"{PROFILE_HOTKEY_LABELS[slot]}:"))
+            button = QPushButton("Set Keybind")
+            button.setFixedWidth(120)
+            button.setToolTip(tooltip)
+            button.clicked.connect(lambda checked=False, slot=slot: self.set_hotkey_keybind(slot))
+            hotkey_layout.addWidget(button)
+            self.hotkey_buttons[slot] = button
+
+            clear_button = QPushButton("Clear")
+            clear_button.setFixedWidth(60)
+            clear_button.setProperty("clear", True)
+            clear_button.clicked.connect(lambda checked=False, slot=slot: self.delete_hotkey_keybind(slot))
+            hotkey_layout.addWidget(clear_button)
+        hotkey_layout.addStretch()
+        self.main_layout.addWidget(hotkey_frame)
+
+    def flush_logs(self):
+        # Leave records in the ring while the Logs tab is hidden; it only keeps
+        # as many as the view would show anyway.
+        if not self.log_ring.records or not self.log_text.isVisible():
+            return
+        lines = [self.log_formatter.format(record) for record in self.log_ring.drain()]
+        self.log_text.appendPlainText("\n".join(lines))
+        self.log_text.verticalScrollBar().setValue(self.log_text.verticalScrollBar().maximum())
+
+    def clear_logs(self):
+        self.log_ring.drain()
+        if self.is_tab_built(self.logs_tab):
+            self.log_text.clear()
+
+    def update_log_max_lines(self):
+        try:
+            new_max = int(self.log_max_lines_entry.text())
+            if new_max < 100 or new_max > 100000:
+                self.signal_handler.show_warning.emit("Max lines must be between 100 and 100000.")
+                log.warning("Failed to update log max lines: Invalid range")
+                return
+            self.set_log_max_lines(new_max)
+            log.info("Updated log max lines to %s", self.log_max_lines)
+        except ValueError:
+            self.signal_handler.show_warning.emit("Please enter a whole number for max lines.")
+            log.warning("Failed to update log max lines: Invalid number entered")
+
+    def refresh_metrics(self):
+        if not self.metrics_table.isVisible():
+            return
+        rows = self.engine.metrics.snapshot()
+        self.metrics_table.setRowCount(len(rows))
+        for row, entry in enumerate(rows):
+            values = [
+                entry["metric"], entry["label"], str(entry["count"]),
+                *(f"{entry[k] / 1_000_000:.3f}" for k in ("p50_ns", "p95_ns", "p99_ns", "max_ns"))
+            ]
+            for col, value in enumerate(values):
+                self.metrics_table.setItem(row, col, QTableWidgetItem(value))
+
+    def export_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.json", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            self.engine.metrics.export_json(path)
+            log.info("Exported metrics to %s", path)
+        except Exception as e:
+            self.signal_handler.show_warning.emit(f"Failed to export metrics: {e}")
+            log.warning("Failed to export metrics: %s", e)
+
+    def reset_metrics(self):
+        self.engine.metrics.reset()
+        self.metrics_table.setRowCount(0)
+        log.info("Metrics reset")
+
+    def update_log_level(self, name, level):
+        if level not in LOG_LEVELS:
+            return
+        LOG_SUBSYSTEMS[name].setLevel(level)
+        log.info("Log level for %s set to %s", name, level)
+
+    def set_log_max_lines(self, max_lines):
+        self.log_max_lines = max_lines
+        self.log_ring.resize(max_lines)
+        self.sync_logs_tab()
+
+    def blink_indicator(self):
+        def blink_cycle(count):
+            if count % 2 == 0:
+                self.macro_indicator.setStyleSheet("background-color: yellow; border-radius: 10px;")
+            else:
+                self.macro_indicator.setStyleSheet(f"background-color: {'green' if self.engine.running_macro else 'red'}; border-radius: 10px;")
+            if count > 0:
+                QTimer.singleShot(100, lambda: blink_cycle(count - 1))
+        blink_cycle(3)
+
+    def toggle_recording(self):
+        if self.engine.recorder is not None:
+            # save_recording follows through the recording_stopped signal
+            self.engine.stop_recording()
+            return
+        name = self.record_name_entry.text().strip()
+        if not name:
+            self.signal_handler.show_warning.emit("Please enter a name for the recording.")
+            executor_log.warning("Failed to start recording: No name entered")
+            return
+        if name in hellmacro.STRATAGEM_DATA.entries:
+            reply = QMessageBox.question(self, "Confirmation", f"Are you sure you want to overwrite '{name}'?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply == QMessageBox.No:
+                return
+        self.engine.start_recording()
+        self.record_button.setText("■ Stop (Esc)")
+        self.record_status.setText("Recording...")
+
+    def save_recording(self, recorder):
+        self.record_button.setText("● Record")
+        try:
+            summary = self.engine.save_recording(self.record_name_entry.text().strip(), recorder)
+        except (OSError, ValueError) as e:
+            self.record_status.setText("")
+            self.signal_handler.show_warning.emit(f"Could not save the recording: {e}")
+            executor_log.warning("Could not save the recording: %s", e)
+            return
+        self.record_status.setText(summary)
+        self.record_name_entry.clear()
+
+    def update_sequence_timing(self):
+        try:
+            new_delay = float(self.macro_delay_entry.text())
+            new_lead_in = float(self.ctrl_lead_in_entry.text())
+        except ValueError:
+            self.signal_handler.show_warning.emit("Please enter valid numbers for the sequence timing.")
+            executor_log.warning("Failed to update sequence timing: Invalid number entered")
+            return
+        if new_delay < 0.01 or new_delay > 1 or new_lead_in < 0 or new_lead_in > 1:
+            self.signal_handler.show_warning.emit("Key delay must be between 0.01 and 1 second, Ctrl lead-in between 0 and 1 second.")
+            executor_log.warning("Failed to update sequence timing: Invalid range")
+            return
+        self.engine.set_sequence_timing(new_delay, new_lead_in)
+
+    def update_weapon_fallback(self, weapon_id, checked):
+        self.engine.set_weapon_fallback(weapon_id, checked)
+        state = self.engine.weapons[weapon_id]
+        weapons_log.info("%s fallback %s", state.spec.name, 'enabled' if state.use_fallback else 'disabled')
+
+    def update_weapon_setting(self, weapon_id, name):
+        state = self.engine.weapons[weapon_id]
+        setting = state.spec.settings[name]
+        try:
+            value = float(self.weapon_setting_entries[(weapon_id, name)].text())
+        except ValueError:
+            self.signal_handler.show_warning.emit(f"Please enter a valid number for {setting.label.lower()}.")
+            weapons_log.warning("Failed to update %s %s: Invalid number entered", state.spec.name, setting.label)
+            return
+        if value < setting.minimum or value > setting.maximum:
+            self.signal_handler.show_warning.emit(f"{setting.label} must be between {setting.minimum} and {setting.maximum} seconds.")
+            weapons_log.warning("Failed to update %s %s: Invalid range", state.spec.name, setting.label)
+            return
+        self.engine.set_weapon_setting(weapon_id, name, value)
+        self.sync_weapons_tab()
+        weapons_log.info("Updated %s %s to %ss", state.spec.name, setting.label, value)
+
+    def set_weapon_keybind(self, weapon_id):
+        self.engine.active_keybind = f"weapon:{weapon_id}"
+        self.weapon_keybind_buttons[weapon_id].setText("Press a key, chord or side mouse button...")
+        listener_log.debug("Setting %s keybind...", self.engine.weapons[weapon_id].spec.name)
+
+    def delete_weapon_keybind(self, weapon_id):
+        state = self.engine.weapons[weapon_id]
+        state.keybind = ""
+        self.weapon_keybind_buttons[weapon_id].setText("Set Keybind")
+        self.engine.rebuild_binding_index()
+        listener_log.info("Cleared %s keybind", state.spec.name)
+
+    def set_hotkey_keybind(self, slot):
+        self.engine.active_keybind = slot
+        self.hotkey_buttons[slot].setText("Press a key, chord or side mouse button...")
+        listener_log.debug("Setting %s keybind...", PROFILE_HOTKEY_LABELS[slot])
+
+    def delete_hotkey_keybind(self, slot):
+        self.engine.set_hotkey(slot, "")
+        self.hotkey_buttons[slot].setText("Set Keybind")
+
+    def set_keybind(self, index):
+        self.engine.active_keybind = index
+        self.keybind_buttons[index].setText("Press a key, chord or side mouse button...")
+        listener_log.debug("Setting keybind for Stratagem %s...", index+1)
+
+    def set_support_keybind(self, index):
+        self.engine.active_keybind = index + len(self.keybind_buttons)
+        self.support_keybind_buttons[index].setText("Press a key, chord or side mouse button...")
+        listener_log.debug("Setting keybind for Support Stratagem %s...", list(SUPPORT_STRATAGEMS.keys())[index])
+
+    def delete_keybind(self, index):
+        self.engine.set_keybind(index, "")
+        self.keybind_buttons[index].setText("Set Keybind")
+        listener_log.info("Cleared keybind for Stratagem %s", index+1)
+
+    def delete_support_keybind(self, index):
+        self.engine.set_keybind(index + len(self.keybind_buttons), "")
+        self.support_keybind_buttons[index].setText("Set Keybind")
+        listener_log.info("Cleared keybind for Support Stratagem %s", list(SUPPORT_STRATAGEMS.keys())[index])
+
+    def show_warning_message(self, message):
+        QMessageBox.warning(self, "Warning", message)
+
+    def collect_profile_data(self):
+        profile_data = self.engine.collect_profile_data()
+        profile_data["log_max_lines"] = self.log_max_lines
+        return profile_data
+
+    def create_new_profile(self):
+        profile_name = self.profile_name_entry.text().strip()
+        if not profile_name:
+            self.signal_handler.show_warning.emit("Please enter a profile name.")
+            profiles_log.warning("Failed to create profile: No profile name entered")
+            return
+
+        if profile_name in PROFILE_STORE:
+            self.signal_handler.show_warning.emit("Profile name already exists.")
+            profiles_log.warning("Failed to create profile: Profile name already exists")
+            return
+
+        profile_data = self.collect_profile_data()
+        # A switch key belongs to one profile only
+        profile_data["switch_keybind"] = ""
+        self.engine.save_profile(profile_name, profile_data)
+        PROFILE_STORE.set_last_profile(profile_name)
+        self.profile_combo.addItem(profile_name)
+        self.profile_combo.setCurrentText(profile_name)
+        self.profile_name_entry.clear()
+        profiles_log.info("Created new profile: %s", profile_name)
+
+    def save_profile(self):
+        profile_name = self.profile_combo.currentText()
+        if not profile_name:
+            self.signal_handler.show_warning.emit("Please select a profile to save.")
+            profiles_log.warning("Failed to save profile: No profile selected")
+            return
+
+        reply = QMessageBox.question(self, "Confirmation", f"Are you sure you want to overwrite '{profile_name}'?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.No:
+            return
+
+        self.engine.save_profile(profile_name, self.collect_profile_data())
+        PROFILE_STORE.set_last_profile(profile_name)
+        profiles_log.info("Saved profile: %s", profile_name)
+
+    def load_profile(self, profile_name):
+        profile_data = PROFILE_STORE.get(profile_name) if profile_name else None
+        if profile_data is None:
+            self.signal_handler.show_warning.emit("Invalid profile selected.")
+            profiles_log.warning("Failed to load profile: Invalid profile selected")
+            return
+
+        try:
+            self.engine.apply_profile(profile_data, profile_name)
+            self.set_log_max_lines(profile_data.get("log_max_lines", DEFAULT_LOG_MAX_LINES))
+            self.sync_state()
+            self.profile_name_entry.setText(profile_name)
+            profiles_log.info("Loaded profile: %s", profile_name)
+            PROFILE_STORE.set_last_profile(profile_name)
+        except Exception as e:
+            self.signal_handler.show_warning.emit(f"Failed to load profile: {e}")
+            profiles_log.warning("Failed to load profile: %s", e)
+
+    def rename_profile(self):
+        old_name = self.profile_combo.currentText()
+        new_name = self.profile_name_entry.text().strip()
+        if not old_name or not new_name:
+            self.signal_handler.show_warning.emit("Please select a profile and enter a new name.")
+            profiles_log.warning("Failed to rename profile: Missing profile or new name")
+            return
+        if new_name in PROFILE_STORE:
+            self.signal_handler.show_warning.emit("Profile name already exists.")
+            profiles_log.warning("Failed to rename profile: Profile name already exists")
+            return
+
+        try:
+            self.engine.rename_profile(old_name, new_name)
+            self.profile_combo.clear()
+            self.profile_combo.addItems(list(PROFILE_STORE.names))
+            self.profile_combo.setCurrentText(new_name)
+            self.profile_name_entry.clear()
+            profiles_log.info("Renamed profile from %s to %s", old_name, new_name)
+            PROFILE_STORE.set_last_profile(new_name)
+        except Exception as e:
+            self.signal_handler.show_warning.emit(f"Failed to rename profile: {e}")
+            profiles_log.warning("Failed to rename profile: %s", e)
+
+    def confirm_delete_profile(self):
+        profile_name = self.profile_combo.currentText()
+        if not profile_name or profile_name not in PROFILE_STORE:
+            self.signal_handler.show_warning.emit("No valid profile selected.")
+            profiles_log.warning("Failed to delete profile: No valid profile selected")
+            return
+        if profile_name == "Default":
+            self.signal_handler.show_warning.emit("Cannot delete the Default profile.")
+            profiles_log.warning("Failed to delete profile: Cannot delete Default profile")
+            return
+
+        reply = QMessageBox.question(self, "Confirmation", f"Are you sure you want to delete the profile '{profile_name}'?", QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.delete_profile(profile_name)
+
+    def delete_profile(self, profile_name):
+        try:
+            self.engine.delete_profile(profile_name)
+            self.profile_combo.clear()
+            self.profile_combo.addItems(list(PROFILE_STORE.names))
+            self.profile_combo.setCurrentText("Default")
+            self.profile_name_entry.clear()
+            self.load_profile("Default")
+            profiles_log.info("Deleted profile: %s", profile_name)
+        except Exception as e:
+            self.signal_handler.show_warning.emit(f"Failed to delete profile: {e}")
+            profiles_log.warning("Failed to delete profile: %s", e)
+
+    def apply_profile_switch(self, profile_name):
+        # A hotkey already switched the engine; bring the widgets up to date
+        # in one pass without loading the profile a second time
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.setCurrentText(profile_name)
+        self.profile_combo.blockSignals(False)
+        self.profile_name_entry.setText(profile_name)
+        prepared = self.engine.prepared_profiles.get(profile_name)
+        if prepared is not None:
+            self.set_log_max_lines(prepared.data.get("log_max_lines", DEFAULT_LOG_MAX_LINES))
+        self.sync_state()
+
+    def toggle_macro(self):
+        self.engine.set_running(not self.engine.running_macro)
+
+    def sync_state(self):
+        # Runs on the GUI thread whenever the engine changes state
+        running = self.engine.running_macro
+        color = "#EF5350" if running else "#4CAF50"
+        self.toggle_button.setText("⏹ Stop" if running else "▶ Start")
+        self.toggle_button.setStyleSheet(f"background-color: {color}; color: #FFFFFF; padding: 3px 8px; border-radius: 4px; min-height: 24px;")
+        self.macro_indicator.setStyleSheet(f"background-color: {'green' if running else 'red'}; border-radius: 10px;")
+        for i, button in enumerate(self.keybind_buttons):
+            button.setText(self.engine.keybind_vars[i] if self.engine.keybind_vars[i] else "Set Keybind")
+        for i, combo in enumerate(self.stratagem_combos):
+            # The engine already has these names and its binding index
+            if combo.currentText() != self.engine.stratagem_names[i]:
+                combo.blockSignals(True)
+                combo.setCurrentText(self.engine.stratagem_names[i])
+                combo.blockSignals(False)
+            self.update_stratagem_output(i)
+        for slot, button in self.hotkey_buttons.items():
+            key = self.engine.profile_switch_keybind if slot == "profile_switch" else PROFILE_STORE.hotkeys.get(slot, "")
+            button.setText(key if key else "Set Keybind")
+        self.macro_delay_entry.setText(str(self.engine.macro_delay))
+        self.ctrl_lead_in_entry.setText(str(self.engine.ctrl_lead_in))
+        self.macro_policy_combo.setCurrentText(self.engine.macro_queue_policy)
+        self.sync_weapons_tab()
+        self.sync_support_tab()
+        self.sync_chains_tab()
+        self.sync_logs_tab()
+
+    def update_stratagem_choice(self, idx, strat_name):
+        self.engine.set_stratagem_choice(idx, strat_name)
+        executor_log.debug("Set Stratagem %s to %s", idx+1, strat_name)
+
+    def update_stratagem_output(self, idx):
+        strat_name = self.stratagem_combos[idx].currentText()
+        entry = hellmacro.STRATAGEM_DATA.entries.get(strat_name)
+        if entry is not None:
+            self.stratagem_outputs[idx].setText(" → ".join(entry.directions))
+            self.stratagem_outputs[idx].setStyleSheet(f"color: {entry.color};")
+        else:
+            self.stratagem_outputs[idx].setText("")
+            self.stratagem_outputs[idx].setStyleSheet("color: #ECEFF1;")
+
+    def test_stratagem(self, idx):
+        strat_name = self.stratagem_combos[idx].currentText()
+        compiled = self.engine.compiled_stratagems.get(strat_name)
+        if compiled:
+            executor_log.info("[TEST] Stratagem %s: %s", strat_name, list(compiled.directions))
+            self.engine.test_sequence(compiled)
+        else:
+            executor_log.info("[TEST] No valid sequence for this stratagem.")
+
+    def test_support_stratagem(self, idx):
+        strat_name = list(SUPPORT_STRATAGEMS.keys())[idx]
+        compiled = self.engine.compiled_support.get(strat_name)
+        if compiled:
+            executor_log.info("[TEST] Support Stratagem %s: %s", strat_name, list(compiled.directions))
+            self.engine.test_sequence(compiled)
+        else:
+            executor_log.info("[TEST] No valid sequence for this support stratagem.")
+
+def run_gui(args, qt_args):
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MacroApp()
+    set_injector(args.injector)
+    window.show()
+    result = app.exec()
+    # Stop the listeners and release held keys as headless mode does, then
+    # write out profile changes still waiting for the writer thread
+    window.engine.shutdown()
+    hellmacro.injector.close()
+    PROFILE_STORE.close()
+    return result
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The engine tests inject through RecordingInjector and call the handlers
+# directly, so pynput only has to import: its dummy backend needs no display
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
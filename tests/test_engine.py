@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+
+import pytest
+
+import hellmacro
+from hellmacro import (BindingIndex, CompiledSequence, MacroEngine, MacroExecutor, RecordingInjector,
+                       compile_chain, compile_sequence, compress_recording, index_bindings)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def injector(monkeypatch):
+    hellmacro.load_pynput()
+    recording = RecordingInjector()
+    monkeypatch.setattr(hellmacro, "injector", recording)
+    return recording
+
+@pytest.fixture
+def engine(injector):
+    engine = MacroEngine()
+    engine.set_weapon_catalog(hellmacro.load_weapons(os.path.join(REPO_DIR, "weapons.json")))
+    yield engine
+    engine.shutdown()
+
+def last_states(events):
+    # Whether each key is down after the events
+    state = {}
+    for _, key, pressed in events:
+        state[key] = pressed
+    return state
+
+# Sequences
+
+def test_compile_sequence_timeline(injector):
+    compiled = compile_sequence("Test", ["up", "down"], 0.05)
+    up, down = hellmacro.DIRECTION_KEYS["up"], hellmacro.DIRECTION_KEYS["down"]
+    assert compiled.events == (
+        (0, up, True), (50_000_000, up, False),
+        (100_000_000, down, True), (150_000_000, down, False)
+    )
+    assert compiled.duration_ns == 200_000_000
+    assert [(offset_ns, has_press) for offset_ns, _, has_press in compiled.batches] == [
+        (0, True), (50_000_000, False), (100_000_000, True), (150_000_000, False)
+    ]
+
+def test_compile_sequence_rejects_unknown_direction(injector):
+    with pytest.raises(ValueError):
+        compile_sequence("Test", ["up", "sideways"], 0.05)
+
+def test_events_at_one_offset_share_a_batch():
+    compiled = CompiledSequence("Test", (), ((0, "a", True), (0, "b", True), (10, "a", False), (10, "b", False)), 10)
+    assert compiled.batches == (
+        (0, (("a", True), ("b", True)), True),
+        (10, (("a", False), ("b", False)), False)
+    )
+
+def test_chain_plays_sequences_back_to_back(injector):
+    first = compile_sequence("A", ["up"], 0.05)
+    second = compile_sequence("B", ["down"], 0.05)
+    chain = compile_chain("Chain", [first, second], 0.01)
+    assert chain.duration_ns == first.duration_ns + 10_000_000 + second.duration_ns
+    assert [event[0] for event in chain.events] == [0, 50_000_000, 110_000_000, 160_000_000]
+
+def test_sequence_holds_ctrl_for_lead_in(engine, injector):
+    engine.ctrl_lead_in = 0.02
+    compiled = compile_sequence("Test", ["up", "down"], 0.01)
+    engine.run_macro_sequence(compiled, test_mode=True)
+    events = injector.events
+    ctrl = hellmacro.Key.ctrl
+    assert events[0][1:] == (ctrl, True)
+    assert events[-1][1:] == (ctrl, False)
+    assert events[1][0] - events[0][0] >= 20_000_000
+    assert not any(last_states(events).values())
+
+# Executor policies
+
+class GatedRunner:
+    # Runner that holds every job until the gate opens or the job is
+    # cancelled
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.cancel = None
+        self.ran = []
+        self.cancelled = []
+
+    def __call__(self, job, cancel):
+        self.ran.append(job)
+        self.cancel = cancel
+        self.started.release()
+        if cancel.wait_for(self.gate.is_set, 5):
+            self.cancelled.append(job)
+
+    def open(self):
+        self.gate.set()
+        if self.cancel is not None:
+            self.cancel.notify()
+
+def run_policy(policy, jobs):
+    # Submits jobs while the first one runs; returns (accepted, runner)
+    runner = GatedRunner()
+    executor = MacroExecutor(runner, policy)
+    executor.start()
+    try:
+        accepted = [executor.submit(jobs[0])]
+        assert runner.started.acquire(timeout=5)
+        accepted += [executor.submit(job) for job in jobs[1:]]
+        runner.open()
+        assert executor.wait_idle(5)
+    finally:
+        executor.shutdown()
+    return accepted, runner
+
+def test_drop_policy_ignores_triggers_while_busy():
+    accepted, runner = run_policy("drop", [1, 2])
+    assert accepted == [True, False]
+    assert runner.ran == [1]
+
+def test_queue_policy_runs_every_trigger_in_order():
+    accepted, runner = run_policy("queue", [1, 2, 3])
+    assert accepted == [True, True, True]
+    assert runner.ran == [1, 2, 3]
+
+def test_latest_policy_keeps_newest_pending_trigger():
+    accepted, runner = run_policy("latest", [1, 2, 3])
+    assert runner.ran == [1, 3]
+    assert runner.cancelled == []
+
+def test_preempt_policy_cancels_running_sequence():
+    accepted, runner = run_policy("preempt", [1, 2])
+    assert runner.ran == [1, 2]
+    assert runner.cancelled == [1]
+
+def test_cancel_releases_every_held_key(engine, injector):
+    engine.macro_executor.start()
+    engine.running_macro = True
+    compiled = compile_sequence("Long", ["up", "down", "left", "right"] * 5, 0.05)
+    engine.macro_executor.submit((compiled, None, "test", False))
+    time.sleep(0.3)
+    engine.stop_all_threads()
+    events = injector.events
+    # Cancelled mid-way: fewer events than the full sequence, none held
+    assert 2 < len(events) < len(compiled.events) + 2
+    assert not any(last_states(events).values())
+    assert engine.metrics.histograms[("stop_latency", "sequence")].count == 1
+
+# Recording
+
+def test_compress_recording_drops_repeats_and_shortens_pauses():
+    ms = 1_000_000
+    events = [
+        (0, "x", False),            # held before the recording
+        (100 * ms, "a", True),
+        (130 * ms, "a", True),      # auto-repeat
+        (181 * ms, "a", False),
+        (5000 * ms, "b", True),     # long pause with nothing held
+        (5002 * ms, "b", False),    # shorter than one quantum
+        (5100 * ms, "c", True)      # still held at the end
+    ]
+    timeline, worst_ns = compress_recording(events, quantum_ms=10, max_gap_ms=500)
+    assert timeline == [
+        [0, "a", True], [80, "a", False],
+        [580, "b", True], [590, "b", False],
+        [680, "c", True], [690, "c", False]
+    ]
+    assert worst_ns <= 10 * ms
+
+def test_compress_recording_of_nothing():
+    assert compress_recording([]) == ([], 0)
+
+# Keybinds
+
+def test_binding_index_conflicts():
+    index = index_bindings([
+        ("f", 0, "Stratagem 1", None),
+        ("ctrl+f", 1, "Stratagem 2", None),
+        ("", 2, "Stratagem 3", None)
+    ])
+    assert index.conflict("f") == "Stratagem 1"
+    assert index.conflict("f", exclude=0) is None
+    assert index.conflict("ctrl+f") == "Stratagem 2"
+    assert index.conflict("shift+f") is None
+    assert index.conflict("") is None
+    assert BindingIndex().conflict("f") is None
+
+def test_binding_index_lookup_by_chord():
+    action = hellmacro.BoundAction("weapon", "railgun")
+    index = index_bindings([("ctrl+shift+g", "weapon:railgun", "Railgun", action)])
+    assert index.lookup(hellmacro.MOD_CTRL | hellmacro.MOD_SHIFT, "g") == (action,)
+    assert index.lookup(hellmacro.MOD_CTRL, "g") == ()
+
+# Weapons
+
+def test_weapon_skips_echo_of_its_own_trigger(engine, injector):
+    engine.running_macro = True
+    engine.set_weapon_fallback("railgun", False)
+    engine.set_weapon_setting("railgun", "timeout", 0.1)
+    engine.set_weapon_enabled("railgun", True)
+    state = engine.weapons["railgun"]
+    engine.weapon_click(state, True, time.perf_counter_ns())
+    deadline = time.monotonic() + 2
+    while not injector.events and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert [pressed for _, _, pressed in injector.events] == [False]
+    assert state.echo is False
+    # The injected release comes back through the listener and is skipped
+    engine.weapon_click(state, False, time.perf_counter_ns())
+    assert state.echo is None
+    assert len(injector.events) == 1
+
+def test_saving_an_entry_keeps_the_catalog_layout(tmp_path):
+    path = tmp_path / "stratagems.json"
+    original = '{\r\n\t"-=Orbital=-": {"sequence": [], "color": "#FF0000"},\r\n    "A": {"sequence": ["up"], "color": "#FF0000"}\r\n}'
+    path.write_bytes(original.encode())
+    hellmacro.save_catalog_entry(str(path), "Rec", {"timeline": [[0, "a", True], [10, "a", False]], "color": "#FFFFFF"}, "Recorded")
+    lines = path.read_bytes().decode().split("\r\n")
+    assert lines[:2] == ['{', '\t"-=Orbital=-": {"sequence": [], "color": "#FF0000"},']
+    assert lines[2] == '    "A": {"sequence": ["up"], "color": "#FF0000"},'
+    assert lines[3].startswith('    "-=Recorded=-"')
+    assert lines[4].startswith('    "Rec": {"timeline"')
+    assert lines[5] == "}"